@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Tuple
+
+from PyQt6.QtCore import QObject, QPointF, Qt, QTimer
+from PyQt6.QtCore import pyqtSlot as QSlot
+from PyQt6.QtGui import QGuiApplication
+from PyQt6.QtWidgets import QGraphicsItem
+
+
+class Animator(QObject):
+    """
+    Central scheduler of card movements
+
+    A single timer ticking at the display refresh rate moves every item in flight once per frame. Moving an
+    item already in flight starts a new movement from where it is, so overlapping animations never fight.
+    When frames are dropped, every item jumps to its destination instead of stuttering through the late
+    frames.
+    """
+    DURATION = 150
+    MAX_FRAME_GAP = 3
+
+    def __init__(self, parent: QObject = None, duration: int = DURATION):
+        """
+        Constructor
+        :param parent: is passed to base Qt class
+        :param duration: length of a movement, in milliseconds
+        """
+        super().__init__(parent)
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else 60.0
+
+        self.__duration = duration / 1000
+        self.__interval = 1 / rate
+        self.__enabled = True
+        self.__stagger = 0.0
+        self.__delay = 0.0
+        self.__last_frame = None
+        # item -> (start, end, start time, duration)
+        self.__flights: Dict[QGraphicsItem, Tuple[QPointF, QPointF, float, float]] = {}
+
+        self.__timer = QTimer(self)
+        self.__timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self.__timer.setInterval(max(1, round(self.__interval * 1000)))
+        self.__timer.timeout.connect(self.frame)
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Check if movements are animated
+        """
+        return self.__enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        """
+        Turn animations on or off, finishing the ones in flight when turned off
+        :param enabled:
+        """
+        self.__enabled = enabled
+        if not enabled:
+            self.finish()
+
+    @property
+    def running(self) -> bool:
+        """
+        Check if any item is in flight
+        """
+        return bool(self.__flights)
+
+    @contextmanager
+    def stagger(self, step: int):
+        """
+        Delay every movement requested in the block by step milliseconds more than the previous one
+        :param step:
+        :return:
+        """
+        self.__stagger = step / 1000
+        self.__delay = 0.0
+        try:
+            yield self
+        finally:
+            self.__stagger = 0.0
+            self.__delay = 0.0
+
+    def move(self, item: QGraphicsItem, x: float, y: float):
+        """
+        Move an item to a position, animated if enabled
+        :param item:
+        :param x:
+        :param y:
+        :return:
+        """
+        end = QPointF(x, y)
+        flight = self.__flights.get(item)
+        if flight is not None and flight[1] == end:
+            return
+        if not self.__enabled or (flight is None and item.pos() == end):
+            self.__flights.pop(item, None)
+            item.setPos(end)
+            return
+
+        self.__flights[item] = (item.pos(), end, time.perf_counter() + self.__delay, self.__duration)
+        self.__delay += self.__stagger
+        if not self.__timer.isActive():
+            self.__last_frame = None
+            self.__timer.start()
+
+    def finish(self, items: Iterable[QGraphicsItem] = None):
+        """
+        Put items in flight at their destination at once
+        :param items: items to finish, all if None
+        :return:
+        """
+        for item in list(self.__flights) if items is None else items:
+            flight = self.__flights.pop(item, None)
+            if flight is not None:
+                item.setPos(flight[1])
+        if not self.__flights:
+            self.__timer.stop()
+
+    @QSlot()
+    def frame(self):
+        """
+        QSlot advancing every item in flight to its position for the current frame
+        :return:
+        """
+        now = time.perf_counter()
+        late = self.__last_frame is not None and now - self.__last_frame > self.__interval * Animator.MAX_FRAME_GAP
+        self.__last_frame = now
+        if late:
+            self.finish()
+            return
+
+        landed = []
+        for item, (start, end, began, duration) in self.__flights.items():
+            progress = (now - began) / duration
+            if progress <= 0:
+                continue
+            if progress >= 1:
+                item.setPos(end)
+                landed.append(item)
+                continue
+            # Ease out: fast start, gentle landing
+            progress = 1 - (1 - progress) ** 3
+            item.setPos(start + (end - start) * progress)
+
+        for item in landed:
+            del self.__flights[item]
+        if not self.__flights:
+            self.__timer.stop()
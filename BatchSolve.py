@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from typing import Iterator, Set, Union
+
+from Deal import Deal
+from GameState import GameState, parse_recycle_limit
+from Solver import Solver
+
+_solver = None
+_rules = (1, None)
+
+
+def init_worker(max_nodes: int, timeout: float, draw_count: int = 1, recycle_limit: Union[int, None] = None):
+    """
+    Create the solver of a pool process
+    :param max_nodes: node limit of every search
+    :param timeout: time limit of every search, in seconds
+    :param draw_count: number of cards turned over by a draw, 1 or 3
+    :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+    :return:
+    """
+    global _solver, _rules
+    _solver = Solver(max_nodes=max_nodes, time_limit=timeout)
+    _rules = (draw_count, recycle_limit)
+
+
+def solve_seed(seed: int) -> dict:
+    """
+    Solve the deal of a seed in a pool process
+    :param seed:
+    :return: result record
+    """
+    start = time.perf_counter()
+    deal = Deal.from_seed(seed)
+    result = _solver.solve_deal(deal.cards, *_rules)
+    return {
+        'seed': seed,
+        'code': deal.code,
+        'draw': _rules[0],
+        'recycles': _rules[1],
+        'solvable': result.solvable,
+        'nodes': result.nodes,
+        'time': round(time.perf_counter() - start, 6),
+    }
+
+
+def completed_seeds(path: str, draw_count: int = 1, recycle_limit: Union[int, None] = None) -> Set[int]:
+    """
+    Read the seeds already present in a results file for some rules. Partially written lines and results
+    of other rules are ignored
+    :param path:
+    :param draw_count:
+    :param recycle_limit:
+    :return:
+    """
+    seeds = set()
+    if not os.path.exists(path):
+        return seeds
+    with open(path, 'r') as results:
+        for line in results:
+            try:
+                record = json.loads(line)
+                if (record['draw'], record['recycles']) == (draw_count, recycle_limit):
+                    seeds.add(record['seed'])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return seeds
+
+
+def pending_seeds(start: int, count: int, done: Set[int]) -> Iterator[int]:
+    """
+    Enumerate the seeds of a run that still have to be solved
+    :param start: first seed
+    :param count: number of seeds
+    :param done: seeds to skip
+    :return:
+    """
+    for seed in range(start, start + count):
+        if seed not in done:
+            yield seed
+
+
+def run(output: str, start: int, count: int, workers: int, timeout: float, max_nodes: int, draw_count: int = 1,
+        recycle_limit: Union[int, None] = None):
+    """
+    Solve a range of seeds on a process pool, appending a JSON line per deal to the output file
+    :param output: results file, existing results are kept and their seeds skipped
+    :param start: first seed
+    :param count: number of seeds
+    :param workers: number of processes
+    :param timeout: time limit per deal, in seconds
+    :param max_nodes: node limit per deal
+    :param draw_count: number of cards turned over by a draw, 1 or 3
+    :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+    :return:
+    """
+    done = completed_seeds(output, draw_count, recycle_limit)
+    if os.path.exists(output) and os.path.getsize(output) > 0:
+        with open(output, 'rb+') as results:
+            results.seek(-1, os.SEEK_END)
+            if results.read(1) != b'\n':
+                # Terminate the line cut by an interrupted run so that new records start on their own line
+                results.write(b'\n')
+    seeds = pending_seeds(start, count, done)
+    remaining = count - sum(1 for seed in done if start <= seed < start + count)
+
+    solved = 0
+    began = time.perf_counter()
+    options = (max_nodes, timeout, draw_count, recycle_limit)
+    with open(output, 'a') as results, multiprocessing.Pool(workers, init_worker, options) as pool:
+        for record in pool.imap_unordered(solve_seed, seeds, chunksize=8):
+            results.write(json.dumps(record) + '\n')
+            results.flush()
+            solved += 1
+            if solved % 1000 == 0:
+                rate = solved / (time.perf_counter() - began)
+                print(f'{solved}/{remaining} deals, {rate:.1f} deals/s')
+
+    print(f'{solved} deals solved in {time.perf_counter() - began:.1f}s')
+
+
+def main():
+    """
+    Command line entrypoint
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Pre-screen shuffled deals for solvability')
+    parser.add_argument('count', type=int, help='number of deals')
+    parser.add_argument('-o', '--output', default='deals.jsonl', help='results file, appended to and resumed from')
+    parser.add_argument('-s', '--start', type=int, default=0, help='first seed')
+    parser.add_argument('-j', '--workers', type=int, default=os.cpu_count(), help='number of processes')
+    parser.add_argument('-t', '--timeout', type=float, default=10.0, help='time limit per deal, in seconds')
+    parser.add_argument('-n', '--max-nodes', type=int, default=1000000, help='node limit per deal')
+    parser.add_argument('-d', '--draw', type=int, default=1, choices=[1, 3], help='cards turned over by a draw')
+    parser.add_argument(
+        '-r', '--recycles', type=parse_recycle_limit, metavar='N',
+        help=f'times the waste can be turned over, 0..{GameState.MAX_RECYCLES}, no limit if omitted'
+    )
+    args = parser.parse_args()
+
+    try:
+        run(args.output, args.start, args.count, args.workers, args.timeout, args.max_nodes, args.draw,
+            args.recycles)
+    except KeyboardInterrupt:
+        print('Interrupted, run the same command again to resume')
+
+
+if __name__ == '__main__':
+    main()
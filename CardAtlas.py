@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import struct
+from typing import List
+
+from PyQt6.QtCore import QRect, QRectF, QStandardPaths, Qt, QTimer
+from PyQt6.QtGui import QGuiApplication, QImage, QPainter, QPixmap
+from PyQt6.QtSvg import QSvgRenderer
+
+
+class CardAtlas:
+    """
+    Card images rasterized into a single sprite sheet, cached on disk
+
+    Faces are laid out one suit per row in CardWidget.Type order, the card background is the first tile of
+    the last row. The cache file is named after a hash of the SVG sources, the tile size and the device
+    pixel ratio, so it is rebuilt whenever any of them changes.
+
+    Tiles are cut from the atlas the first time they are requested. Without a usable cache each tile is
+    rasterized on its first request instead, and the atlas is written to the cache once every tile has
+    been rendered, either on demand or by prefetch.
+    """
+    VERSION = 1
+    MAGIC = b'SATL'
+    HEADER = struct.Struct('<4sHII')
+
+    COLUMNS = 13
+    ROWS = 5
+    # Tile of the card background
+    BACK = (ROWS - 1) * COLUMNS
+
+    WIDTH = 75
+    HEIGHT = 110
+
+    FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+    def __init__(self, width: int = WIDTH, height: int = HEIGHT, ratio: float = None, directory: str = None):
+        """
+        Constructor
+        :param width: logical width of a card
+        :param height: logical height of a card
+        :param ratio: device pixel ratio, the primary screen's if None
+        :param directory: cache directory, the user cache location if None
+        """
+        if ratio is None:
+            screen = QGuiApplication.primaryScreen()
+            ratio = screen.devicePixelRatio() if screen is not None else 1.0
+        if directory is None:
+            directory = os.path.join(
+                QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericCacheLocation), 'solitarie'
+            )
+
+        self.__width = width
+        self.__height = height
+        self.__ratio = ratio
+        self.__directory = directory
+        self.__path = None
+        self.__atlas = None
+        self.__image = None
+        self.__tiles = {}
+        self.__prefetch_timer = None
+
+    @staticmethod
+    def sources() -> List[str]:
+        """
+        Get the SVG files of the atlas tiles, in tile order
+        :return:
+        """
+        return [
+            f"images/{suit}_{value}.svg" for suit in ['C', 'H', 'D', 'S'] for value in range(1, 14)
+        ] + ['images/card_background.svg']
+
+    @property
+    def tile_width(self) -> int:
+        """
+        Get width of a tile in pixels
+        """
+        return round(self.__width * self.__ratio)
+
+    @property
+    def tile_height(self) -> int:
+        """
+        Get height of a tile in pixels
+        """
+        return round(self.__height * self.__ratio)
+
+    @property
+    def path(self) -> str:
+        """
+        Get path of the cache file matching the current sources, size and pixel ratio
+        """
+        digest = hashlib.sha1()
+        for source in CardAtlas.sources():
+            with open(source, 'rb') as file:
+                digest.update(file.read())
+        digest.update(f'{CardAtlas.VERSION}:{self.tile_width}x{self.tile_height}@{self.__ratio}'.encode())
+        return os.path.join(self.__directory, f'cards-{digest.hexdigest()}.atlas')
+
+    def load(self) -> CardAtlas:
+        """
+        Load the atlas from the cache. If missing or stale, prepare an empty atlas rendered tile by tile
+        :return self:
+        """
+        self.__path = self.path
+        image = self.__read(self.__path)
+        if image is None:
+            self.__image = QImage(
+                self.tile_width * CardAtlas.COLUMNS, self.tile_height * CardAtlas.ROWS, CardAtlas.FORMAT
+            )
+            self.__image.fill(Qt.GlobalColor.transparent)
+        else:
+            self.__atlas = QPixmap.fromImage(image)
+        return self
+
+    @property
+    def ratio(self) -> float:
+        """
+        Get device pixels per logical pixel of the tiles
+        """
+        return self.__ratio
+
+    @property
+    def memory(self) -> int:
+        """
+        Get approximate number of bytes held by the atlas and its tiles
+        """
+        total = sum(pixmap.width() * pixmap.height() * 4 for pixmap in self.__tiles.values())
+        if self.__atlas is not None:
+            total += self.__atlas.width() * self.__atlas.height() * 4
+        if self.__image is not None:
+            total += self.__image.sizeInBytes()
+        return total
+
+    @property
+    def complete(self) -> bool:
+        """
+        Check if every tile is available without rendering
+        """
+        return self.__atlas is not None or len(self.__tiles) == len(CardAtlas.sources())
+
+    def prefetch(self, interval: int = 0):
+        """
+        Render the missing tiles one by one on an idle timer
+        :param interval: delay between two tiles, in milliseconds
+        :return:
+        """
+        if self.complete or self.__prefetch_timer is not None:
+            return
+        self.__prefetch_timer = QTimer()
+        self.__prefetch_timer.setInterval(interval)
+        self.__prefetch_timer.timeout.connect(self.__prefetch_next)
+        self.__prefetch_timer.start()
+
+    def warm_up(self) -> CardAtlas:
+        """
+        Get the card background ready now, face down cards making most of a deal, and prefetch the faces
+        :return self:
+        """
+        self.tile(CardAtlas.BACK)
+        self.prefetch()
+        return self
+
+    def __prefetch_next(self):
+        """
+        Render the first missing tile, stop prefetching when all are rendered
+        :return:
+        """
+        for index in range(len(CardAtlas.sources())):
+            if index not in self.__tiles:
+                self.tile(index)
+                break
+        if self.complete:
+            self.__prefetch_timer.stop()
+            self.__prefetch_timer = None
+
+    def __read(self, path: str):
+        """
+        Read a cached atlas
+        :param path:
+        :return: QImage or None if there is no usable cache
+        """
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        if len(data) < CardAtlas.HEADER.size:
+            return None
+        magic, version, width, height = CardAtlas.HEADER.unpack_from(data)
+        pixels = data[CardAtlas.HEADER.size:]
+        if magic != CardAtlas.MAGIC or version != CardAtlas.VERSION or len(pixels) != width * height * 4:
+            return None
+        return QImage(pixels, width, height, width * 4, CardAtlas.FORMAT).copy()
+
+    def __write(self, path: str, image: QImage):
+        """
+        Write an atlas to the cache. Failures are ignored, the atlas is then rendered again on next start
+        :param path:
+        :param image:
+        :return:
+        """
+        bits = image.constBits()
+        bits.setsize(image.sizeInBytes())
+        header = CardAtlas.HEADER.pack(CardAtlas.MAGIC, CardAtlas.VERSION, image.width(), image.height())
+
+        temporary = f'{path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.__directory, exist_ok=True)
+            with open(temporary, 'wb') as file:
+                file.write(header)
+                file.write(bits.asstring())
+            os.replace(temporary, path)
+        except OSError:
+            return
+
+    def __render(self, index: int, rect: QRect) -> QPixmap:
+        """
+        Rasterize the SVG source of a tile into the atlas, caching the atlas once it is complete
+        :param index: tile index
+        :param rect: area of the tile in the atlas
+        :return: pixmap of the tile
+        """
+        painter = QPainter(self.__image)
+        QSvgRenderer(CardAtlas.sources()[index]).render(painter, QRectF(rect))
+        painter.end()
+
+        pixmap = QPixmap.fromImage(self.__image.copy(rect))
+        if len(self.__tiles) + 1 == len(CardAtlas.sources()):
+            self.__write(self.__path, self.__image)
+            self.__image = None
+        return pixmap
+
+    def tile(self, index: int) -> QPixmap:
+        """
+        Get the pixmap of a tile, cutting or rendering it on first use
+        :param index: tile index, in CardAtlas.sources order
+        :return:
+        """
+        pixmap = self.__tiles.get(index)
+        if pixmap is not None:
+            return pixmap
+
+        row, column = divmod(index, CardAtlas.COLUMNS)
+        rect = QRect(column * self.tile_width, row * self.tile_height, self.tile_width, self.tile_height)
+        if self.__atlas is not None:
+            pixmap = self.__atlas.copy(rect)
+        else:
+            pixmap = self.__render(index, rect)
+        pixmap.setDevicePixelRatio(self.__ratio)
+
+        self.__tiles[index] = pixmap
+        return pixmap
+
+    def face(self, card_type: int, value: int) -> QPixmap:
+        """
+        Get the pixmap of a card face
+        :param card_type: card type, numbered as CardWidget.Type
+        :param value: card value
+        :return:
+        """
+        return self.tile((card_type - 1) * CardAtlas.COLUMNS + value - 1)
+
+    @property
+    def back(self) -> QPixmap:
+        """
+        Get the pixmap of the card background
+        """
+        return self.tile(CardAtlas.BACK)
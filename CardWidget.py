@@ -1,11 +1,13 @@
 from __future__ import annotations
-from typing import Union
+from typing import List
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import QPointF, Qt
+from PyQt6.QtGui import QPainter, QPixmap
 from PyQt6.QtWidgets import QGraphicsPixmapItem, QGraphicsItem, QGraphicsSceneMouseEvent
 
 from AbstractDrawable import AbstractDrawable
+from PixmapCache import PixmapCache
+from GameState import card_code
 
 
 class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
@@ -44,8 +46,7 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
             CardWidget.Type.Diamonds: CardWidget.Colour.Red
         }[self.type]
 
-    back = None
-    faces = None
+    pixmaps = None
 
     faces_init = False
 
@@ -59,20 +60,43 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
     @staticmethod
     def init_card_faces():
         """
-        Set card images
+        Set card images. Faces are materialised when first shown
         :return:
         """
         if CardWidget.faces_init:
             return
 
         CardWidget.faces_init = True
-        CardWidget.back = QPixmap('images/card_background.svg')
-        CardWidget.faces = {
-            type: {
-                value: QPixmap(f"images/{['', 'C', 'H', 'D', 'S'][type]}_{value}.svg") for value in range(1, 14)
-            } for type in
-            [CardWidget.Type.Clubs, CardWidget.Type.Hearts, CardWidget.Type.Diamonds, CardWidget.Type.Spades]
-        }
+        CardWidget.pixmaps = PixmapCache()
+
+    @staticmethod
+    def prefetch_card_faces():
+        """
+        Materialise the card faces not shown yet in the background
+        :return:
+        """
+        CardWidget.init_card_faces()
+        CardWidget.pixmaps.current.prefetch()
+
+    @staticmethod
+    def warm_up_card_images(ratio: float):
+        """
+        Load the card images of the first game frame, at scale 1, before a game is shown
+        :param ratio: device pixel ratio
+        :return:
+        """
+        CardWidget.set_render_scale(1.0, ratio)
+        CardWidget.pixmaps.current.warm_up()
+
+    @staticmethod
+    def set_render_scale(scale: float, ratio: float):
+        """
+        Render card images for a view scale and device pixel ratio. Cards pick them up on refresh
+        :param scale: view scale
+        :param ratio: device pixel ratio
+        """
+        CardWidget.init_card_faces()
+        CardWidget.pixmaps.select(scale, ratio)
 
     def __init__(self, parent=None, board=None):
         """
@@ -90,9 +114,12 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         self.__face_down: bool = True
         self.setPixmap(self.image)
         self.setZValue(1)
-        self.__parent = None
         self.__board = board
-        self.__leaf: Union[CardWidget, None] = None
+        self.__container = None
+        self.__position = 0
+        self.__carried: List[CardWidget] = []
+        self.__drag_origin = QPointF()
+        self.__target = QPointF()
 
     @property
     def image(self) -> QPixmap:
@@ -101,8 +128,8 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         :return:
         """
         if self.__face_down:
-            return CardWidget.back
-        return CardWidget.faces[self.type][self.value]
+            return CardWidget.pixmaps.current.back
+        return CardWidget.pixmaps.current.face(self.type, self.value)
 
     @property
     def is_face_down(self) -> bool:
@@ -125,6 +152,20 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         self.__face_down = not self.__face_down
         self.setPixmap(self.image)
 
+    def refresh(self):
+        """
+        Update the displayed image
+        """
+        self.setPixmap(self.image)
+
+    def set_face_up(self, face_up: bool):
+        """
+        Turn the card to the given facing
+        :param face_up:
+        """
+        if face_up == self.__face_down:
+            self.reverse_face()
+
     @property
     def value(self):
         """
@@ -157,147 +198,118 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         self.__type = value
 
     @property
-    def leaf(self) -> Union['CardWidget', None]:
+    def code(self) -> int:
         """
-        Get the child card
+        Get the card code used by the game model
         :return:
         """
-        return self.__leaf
-
-    @leaf.setter
-    def leaf(self, value):
-        self.__leaf = value
+        return card_code(self.__type, self.__value)
 
     @property
-    def parent(self) -> Union['CardWidget', None]:
+    def container(self):
         """
-        Get parent card
+        Get the DeckWidget or PileWidget holding the card
         :return:
         """
-        return self.__parent
+        return self.__container
 
-    @parent.setter
-    def parent(self, value):
+    @property
+    def position(self) -> int:
         """
-        Set parent card
-        :param value:
+        Get index of the card in its container, from the bottom
         :return:
         """
-        self.__parent = value
+        return self.__position
 
-    def draw_face(self, x, y, z):
+    def attach(self, container, position: int):
         """
-        Paint card on board
-        :param x: x pos
-        :param y: y pos
-        :param z: z pos
+        Record the container holding the card and the card's index in it
+        :param container: DeckWidget or PileWidget
+        :param position: index from the bottom of the container
         :return:
         """
-        self.setPos(x, y)
-        self.setZValue(z)
+        self.__container = container
+        self.__position = position
 
-    def reveal_leaf(self):
-        """
-        Turn leaf card face up
-        :return:
-        """
-        if self.leaf is None:
-            self.reverse_face()
-        else:
-            self.leaf.reveal_leaf()
-
-    def reset(self):
+    @property
+    def run(self) -> List[CardWidget]:
         """
-        Reset positioning of the cards
+        Get the card together with the cards above it
         :return:
         """
-        if self.__leaf is None:
-            return
+        if self.__container is None:
+            return [self]
+        return self.__container.cards[self.__position:]
 
-        self.__leaf.setPos(self.x(), self.y() + 15)
-        self.__leaf.setZValue(self.zValue() + 1)
-        self.__leaf.reset()
-
-    def reset_for_upper_pile(self):
+    def __begin_drag(self):
         """
-        Reset positioning of the cards from upper pile
+        Carry the cards above this one as a single item: draw them into a composite pixmap shown by this
+        card, and hide them until the drag ends
         :return:
         """
-        if self.__leaf is None:
+        self.__carried = self.run[1:]
+        self.__drag_origin = self.pos()
+        self.setZValue(10000)
+        if not self.__carried:
             return
 
-        self.__leaf.setPos(self.x(), self.y())
-        self.__leaf.setZValue(self.zValue() + 1)
-        self.__leaf.reset_for_upper_pile()
-
-    def reset_pile(self):
-        """
-        Reset positioning of the card from pile
+        ratio = self.pixmap().devicePixelRatio()
+        origin = self.scenePos()
+        offsets = [card.scenePos() - origin for card in self.__carried]
+        width = self.pixmap().width() / ratio
+        height = max([self.pixmap().height() / ratio] + [
+            offset.y() + card.pixmap().height() / ratio for offset, card in zip(offsets, self.__carried)
+        ])
+
+        composite = QPixmap(round(width * ratio), round(height * ratio))
+        composite.setDevicePixelRatio(ratio)
+        composite.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(composite)
+        painter.drawPixmap(QPointF(0, 0), self.pixmap())
+        for offset, card in zip(offsets, self.__carried):
+            painter.drawPixmap(offset, card.pixmap())
+        painter.end()
+
+        self.setPixmap(composite)
+        for card in self.__carried:
+            card.hide()
+
+    def __end_drag(self):
+        """
+        Put the carried cards back at their place in the composite pixmap and show them again
         :return:
         """
-        if self.__leaf is None:
+        if not self.__carried:
             return
+        distance = self.pos() - self.__drag_origin
+        self.refresh()
+        for card in self.__carried:
+            card.moveBy(distance.x(), distance.y())
+            card.show()
+        self.__carried = []
 
-        self.__leaf.setPos(self.x(), self.y())
-        self.__leaf.setZValue(self.zValue() + 1)
-        self.__leaf.reset_pile()
-
-    def orphan(self):
-        """
-        Remove card's parent
-        :return:
-        """
-        self.__parent = None
-
-    def set_leaf(self, card, x=0, y=0, z=0) -> CardWidget:
+    def draw_face(self, x, y, z):
         """
-        Set a card's child
-        :param card: child
+        Paint card on board, gliding to its position through the board's animator
         :param x: x pos
         :param y: y pos
         :param z: z pos
-        :return: card's child
+        :return:
         """
-
-        if x == 0:
-            x = self.x()
-            y = self.y() + 15
-            z = self.zValue()
-
-        if self.is_face_up:
-            y += 10
-
-        if self.__leaf is not None:
-            self.__leaf.__parent = self
-            return self.__leaf.set_leaf(card, x, y + 15, z + 1)
+        self.__target = QPointF(x, y)
+        self.setZValue(z)
+        if self.__board is None:
+            self.setPos(x, y)
         else:
-            self.__leaf = card
-            card.__parent = self
-            self.__leaf.draw_face(x, y, z)
-            return card
+            self.__board.animator.move(self, x, y)
 
-    def set_leaf_pile(self, card, x=0, y=50, z=0) -> CardWidget:
+    @property
+    def target(self) -> QPointF:
         """
-        Set a card's child in upper piles
-        :param card: child
-        :param x: x pos
-        :param y: y pos
-        :param z: z pos
-        :return: card's child
+        Get the position the card was last laid out at, which it may still be moving to
+        :return:
         """
-        if x == 0:
-            x = self.x()
-            y = self.y()
-            z = self.zValue()
-
-        if self.__leaf is not None:
-            self.__leaf.__parent = self
-            return self.__leaf.set_leaf_pile(card, x, y, z + 1)
-        else:
-            self.__leaf = card
-            card.__parent = self
-            self.__leaf.draw_face(x, y, z)
-            return card
+        return self.__target
 
     def align_components(self) -> AbstractDrawable:
         """
@@ -336,39 +348,15 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         Check if a card can be moved from its deck
         :return:
         """
-        if self.is_face_down:
-            return False
-        prev = self
-        node = self.leaf
-        while node is not None:
-            if not prev.can_receive(node):
-                return False
-            prev = node
-            node = node.leaf
-
-        return True
-
-    def can_receive(self, card: CardWidget) -> bool:
-        """
-        Check if a card can be placed on the top of this
-        :param card:
-        :return:
-        """
-        return self.colour != card.colour and self.value == card.value + 1
+        return self.__board.state.is_movable(self.code)
 
     def mouseMoveEvent(self, event: QGraphicsSceneMouseEvent) -> None:
         """
-        Handle mouse moving event
+        Handle mouse moving event. The cards above this one are drawn in its pixmap while dragged, so only
+        this item moves
         :param event:
         :return:
         """
-        dist = event.pos() - event.lastPos()
-
-        node = self.__leaf
-        while node is not None:
-            node.moveBy(dist.x(), dist.y())
-            node = node.__leaf
-
         super(QGraphicsPixmapItem, self).mouseMoveEvent(event)
 
     def mousePressEvent(self, event: QGraphicsSceneMouseEvent) -> None:
@@ -381,65 +369,21 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
             event.ignore()
             return
 
-        node = self
-        i = 0
-        while node is not None:
-            node.setZValue(10000 + i)
-            i += 1
-            node = node.__leaf
+        self.__board.animator.finish(self.run)
+        self.__begin_drag()
 
         CardWidget.DeckMoveAttributes.currently_moved = self
-        CardWidget.DeckMoveAttributes.previous = self.__parent
-        if self.__parent is None:
-            CardWidget.DeckMoveAttributes.previous = self.__board.container(self)
+        CardWidget.DeckMoveAttributes.previous = self.__board.container(self)
 
         super(QGraphicsPixmapItem, self).mousePressEvent(event)
 
-    def get_leaf(self):
-        """
-        Get the last card child in a recursive manner
-        :return:
-        """
-        if self.__leaf is None:
-            return self
-        return self.__leaf.get_leaf()
-
-    def release(self):
-        """
-        Release a card from its deck
-        :return:
-        """
-        if self.__leaf is not None:
-            self.__leaf.__parent = None
-        self.__leaf = None
-        self.__board.do_draw_deck_cleanup(self)
-
-        if self.is_face_down:
-            self.reverse_face()
-
-        root = self.__parent
-        parent = self.__parent
-        while parent is not None:
-            root = parent
-            parent = parent.__parent
-
-        if root is None:
-            root = self
-
-        self.__board.update_deck_leaf(root, self)
-
     def release_to(self, deck):
         """
         Release a card to a given deck
         :param deck:
         :return:
         """
-        if deck.can_receive(self):
-            if CardWidget.DeckMoveAttributes.previous is not None:
-                CardWidget.DeckMoveAttributes.previous.release()
-            deck.receive(self)
-        else:
-            CardWidget.DeckMoveAttributes.previous.reset()
+        self.__board.drop(self, deck)
 
     def release_to_pile(self, deck):
         """
@@ -447,11 +391,7 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         :param deck:
         :return:
         """
-        if deck.can_receive(self):
-            CardWidget.DeckMoveAttributes.previous.release()
-            deck.receive(self)
-        else:
-            CardWidget.DeckMoveAttributes.previous.reset_pile()
+        self.__board.drop(self, deck)
 
     def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent) -> None:
         """
@@ -459,11 +399,12 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
         :param event:
         :return:
         """
+        self.__end_drag()
+
         if event.button() is Qt.MouseButton.LeftButton:
             match = self.__board.nearest_deck(self)
             if match is None:
-                if CardWidget.DeckMoveAttributes.previous is not None:
-                    CardWidget.DeckMoveAttributes.previous.reset()
+                self.__board.sync_container(CardWidget.DeckMoveAttributes.previous)
             else:
                 self.release_to(match)
 
@@ -475,7 +416,8 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
 
         elif event.button() is Qt.MouseButton.RightButton:
             print(f'type{self.__type}value{self.__value}')
-            self.__board.draw_container.place_first(self)
+            self.__board.sync_container(CardWidget.DeckMoveAttributes.previous)
+            self.__board.cycle_stock()
             CardWidget.DeckMoveAttributes.previous = None
             CardWidget.DeckMoveAttributes.currently_moved = None
 
@@ -498,9 +440,7 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
             return
 
         CardWidget.DeckMoveAttributes.currently_moved = self
-        CardWidget.DeckMoveAttributes.previous = self.__parent
-        if self.__parent is None:
-            CardWidget.DeckMoveAttributes.previous = self.__board.container(self)
+        CardWidget.DeckMoveAttributes.previous = self.__board.container(self)
 
         self.release_to_pile(match)
         CardWidget.DeckMoveAttributes.previous = None
@@ -532,4 +472,4 @@ class CardWidget(QGraphicsPixmapItem, AbstractDrawable):
                    CardWidget.Type.Diamonds: 'D',
                    CardWidget.Type.Spades: 'S',
                    CardWidget.Type.Hearts: 'H'
-               }[self.type] + ((' -> ' + self.__leaf.stupid_print()) if self.__leaf is not None else "")
+               }[self.type]
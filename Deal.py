@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import base64
+import random
+from typing import List, Union
+
+from GameState import CARD_COUNT, card_code
+
+# Suit order of a fresh deck: clubs, diamonds, hearts, spades
+SUITS = [1, 3, 2, 4]
+
+FRESH_DECK = [card_code(suit, value) for suit in SUITS for value in range(1, 14)]
+
+SEED_MASK = (1 << 64) - 1
+
+
+class Deal:
+    """
+    Order of the 52 cards of a game, addressable by seed or by a compact code
+
+    The permutation is stored as its Lehmer rank, a number below 52! which fits in 29 bytes and is
+    shared as a 39 character url-safe code.
+    """
+    CODE_BYTES = 29
+
+    def __init__(self, cards: List[int], seed: Union[int, None] = None):
+        """
+        Constructor
+        :param cards: the 52 card codes in drawing order
+        :param seed: seed the cards were shuffled with, if known
+        """
+        if sorted(cards) != list(range(CARD_COUNT)):
+            raise ValueError('a deal must contain every card exactly once')
+        self.__cards = list(cards)
+        self.__seed = seed
+
+    @staticmethod
+    def from_seed(seed: int) -> Deal:
+        """
+        Shuffle a fresh deck with a generator keyed by a 64-bit seed
+        :param seed:
+        :return:
+        """
+        seed &= SEED_MASK
+        cards = FRESH_DECK[:]
+        random.Random(seed).shuffle(cards)
+        return Deal(cards, seed)
+
+    @staticmethod
+    def random() -> Deal:
+        """
+        Shuffle a fresh deck with a random seed
+        :return:
+        """
+        return Deal.from_seed(random.getrandbits(64))
+
+    @property
+    def cards(self) -> List[int]:
+        """
+        Get card codes in drawing order
+        """
+        return self.__cards
+
+    @property
+    def seed(self) -> Union[int, None]:
+        """
+        Get seed, None if the deal was not created from a seed
+        """
+        return self.__seed
+
+    def rank(self) -> int:
+        """
+        Get the Lehmer rank of the permutation
+        :return: number in range 0..52!-1
+        """
+        remaining = list(range(CARD_COUNT))
+        rank = 0
+        for position, card in enumerate(self.__cards):
+            digit = remaining.index(card)
+            del remaining[digit]
+            rank = rank * (CARD_COUNT - position) + digit
+        return rank
+
+    @staticmethod
+    def from_rank(rank: int) -> Deal:
+        """
+        Rebuild a deal from its Lehmer rank
+        :param rank:
+        :return:
+        """
+        digits = []
+        for base in range(1, CARD_COUNT + 1):
+            rank, digit = divmod(rank, base)
+            digits.append(digit)
+        if rank:
+            raise ValueError('rank out of range')
+
+        remaining = list(range(CARD_COUNT))
+        return Deal([remaining.pop(digit) for digit in reversed(digits)])
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the deal in CODE_BYTES bytes
+        :return:
+        """
+        return self.rank().to_bytes(Deal.CODE_BYTES, 'big')
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Deal:
+        """
+        Decode a deal encoded by to_bytes
+        :param data:
+        :return:
+        """
+        if len(data) != Deal.CODE_BYTES:
+            raise ValueError(f'a deal is encoded in {Deal.CODE_BYTES} bytes')
+        return Deal.from_rank(int.from_bytes(data, 'big'))
+
+    @property
+    def code(self) -> str:
+        """
+        Get the shareable code of the deal
+        """
+        return base64.urlsafe_b64encode(self.to_bytes()).decode('ascii').rstrip('=')
+
+    @staticmethod
+    def from_code(code: str) -> Deal:
+        """
+        Decode a deal from its shareable code
+        :param code:
+        :return:
+        """
+        return Deal.from_bytes(base64.urlsafe_b64decode(code + '=' * (-len(code) % 4)))
@@ -1,40 +1,48 @@
+from collections import deque
+
 from PyQt6.QtWidgets import QGraphicsRectItem
 
 from AbstractDrawable import AbstractDrawable
 from CardWidget import CardWidget
-import random
+from Deal import Deal
+from GameState import SUIT_OF, VALUE_OF
 
 
 class DrawDeck(QGraphicsRectItem):
     """
     Class for draw cards
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, deal: Deal = None):
         """
-        Constructor. Create cards and shuffle the deck
+        Constructor. Create cards in the order of a deal
         :param parent:
+        :param deal: order of the cards, a randomly seeded deal if None
         """
         super(QGraphicsRectItem, self).__init__()
 
-        self.__cards = []
-        for suite in [CardWidget.Type.Clubs, CardWidget.Type.Diamonds, CardWidget.Type.Hearts, CardWidget.Type.Spades]:
-            for value in range(1, 14):
-                card = CardWidget(parent=self, board=parent)
-                card.init()
-                card.type = suite
-                card.value = value
-                # parent.scene.addItem(card)
-                self.__cards.append(card)
-        random.shuffle(self.__cards)
+        self.__deal = deal if deal is not None else Deal.random()
+        self.__cards = deque()
+        for code in self.__deal.cards:
+            card = CardWidget(parent=self, board=parent)
+            card.init()
+            card.type = SUIT_OF[code]
+            card.value = VALUE_OF[code]
+            # parent.scene.addItem(card)
+            self.__cards.append(card)
+
+    @property
+    def deal(self) -> Deal:
+        """
+        Get deal
+        """
+        return self.__deal
 
     def draw(self) -> CardWidget:
         """
         Draw a card from the list of cards
         :return: card
         """
-        card = self.__cards[0]
-        self.__cards.pop(0)
-        return card
+        return self.__cards.popleft()
 
     def append(self, card):
         """
@@ -50,3 +58,9 @@ class DrawDeck(QGraphicsRectItem):
         """
         return self.__cards
 
+    @property
+    def codes(self):
+        """
+        Get the game model codes of the cards, in drawing order
+        """
+        return [card.code for card in self.__cards]
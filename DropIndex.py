@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, Union
+
+
+class DropIndex:
+    """
+    Layout index resolving the container under a point with a bucket lookup
+
+    The board is cut in vertical strips of one column pitch. Each strip lists the containers overlapping it,
+    sorted from top to bottom, so a lookup inspects at most a couple of entries whatever the number of cards
+    on the board.
+    """
+
+    def __init__(self, pitch: float, margin: float):
+        """
+        Constructor
+        :param pitch: horizontal distance between two neighbouring columns
+        :param margin: extra width accepted on each side of a container
+        """
+        self.__pitch = pitch
+        self.__margin = margin
+        self.__buckets: Dict[int, List[Tuple[float, float, float, object]]] = {}
+
+    def add(self, container, x: float, y: float, width: float):
+        """
+        Register a container
+        :param container: DeckWidget or PileWidget
+        :param x: left of the container
+        :param y: top of the container
+        :param width: width of the container
+        :return:
+        """
+        left = x - self.__margin
+        right = x + width + self.__margin
+        for bucket in range(int(left // self.__pitch), int(right // self.__pitch) + 1):
+            entries = self.__buckets.setdefault(bucket, [])
+            entries.append((left, right, y, container))
+            entries.sort(key=lambda entry: entry[2])
+
+    def find(self, x: float, y: float) -> Union[object, None]:
+        """
+        Get the container under a point: the lowest one starting above the point in the strip, or the topmost
+        one if the point is above all of them
+        :param x:
+        :param y:
+        :return: container or None if no container spans x
+        """
+        match = None
+        for left, right, top, container in self.__buckets.get(int(x // self.__pitch), ()):
+            if left <= x < right and (match is None or top <= y):
+                match = container
+        return match
@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from GameState import SUIT_COUNT
+from Simulator import ACTION_COUNT, COLUMN_SIZE, COLUMNS, EMPTY, GameBatch
+
+# Code of a face down card in observations
+HIDDEN = EMPTY + 1
+# Number of waste cards shown, the three turned by a draw-3
+WASTE_SHOWN = 3
+
+# Observation layout: the tableau column by column, the foundations, the shown waste cards with the playable
+# one last, then the number of cards of the stock and of the waste
+OBSERVED_TABLEAU = 0
+OBSERVED_FOUNDATIONS = OBSERVED_TABLEAU + COLUMNS * COLUMN_SIZE
+OBSERVED_WASTE = OBSERVED_FOUNDATIONS + SUIT_COUNT
+OBSERVED_STOCK_SIZE = OBSERVED_WASTE + WASTE_SHOWN
+OBSERVED_WASTE_SIZE = OBSERVED_STOCK_SIZE + 1
+OBSERVATION_SIZE = OBSERVED_WASTE_SIZE + 1
+
+
+def observe(batch: GameBatch) -> np.ndarray:
+    """
+    Get what a player sees of every game, face down cards replaced by HIDDEN
+    :param batch:
+    :return: contiguous int8 array shaped (games, OBSERVATION_SIZE)
+    """
+    count = len(batch)
+    observation = np.empty((count, OBSERVATION_SIZE), dtype=np.int8)
+
+    hidden = np.arange(COLUMN_SIZE) < batch.hidden[..., None]
+    tableau = np.where(hidden, HIDDEN, batch.tableau)
+    observation[:, OBSERVED_TABLEAU:OBSERVED_FOUNDATIONS] = tableau.reshape(count, -1)
+    observation[:, OBSERVED_FOUNDATIONS:OBSERVED_WASTE] = batch.foundations
+
+    positions = batch.waste_length[:, None] + np.arange(-WASTE_SHOWN, 0)
+    waste = np.take_along_axis(batch.talon, np.maximum(positions, 0), axis=1)
+    observation[:, OBSERVED_WASTE:OBSERVED_STOCK_SIZE] = np.where(positions >= 0, waste, EMPTY)
+    observation[:, OBSERVED_STOCK_SIZE] = batch.talon_length - batch.waste_length
+    observation[:, OBSERVED_WASTE_SIZE] = batch.waste_length
+    return observation
+
+
+class VectorEnv:
+    """
+    Klondike environments stepped together, in the style of the Gym vector API, without any Qt object
+
+    Observations are the rows of observe, actions are indices in the action space of Simulator and rewards
+    are the score changes of the scoring variant. An episode terminates when it is won or when no action is
+    legal anymore, and is truncated after max_moves actions. Environments whose episode ended are dealt a
+    new game in the same step: the returned observation starts the new episode, the last one of the ended
+    episode is kept in the final_observation info.
+    """
+
+    def __init__(self, count: int, draw: int = 1, recycles: Union[int, None] = None, scoring: str = 'standard',
+                 max_moves: int = 1000):
+        """
+        Constructor
+        :param count: number of environments
+        :param draw: number of cards turned by a draw, 1 or 3
+        :param recycles: number of times the waste can be turned over, None for no limit
+        :param scoring: scoring variant, a key of Simulator.SCORING
+        :param max_moves: number of actions after which an episode is truncated
+        """
+        self.__count = count
+        self.__options = {'draw': draw, 'recycles': recycles, 'scoring': scoring}
+        self.__max_moves = max_moves
+        self.__rng = np.random.default_rng()
+        self.__batch = None
+        self.__mask = None
+
+    @property
+    def num_envs(self) -> int:
+        """
+        Get number of environments
+        """
+        return self.__count
+
+    @property
+    def batch(self) -> GameBatch:
+        """
+        Get the games being played
+        """
+        return self.__batch
+
+    def action_mask(self) -> np.ndarray:
+        """
+        Get the legal actions of every environment
+        :return: booleans shaped (environments, ACTION_COUNT)
+        """
+        return self.__mask
+
+    def reset(self, seed: Union[int, None] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Deal new games in every environment
+        :param seed: seed of the deals of this and the following episodes, None for a random one
+        :return: observations and infos
+        """
+        self.__rng = np.random.default_rng(seed)
+        self.__batch = GameBatch(GameBatch.decks(self.__count, self.__rng), **self.__options)
+        self.__mask = self.__batch.legal_mask()
+        return observe(self.__batch), {'action_mask': self.__mask}
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray,
+                                                 Dict[str, np.ndarray]]:
+        """
+        Play an action in every environment
+        :param actions: legal action of every environment
+        :return: observations, rewards, terminated and truncated flags, infos
+        """
+        if self.__batch is None:
+            raise RuntimeError('reset must be called before step')
+        actions = np.asarray(actions, dtype=np.intp)
+        if actions.shape != (self.__count,):
+            raise ValueError(f'expected {self.__count} actions, got an array shaped {actions.shape}')
+        if ((actions < 0) | (actions >= ACTION_COUNT)).any() or \
+                not self.__mask[np.arange(self.__count), actions].all():
+            raise ValueError('illegal action')
+
+        batch = self.__batch
+        rewards = batch.step(actions).astype(np.float32)
+        won = batch.won
+        self.__mask = batch.legal_mask()
+        terminated = won | ~self.__mask.any(axis=1)
+        truncated = ~terminated & (batch.moves >= self.__max_moves)
+        observations = observe(batch)
+
+        infos = {'won': won}
+        ended = np.flatnonzero(terminated | truncated)
+        if len(ended):
+            infos['final_observation'] = observations[ended]
+            infos['final_index'] = ended
+            decks = GameBatch.decks(len(ended), self.__rng)
+            fresh = GameBatch(decks, **self.__options)
+            observations[ended] = observe(fresh)
+            self.__mask[ended] = fresh.legal_mask()
+            batch.redeal(ended, decks)
+        infos['action_mask'] = self.__mask
+        return observations, rewards, terminated, truncated, infos
+
+
+class KlondikeEnv:
+    """
+    Single Klondike environment in the style of the Gym API, dealing the same games as the board for a seed
+
+    See VectorEnv for the observations, actions and rewards. An ended episode is not restarted: reset has
+    to be called.
+    """
+
+    def __init__(self, draw: int = 1, recycles: Union[int, None] = None, scoring: str = 'standard',
+                 max_moves: int = 1000):
+        """
+        Constructor
+        :param draw: number of cards turned by a draw, 1 or 3
+        :param recycles: number of times the waste can be turned over, None for no limit
+        :param scoring: scoring variant, a key of Simulator.SCORING
+        :param max_moves: number of actions after which an episode is truncated
+        """
+        self.__options = {'draw': draw, 'recycles': recycles, 'scoring': scoring}
+        self.__max_moves = max_moves
+        self.__batch = None
+        self.__mask = None
+        self.__over = True
+
+    @property
+    def batch(self) -> GameBatch:
+        """
+        Get the game being played, as a batch of one
+        """
+        return self.__batch
+
+    def action_mask(self) -> np.ndarray:
+        """
+        Get the legal actions
+        :return: booleans shaped (ACTION_COUNT,)
+        """
+        return self.__mask
+
+    def legal_actions(self) -> List[int]:
+        """
+        Get the indices of the legal actions
+        :return:
+        """
+        return np.flatnonzero(self.__mask).tolist()
+
+    def reset(self, seed: Union[int, None] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Deal a new game
+        :param seed: Deal seed, None for a random deal
+        :return: observation and info
+        """
+        if seed is None:
+            decks = GameBatch.decks(1, np.random.default_rng())
+        else:
+            decks = GameBatch.seeded_decks([seed])
+        self.__batch = GameBatch(decks, **self.__options)
+        self.__mask = self.__batch.legal_mask()[0]
+        self.__over = False
+        return observe(self.__batch)[0], {'action_mask': self.__mask}
+
+    def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, Dict[str, np.ndarray]]:
+        """
+        Play an action
+        :param action: legal action
+        :return: observation, reward, terminated and truncated flags, info
+        """
+        if self.__over:
+            raise RuntimeError('reset must be called before step')
+        if not 0 <= action < ACTION_COUNT or not self.__mask[action]:
+            raise ValueError(f'illegal action {action}')
+
+        batch = self.__batch
+        reward = float(batch.step(np.array([action]))[0])
+        won = bool(batch.won[0])
+        self.__mask = batch.legal_mask()[0]
+        terminated = won or not self.__mask.any()
+        truncated = not terminated and bool(batch.moves[0] >= self.__max_moves)
+        self.__over = terminated or truncated
+        return observe(batch)[0], reward, terminated, truncated, {'won': won, 'action_mask': self.__mask}
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import time
+from typing import TextIO, Union
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtCore import pyqtSignal as QSignal
+from PyQt6.QtCore import pyqtSlot as QSlot
+
+
+class FrameMeter(QObject):
+    """
+    Frame statistics of a view: frames per second and time spent painting a frame
+
+    Paint durations are accumulated by add and summarised every interval, when the summary is published
+    through the updated signal and appended to the log file if any, one tab separated line per interval:
+    seconds since start, frames, frames per second, mean and worst paint time in milliseconds.
+    """
+    updated = QSignal(str)
+
+    def __init__(self, parent: QObject = None, log: str = None, interval: int = 1000):
+        """
+        Constructor
+        :param parent: is passed to base Qt class
+        :param log: file receiving a line per interval, None to not log
+        :param interval: length of a measurement interval, in milliseconds
+        """
+        super().__init__(parent)
+        self.__log: Union[TextIO, None] = open(log, 'a') if log is not None else None
+        self.__started = time.perf_counter()
+        self.__since = self.__started
+        self.__frames = 0
+        self.__paint = 0.0
+        self.__worst = 0.0
+        self.__summary = 'measuring...'
+
+        self.__timer = QTimer(self)
+        self.__timer.setInterval(interval)
+        self.__timer.timeout.connect(self.report)
+        self.__timer.start()
+
+    @property
+    def summary(self) -> str:
+        """
+        Get the statistics of the last interval as displayed by the overlay
+        """
+        return self.__summary
+
+    def add(self, seconds: float):
+        """
+        Count a painted frame
+        :param seconds: time spent painting it
+        :return:
+        """
+        self.__frames += 1
+        self.__paint += seconds
+        self.__worst = max(self.__worst, seconds)
+
+    @QSlot()
+    def report(self):
+        """
+        QSlot summarising the interval that just ended
+        :return:
+        """
+        now = time.perf_counter()
+        elapsed = now - self.__since
+        fps = self.__frames / elapsed if elapsed > 0 else 0.0
+        mean = self.__paint / self.__frames * 1000 if self.__frames else 0.0
+        worst = self.__worst * 1000
+
+        self.__summary = f'{fps:.1f} fps, paint {mean:.2f} ms (worst {worst:.2f} ms)'
+        if self.__log is not None:
+            self.__log.write(f'{now - self.__started:.3f}\t{self.__frames}\t{fps:.2f}\t{mean:.3f}\t{worst:.3f}\n')
+            self.__log.flush()
+
+        self.__since = now
+        self.__frames = 0
+        self.__paint = 0.0
+        self.__worst = 0.0
+        self.updated.emit(self.__summary)
+
+    def close(self):
+        """
+        Stop measuring and close the log
+        :return:
+        """
+        self.__timer.stop()
+        if self.__log is not None:
+            self.__log.close()
+            self.__log = None
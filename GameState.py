@@ -0,0 +1,604 @@
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from typing import Callable, Deque, Iterable, List, Tuple, Union
+
+SUIT_COUNT = 4
+RANK_COUNT = 13
+CARD_COUNT = SUIT_COUNT * RANK_COUNT
+
+# Suits are numbered like CardWidget.Type so that codes round-trip between the model and the view
+CLUBS, HEARTS, DIAMONDS, SPADES = 1, 2, 3, 4
+
+SUIT_OF = [code // RANK_COUNT + 1 for code in range(CARD_COUNT)]
+VALUE_OF = [code % RANK_COUNT + 1 for code in range(CARD_COUNT)]
+RED_OF = [SUIT_OF[code] in (HEARTS, DIAMONDS) for code in range(CARD_COUNT)]
+
+
+def card_code(suit: int, value: int) -> int:
+    """
+    Encode a card as a small integer
+    :param suit: card type, numbered as CardWidget.Type
+    :param value: card value, 1 (ace) to 13 (king)
+    :return: code in range 0..51
+    """
+    return (suit - 1) * RANK_COUNT + value - 1
+
+
+def can_stack(card: int, onto: int) -> bool:
+    """
+    Check if a card can be placed on top of another card in the tableau
+    :param card: code of the moved card
+    :param onto: code of the receiving card
+    :return:
+    """
+    return RED_OF[card] != RED_OF[onto] and VALUE_OF[onto] == VALUE_OF[card] + 1
+
+
+
+def parse_recycle_limit(text: str) -> int:
+    """
+    Parse a recycle limit command line argument, in the range GameState accepts
+    :param text:
+    :return:
+    """
+    limit = int(text)
+    if not 0 <= limit <= GameState.MAX_RECYCLES:
+        raise argparse.ArgumentTypeError(f'must be in range 0..{GameState.MAX_RECYCLES}')
+    return limit
+
+class GameState:
+    """
+    Qt-free Klondike game model owning all piles and rules
+
+    Piles are addressed by index: 0..6 are the tableau columns, 7..10 the foundations (one per suit, in
+    CardWidget.Type order), 11 the stock and 12 the waste. Every pile is a sequence of card codes from bottom
+    to top. The stock is face down; drawing turns its top draw_count cards over onto the waste, a move from
+    the stock to the waste, and once the stock is empty the whole waste is turned back over into it, a move
+    from the waste to the stock, at most recycle_limit times. Only the top card of the waste is playable.
+    Both piles are deques, so drawing and playing cost a constant time per card whatever their size.
+
+    The number of cards on the foundations and of face down cards are kept up to date on every move, and
+    listeners registered with add_listener are called after every move to maintain their own derived state.
+    Moves are reverted with revert, given the flag returned by move, without keeping any snapshot.
+    """
+    TABLEAU_COUNT = 7
+    FOUNDATION = 7
+    STOCK = 11
+    WASTE = 12
+    PILE_COUNT = 13
+
+    # Largest recycle limit, so that limits and recycle counts fit in a byte of keys and saves
+    MAX_RECYCLES = 254
+
+    def __init__(self, draw_count: int = 1, recycle_limit: Union[int, None] = None):
+        """
+        Constructor. Create an empty table
+        :param draw_count: number of cards turned over by a draw, 1 or 3
+        :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+        """
+        if draw_count not in (1, 3):
+            raise ValueError(f'cards are drawn by 1 or 3, not {draw_count}')
+        if recycle_limit is not None and not 0 <= recycle_limit <= GameState.MAX_RECYCLES:
+            raise ValueError(f'the recycle limit must be in range 0..{GameState.MAX_RECYCLES}, not {recycle_limit}')
+        self.__tableau: List[List[int]] = [[] for _ in range(GameState.TABLEAU_COUNT)]
+        self.__hidden: List[int] = [0] * GameState.TABLEAU_COUNT
+        self.__foundations: List[int] = [0] * SUIT_COUNT
+        self.__stock: Deque[int] = deque()
+        self.__waste: Deque[int] = deque()
+        self.__draw_count = draw_count
+        self.__recycle_limit = recycle_limit
+        self.__recycled = 0
+
+        self.__home = 0
+        self.__hidden_count = 0
+        self.__listeners: List[Callable[[int, int, int, bool], None]] = []
+
+    @staticmethod
+    def deal(cards: List[int], draw_count: int = 1, recycle_limit: Union[int, None] = None) -> GameState:
+        """
+        Deal a shuffled deck the way the board does: column i receives i + 1 cards taken from the front of
+        the deck, the remaining cards form the stock, whose top is the last card of the deck
+        :param cards: the 52 card codes in drawing order
+        :param draw_count: number of cards turned over by a draw, 1 or 3
+        :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+        :return: new game state
+        """
+        state = GameState(draw_count, recycle_limit)
+        position = 0
+        for column in range(GameState.TABLEAU_COUNT):
+            state.__tableau[column] = list(cards[position:position + column + 1])
+            state.__hidden[column] = column
+            position += column + 1
+        state.__stock = deque(cards[position:])
+        state.__hidden_count = sum(state.__hidden)
+        return state
+
+    @staticmethod
+    def restore(tableau: List[List[int]], hidden: List[int], foundations: List[int], stock: Iterable[int],
+                waste: Iterable[int] = (), draw_count: int = 1, recycle_limit: Union[int, None] = None,
+                recycled: int = 0) -> GameState:
+        """
+        Build a state from the contents of its piles
+        :param tableau: cards of every tableau column, bottom to top
+        :param hidden: number of face down cards of every tableau column
+        :param foundations: value of the top card of every foundation, 0 if empty
+        :param stock: stock cards, the top one last
+        :param waste: waste cards, the top one last
+        :param draw_count: number of cards turned over by a draw, 1 or 3
+        :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+        :param recycled: number of times the waste was turned back into the stock so far
+        :return: new game state
+        """
+        stock, waste = list(stock), list(waste)
+        cards = [card for column in tableau for card in column] + stock + waste
+        cards += [suit * RANK_COUNT + value for suit in range(SUIT_COUNT) for value in range(foundations[suit])]
+        if sorted(cards) != list(range(CARD_COUNT)):
+            raise ValueError('a game must contain every card exactly once')
+        if any(not 0 <= count <= max(len(column) - 1, 0) for count, column in zip(hidden, tableau)):
+            raise ValueError('the top card of a tableau column must be face up')
+        if recycle_limit is not None and not 0 <= recycled <= recycle_limit:
+            raise ValueError('the waste was turned over more often than the limit allows')
+
+        state = GameState(draw_count, recycle_limit)
+        state.__tableau = [list(column) for column in tableau]
+        state.__hidden = list(hidden)
+        state.__foundations = list(foundations)
+        state.__stock = deque(stock)
+        state.__waste = deque(waste)
+        state.__recycled = recycled
+        state.__home = sum(foundations)
+        state.__hidden_count = sum(hidden)
+        return state
+
+    def copy(self) -> GameState:
+        """
+        Get an independent copy of the state
+        :return:
+        """
+        state = GameState(self.__draw_count, self.__recycle_limit)
+        state.__tableau = [column[:] for column in self.__tableau]
+        state.__hidden = self.__hidden[:]
+        state.__foundations = self.__foundations[:]
+        state.__stock = self.__stock.copy()
+        state.__waste = self.__waste.copy()
+        state.__recycled = self.__recycled
+        state.__home = self.__home
+        state.__hidden_count = self.__hidden_count
+        return state
+
+    @property
+    def tableau(self) -> List[List[int]]:
+        """
+        Get tableau columns
+        """
+        return self.__tableau
+
+    @property
+    def hidden(self) -> List[int]:
+        """
+        Get number of face down cards of every tableau column
+        """
+        return self.__hidden
+
+    @property
+    def foundations(self) -> List[int]:
+        """
+        Get value of the top card of every foundation, 0 if empty
+        """
+        return self.__foundations
+
+    @property
+    def stock(self) -> Deque[int]:
+        """
+        Get stock cards, the next one drawn last
+        """
+        return self.__stock
+
+    @property
+    def waste(self) -> Deque[int]:
+        """
+        Get waste cards, the playable one last
+        """
+        return self.__waste
+
+    @property
+    def draw_count(self) -> int:
+        """
+        Get number of cards turned over by a draw
+        """
+        return self.__draw_count
+
+    @property
+    def recycle_limit(self) -> Union[int, None]:
+        """
+        Get number of times the waste can be turned back into the stock, None for no limit
+        """
+        return self.__recycle_limit
+
+    @property
+    def recycled(self) -> int:
+        """
+        Get number of times the waste was turned back into the stock
+        """
+        return self.__recycled
+
+    @property
+    def home_count(self) -> int:
+        """
+        Get number of cards on the foundations
+        """
+        return self.__home
+
+    @property
+    def hidden_count(self) -> int:
+        """
+        Get number of face down cards in the tableau
+        """
+        return self.__hidden_count
+
+    def add_listener(self, listener: Callable[[int, int, int, bool], None]):
+        """
+        Register a callable invoked after every move with the move and whether it turned a card face up
+        :param listener:
+        :return:
+        """
+        self.__listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[int, int, int, bool], None]):
+        """
+        Unregister a listener
+        :param listener:
+        :return:
+        """
+        self.__listeners.remove(listener)
+
+    @staticmethod
+    def is_tableau(pile: int) -> bool:
+        """
+        Check if a pile index is a tableau column
+        :param pile:
+        :return:
+        """
+        return 0 <= pile < GameState.TABLEAU_COUNT
+
+    @staticmethod
+    def is_foundation(pile: int) -> bool:
+        """
+        Check if a pile index is a foundation
+        :param pile:
+        :return:
+        """
+        return GameState.FOUNDATION <= pile < GameState.FOUNDATION + SUIT_COUNT
+
+    @staticmethod
+    def is_stock_move(move: Tuple[int, int, int]) -> bool:
+        """
+        Check if a move draws from the stock or turns the waste back into it
+        :param move: (src, dst, count)
+        :return:
+        """
+        return move[0] == GameState.STOCK or move[1] == GameState.STOCK
+
+    def pile(self, pile: int) -> Union[List[int], Deque[int]]:
+        """
+        Get the cards of a pile, bottom to top
+        :param pile: pile index
+        :return:
+        """
+        if pile < GameState.TABLEAU_COUNT:
+            return self.__tableau[pile]
+        if pile == GameState.STOCK:
+            return self.__stock
+        if pile == GameState.WASTE:
+            return self.__waste
+        suit = pile - GameState.FOUNDATION
+        return list(range(suit * RANK_COUNT, suit * RANK_COUNT + self.__foundations[suit]))
+
+    def size(self, pile: int) -> int:
+        """
+        Get number of cards of a pile
+        :param pile: pile index
+        :return:
+        """
+        if pile < GameState.TABLEAU_COUNT:
+            return len(self.__tableau[pile])
+        if pile == GameState.STOCK:
+            return len(self.__stock)
+        if pile == GameState.WASTE:
+            return len(self.__waste)
+        return self.__foundations[pile - GameState.FOUNDATION]
+
+    def top(self, pile: int) -> Union[int, None]:
+        """
+        Get the top card of a pile
+        :param pile: pile index
+        :return: card code or None if the pile is empty
+        """
+        if pile < GameState.TABLEAU_COUNT:
+            column = self.__tableau[pile]
+            return column[-1] if column else None
+        if pile == GameState.STOCK:
+            return self.__stock[-1] if self.__stock else None
+        if pile == GameState.WASTE:
+            return self.__waste[-1] if self.__waste else None
+        suit = pile - GameState.FOUNDATION
+        value = self.__foundations[suit]
+        return suit * RANK_COUNT + value - 1 if value else None
+
+    def is_face_up(self, pile: int, position: int) -> bool:
+        """
+        Check if the card at a position of a pile is facing up
+        :param pile: pile index
+        :param position: index from the bottom of the pile
+        :return:
+        """
+        if pile < GameState.TABLEAU_COUNT:
+            return position >= self.__hidden[pile]
+        return pile != GameState.STOCK
+
+    def locate(self, card: int) -> Tuple[int, int]:
+        """
+        Find the pile containing a card
+        :param card: card code
+        :return: pile index and position from the bottom of the pile
+        """
+        suit = SUIT_OF[card] - 1
+        if VALUE_OF[card] <= self.__foundations[suit]:
+            return GameState.FOUNDATION + suit, VALUE_OF[card] - 1
+        for pile, column in enumerate(self.__tableau):
+            if card in column:
+                return pile, column.index(card)
+        if card in self.__waste:
+            return GameState.WASTE, self.__waste.index(card)
+        return GameState.STOCK, self.__stock.index(card)
+
+    def is_movable(self, card: int) -> bool:
+        """
+        Check if a card, together with the cards above it, can be picked up
+        :param card: card code
+        :return:
+        """
+        pile, position = self.locate(card)
+        if pile < GameState.TABLEAU_COUNT:
+            column = self.__tableau[pile]
+            if position < self.__hidden[pile]:
+                return False
+            for i in range(position + 1, len(column)):
+                if not can_stack(column[i], column[i - 1]):
+                    return False
+            return True
+        return pile != GameState.STOCK and position == self.size(pile) - 1
+
+    def stock_move(self) -> Union[Tuple[int, int, int], None]:
+        """
+        Get the move clicking the stock makes: drawing from it, or turning the waste back into it once empty
+        :return: move as (src, dst, count) or None if the stock is empty and cannot be refilled
+        """
+        if self.__stock:
+            return GameState.STOCK, GameState.WASTE, min(self.__draw_count, len(self.__stock))
+        if self.__waste and (self.__recycle_limit is None or self.__recycled < self.__recycle_limit):
+            return GameState.WASTE, GameState.STOCK, len(self.__waste)
+        return None
+
+    def talon_reach(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int, int]]]:
+        """
+        Get the stock and waste cards that stock moves alone can bring on top of the waste: the cards drawn
+        until the stock is empty, then, if the waste can be turned over, during one more pass
+        :return: list of (card, steps) in drawing order, and the stock moves of which the first steps bring
+        the card on top
+        """
+        order = list(self.__waste)
+        order.extend(reversed(self.__stock))
+        drawn = len(self.__waste)
+        recycles = None if self.__recycle_limit is None else self.__recycle_limit - self.__recycled
+
+        reach = [(order[drawn - 1], 0)] if drawn else []
+        seen = {reach[0][0]} if reach else set()
+        moves = []
+        passes = 0
+        while True:
+            if drawn < len(order):
+                count = min(self.__draw_count, len(order) - drawn)
+                moves.append((GameState.STOCK, GameState.WASTE, count))
+                drawn += count
+                if order[drawn - 1] not in seen:
+                    seen.add(order[drawn - 1])
+                    reach.append((order[drawn - 1], len(moves)))
+            elif drawn and passes == 0 and (recycles is None or recycles > 0):
+                moves.append((GameState.WASTE, GameState.STOCK, drawn))
+                drawn = 0
+                passes += 1
+            else:
+                return reach, moves
+
+    def can_move(self, src: int, dst: int, count: int) -> bool:
+        """
+        Check if the top count cards of a pile can be moved to another pile
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return:
+        """
+        if src == GameState.STOCK or dst == GameState.STOCK:
+            return (src, dst, count) == self.stock_move()
+        if src == dst or dst == GameState.WASTE or count < 1 or count > self.size(src):
+            return False
+        if src < GameState.TABLEAU_COUNT:
+            column = self.__tableau[src]
+            if len(column) - count < self.__hidden[src]:
+                return False
+            for i in range(len(column) - count + 1, len(column)):
+                if not can_stack(column[i], column[i - 1]):
+                    return False
+            card = column[-count]
+        elif count == 1:
+            card = self.top(src)
+        else:
+            return False
+
+        if dst < GameState.TABLEAU_COUNT:
+            column = self.__tableau[dst]
+            if not column:
+                return VALUE_OF[card] == RANK_COUNT
+            return can_stack(card, column[-1])
+        suit = dst - GameState.FOUNDATION
+        return count == 1 and SUIT_OF[card] - 1 == suit and self.__foundations[suit] == VALUE_OF[card] - 1
+
+    def move(self, src: int, dst: int, count: int) -> bool:
+        """
+        Move the top count cards of a pile to another pile. The move must be legal
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return: True if a tableau card was turned face up by the move
+        """
+        flipped = self.__apply(src, dst, count)
+        for listener in self.__listeners:
+            listener(src, dst, count, flipped)
+        return flipped
+
+    def __apply(self, src: int, dst: int, count: int) -> bool:
+        """
+        Update the piles for a move
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return: True if a tableau card was turned face up by the move
+        """
+        if src == GameState.STOCK:
+            for _ in range(count):
+                self.__waste.append(self.__stock.pop())
+            return False
+        if dst == GameState.STOCK:
+            self.__stock.extend(reversed(self.__waste))
+            self.__waste.clear()
+            self.__recycled += 1
+            return False
+
+        if src < GameState.TABLEAU_COUNT:
+            column = self.__tableau[src]
+            cards = column[-count:]
+            del column[-count:]
+        elif src == GameState.WASTE:
+            cards = [self.__waste.pop()]
+        else:
+            cards = [self.top(src)]
+            self.__foundations[src - GameState.FOUNDATION] -= 1
+            self.__home -= 1
+
+        if dst < GameState.TABLEAU_COUNT:
+            self.__tableau[dst].extend(cards)
+        else:
+            self.__foundations[dst - GameState.FOUNDATION] += 1
+            self.__home += 1
+
+        if src < GameState.TABLEAU_COUNT and self.__hidden[src] and self.__hidden[src] == len(self.__tableau[src]):
+            self.__hidden[src] -= 1
+            self.__hidden_count -= 1
+            return True
+        return False
+
+    def revert(self, src: int, dst: int, count: int, flipped: bool):
+        """
+        Undo a move, the last one applied to the state. Listeners are called with the reverse move
+        :param src: source pile index of the undone move
+        :param dst: destination pile index of the undone move
+        :param count: number of cards
+        :param flipped: value returned by move when the move was made
+        :return:
+        """
+        self.__unapply(src, dst, count, flipped)
+        for listener in self.__listeners:
+            listener(dst, src, count, flipped)
+
+    def __unapply(self, src: int, dst: int, count: int, flipped: bool):
+        """
+        Update the piles to undo a move
+        :param src: source pile index of the undone move
+        :param dst: destination pile index of the undone move
+        :param count: number of cards
+        :param flipped: True if the move turned a tableau card face up
+        :return:
+        """
+        if src == GameState.STOCK:
+            for _ in range(count):
+                self.__stock.append(self.__waste.pop())
+            return
+        if dst == GameState.STOCK:
+            self.__waste.extend(reversed(self.__stock))
+            self.__stock.clear()
+            self.__recycled -= 1
+            return
+
+        if flipped:
+            self.__hidden[src] += 1
+            self.__hidden_count += 1
+
+        if dst < GameState.TABLEAU_COUNT:
+            column = self.__tableau[dst]
+            cards = column[-count:]
+            del column[-count:]
+        else:
+            cards = [self.top(dst)]
+            self.__foundations[dst - GameState.FOUNDATION] -= 1
+            self.__home -= 1
+
+        if src < GameState.TABLEAU_COUNT:
+            self.__tableau[src].extend(cards)
+        elif src == GameState.WASTE:
+            self.__waste.append(cards[0])
+        else:
+            self.__foundations[src - GameState.FOUNDATION] += 1
+            self.__home += 1
+
+    def cycle_stock(self) -> bool:
+        """
+        Draw from the stock, or turn the waste back into it once empty
+        :return: True if a stock move was made
+        """
+        move = self.stock_move()
+        if move is None:
+            return False
+        self.move(*move)
+        return True
+
+    def drop_move(self, card: int, dst: int) -> Union[Tuple[int, int, int], None]:
+        """
+        Get the move that drops a card, together with the cards above it, on a pile
+        :param card: card code
+        :param dst: destination pile index
+        :return: move as (src, dst, count) or None if illegal
+        """
+        src, position = self.locate(card)
+        move = (src, dst, self.size(src) - position)
+        if not self.can_move(*move):
+            return None
+        return move
+
+    def is_won(self) -> bool:
+        """
+        Check if all cards are on the foundations
+        :return:
+        """
+        return self.__home == CARD_COUNT
+
+    def all_revealed(self) -> bool:
+        """
+        Check if every tableau card is facing up
+        :return:
+        """
+        return self.__hidden_count == 0
+
+    def key(self) -> bytes:
+        """
+        Get a compact hashable representation of the state
+        :return:
+        """
+        # Without a limit the number of recycles makes no difference
+        recycled = self.__recycled if self.__recycle_limit is not None else 0
+        parts = [bytes(self.__foundations), bytes(self.__hidden), bytes(self.__stock), bytes(self.__waste),
+                 bytes([recycled])]
+        parts.extend(bytes(column) for column in self.__tableau)
+        return b'\xff'.join(parts)
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+import time
+
+from PyQt6.QtCore import QRect, QRectF, Qt
+from PyQt6.QtCore import pyqtSlot as QSlot
+from PyQt6.QtGui import QBrush, QColor, QPainter, QPaintEvent, QPixmap, QResizeEvent
+from PyQt6.QtWidgets import QGraphicsView, QWidget
+
+from FrameMeter import FrameMeter
+
+
+class GameView(QGraphicsView):
+    """
+    Graphics view of the board, timing its frames when a FrameMeter is attached
+
+    The tiled background texture is rendered once into a pixmap covering the visible area at the device
+    resolution, and drawn from it with a plain copy of the exposed part. The pixmap is rendered again only
+    when the view is resized or zoomed, or scrolled to an area it does not cover. It never covers more than
+    the viewport, so its size follows the window and not the zoom.
+
+    With a meter, the statistics of the last interval are drawn over the top left corner of the view.
+    """
+    OVERLAY = QRect(0, 0, 320, 22)
+
+    def __init__(self, parent: QWidget = None):
+        """
+        Constructor
+        :param parent: is passed to base Qt class
+        """
+        super().__init__(parent)
+        self.__meter = None
+        self.__texture = None
+        self.__background = None
+        self.__background_area = QRectF()
+        self.__background_scale = 0.0
+
+    def set_background(self, texture: QPixmap):
+        """
+        Set the texture tiled over the background
+        :param texture:
+        :return:
+        """
+        self.__texture = texture
+        self.__background = None
+        self.resetCachedContent()
+
+    def __render_background(self, scale: float):
+        """
+        Render the background of the visible area at a device scale
+        :param scale: device pixels per scene unit
+        :return:
+        """
+        # The margin absorbs exposed areas rounded out to whole device pixels
+        margin = 2.0
+        area = self.mapToScene(self.viewport().rect()).boundingRect().adjusted(-margin, -margin, margin, margin)
+        self.__background = QPixmap(math.ceil(area.width() * scale), math.ceil(area.height() * scale))
+        painter = QPainter(self.__background)
+        painter.scale(scale, scale)
+        painter.translate(-area.topLeft())
+        painter.fillRect(area, QBrush(self.__texture))
+        painter.end()
+        self.__background_area = area
+        self.__background_scale = scale
+
+    def drawBackground(self, painter: QPainter, rect: QRectF) -> None:
+        """
+        Draw the exposed part of the pre-rendered background
+        :param painter:
+        :param rect: exposed area, in scene coordinates
+        :return:
+        """
+        if self.__texture is None:
+            super().drawBackground(painter, rect)
+            return
+        scale = self.transform().m11() * self.devicePixelRatioF()
+        if self.__background is None or scale != self.__background_scale or \
+                not self.__background_area.contains(rect):
+            self.__render_background(scale)
+        source = QRectF((rect.topLeft() - self.__background_area.topLeft()) * scale, rect.size() * scale)
+        painter.drawPixmap(rect, self.__background, source)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        """
+        Handle resize events, dropping the background rendered for the previous size
+        :param event:
+        :return:
+        """
+        self.__background = None
+        super().resizeEvent(event)
+
+    @property
+    def meter(self) -> FrameMeter:
+        """
+        Get the frame meter, None when frames are not measured
+        """
+        return self.__meter
+
+    def set_meter(self, meter: FrameMeter):
+        """
+        Start measuring frames
+        :param meter:
+        :return:
+        """
+        self.__meter = meter
+        meter.updated.connect(self.refresh_overlay)
+
+    @QSlot(str)
+    def refresh_overlay(self, summary: str):
+        """
+        QSlot repainting the statistics overlay
+        :param summary:
+        :return:
+        """
+        self.viewport().update(GameView.OVERLAY)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """
+        Handle paint events, timing them if a meter is attached
+        :param event:
+        :return:
+        """
+        if self.__meter is None:
+            super().paintEvent(event)
+            return
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.__meter.add(time.perf_counter() - start)
+
+    def drawForeground(self, painter: QPainter, rect: QRectF) -> None:
+        """
+        Draw the statistics overlay in view coordinates
+        :param painter:
+        :param rect:
+        :return:
+        """
+        super().drawForeground(painter, rect)
+        if self.__meter is None:
+            return
+        painter.save()
+        painter.resetTransform()
+        painter.fillRect(GameView.OVERLAY, QColor(0, 0, 0, 160))
+        painter.setPen(Qt.GlobalColor.white)
+        painter.drawText(
+            GameView.OVERLAY.adjusted(6, 0, 0, 0), Qt.AlignmentFlag.AlignVCenter, self.__meter.summary
+        )
+        painter.restore()
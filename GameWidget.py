@@ -1,48 +1,382 @@
 from __future__ import annotations
 
-from PyQt6.QtCore import QRectF
+from itertools import islice
+from typing import Union
+
+from PyQt6.QtCore import QEvent, QRectF, Qt, QTimer
+from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtCore import pyqtSlot as QSlot
-from PyQt6.QtGui import QPixmap, QBrush
-from PyQt6.QtWidgets import QWidget, QGraphicsView, QGraphicsScene, QMessageBox
+from PyQt6.QtGui import QPixmap, QBrush, QColor, QKeySequence, QPen, QShortcut, QTransform
+from PyQt6.QtWidgets import QWidget, QGraphicsScene, QGraphicsRectItem, QMessageBox
 
 from AbstractDrawable import AbstractDrawable
+from Animator import Animator
+from CardWidget import CardWidget
+from Deal import Deal
 from DeckWidget import DeckWidget
 from DrawDeck import DrawDeck
+from DropIndex import DropIndex
+from FrameMeter import FrameMeter
+from GameState import GameState
+from GameView import GameView
+from MoveGenerator import HintEngine, completion
+from MoveLog import MoveLog
 from PileWidget import PileWidget
+from PixmapCache import PixmapCache
+from RenderProfile import RenderProfile
+from SaveGame import Autosave, SavedGame
+from StateTracker import StateTracker
+from StockWidget import StockWidget
 
 
 class GameWidget(QWidget, AbstractDrawable):
     """
     Game window class
     """
+    AUTO_COMPLETE_INTERVAL = 40
+    DEAL_STAGGER = 12
+
+    moved = QSignal(int, int, int)
+    undone = QSignal()
+    redone = QSignal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, deal: Deal = None, saved: SavedGame = None, autosave: Autosave = None,
+                 profile: RenderProfile = None, meter: FrameMeter = None, draw_count: int = 1,
+                 recycle_limit: Union[int, None] = None):
         """
         Constructor. Initialize containing items
         :param parent: is passed to base Qt class
-        """
+        :param deal: order of the cards, a randomly seeded deal if None
+        :param saved: game to resume, replaces deal and the rules
+        :param autosave: writer receiving the game after every move, None to disable autosave
+        :param profile: rendering settings, the default profile if None
+        :param meter: frame statistics of the view, None to not measure frames
+        :param draw_count: number of cards turned over by a draw, 1 or 3
+        :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
+        """
+        if saved is not None:
+            deal = saved.deal
+            draw_count, recycle_limit = saved.state.draw_count, saved.state.recycle_limit
 
         super(QWidget, self).__init__(parent=parent)
         super(AbstractDrawable, self).__init__()
 
-        self.__graphics_view = QGraphicsView(self)
+        self.__graphics_view = GameView(self)
+        self.__profile = profile if profile is not None else RenderProfile.named('default')
+        self.__meter = meter
         self.__scene = QGraphicsScene(self)
-        self.__draw_deck = DrawDeck(self)
-
-        self.__deck_containers = [DeckWidget(parent=self, x=340 + 110 * i, y=200) for i in range(7)]
-        self.__pile_containers = [PileWidget(parent=self, x=340 + 110 * (4 + i), y=50) for i in range(4)]
-
-        self.__draw_container = DeckWidget(parent=self, x=50, y=50)
+        self.__animator = Animator(self)
+        self.__draw_deck = DrawDeck(self, deal)
+
+        self.__state = GameState(draw_count, recycle_limit)
+        self.__tracker = StateTracker(self.__state)
+        self.__history = MoveLog()
+        self.__saved = saved
+        self.__autosave = autosave
+        self.__cards = {}
+        self.__zoom = 1.0
+
+        self.__deck_containers = [DeckWidget(parent=self, x=340 + 110 * i, y=200, index=i) for i in range(7)]
+        self.__pile_containers = [
+            PileWidget(parent=self, x=340 + 110 * (4 + i), y=50, index=GameState.FOUNDATION + i) for i in range(4)
+        ]
+
+        self.__draw_container = StockWidget(parent=self, x=50, y=50, index=GameState.STOCK)
+        # Draw-3 shows the three cards turned over, draw-1 only the playable one
+        self.__waste_container = PileWidget(parent=self, x=160, y=50, index=GameState.WASTE, fan=draw_count)
+
+        self.__containers = self.__deck_containers + self.__pile_containers + [
+            self.__draw_container, self.__waste_container
+        ]
+        self.__drop_index = DropIndex(pitch=110, margin=17.5)
+
+        self.__hint_frames = [QGraphicsRectItem(), QGraphicsRectItem()]
+        self.__hint_timer = QTimer(self)
+        self.__hints = HintEngine()
+        self.__completion = []
+        self.__completion_timer = QTimer(self)
+        self.__stuck_position = None
 
     def container(self, card):
         """
         Returns the container in which the card exists
         :param card:
         """
-        for cont in self.deck_containers:
-            if cont.root_card is card:
-                return cont
-        return None
+        return self.__containers[self.__state.locate(card.code)[0]]
+
+    def sync(self, pile: int, start: int = None):
+        """
+        Update the cards of a container from the game model. Only the cards after the part the container
+        already shows, and the card below them, are touched
+        :param pile: index of the pile in the game model
+        :param start: index of the first card to update, the end of the unchanged part if None
+        :return:
+        """
+        container = self.__containers[pile]
+        codes = self.__state.pile(pile)
+        shown = container.cards
+        if start is None:
+            start = 0
+            for card, code in zip(shown, codes):
+                if card.code != code:
+                    break
+                start += 1
+
+        cards = shown[:start] + [self.__cards[code] for code in islice(codes, start, None)]
+        for position in range(max(start - 1, 0), len(cards)):
+            cards[position].set_face_up(self.__state.is_face_up(pile, position))
+        container.sync(cards, start)
+
+    def sync_container(self, container):
+        """
+        Update the cards of a container from the game model, resetting their positions
+        :param container: DeckWidget or PileWidget
+        :return:
+        """
+        if container is not None:
+            self.sync(container.index, 0)
+
+    def drop(self, card, container) -> bool:
+        """
+        Move a card, together with the cards above it, to a container if the rules allow it
+        :param card:
+        :param container: destination DeckWidget or PileWidget
+        :return: True if the card was moved
+        """
+        move = self.__state.drop_move(card.code, container.index)
+        if move is None:
+            self.sync(self.__state.locate(card.code)[0], 0)
+            return False
+
+        self.play(*move)
+        if self.__tracker.all_revealed and not self.__tracker.won and self.auto_complete(animate=True):
+            return True
+        if GameState.is_foundation(move[1]):
+            self.is_win()
+        if not self.__tracker.won:
+            self.is_stuck()
+        return True
+
+    def play(self, src: int, dst: int, count: int):
+        """
+        Make a legal move, recording it in the history and updating the two containers it changes
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return:
+        """
+        self.clear_hint()
+        flipped = self.__state.move(src, dst, count)
+        self.__history.record(src, dst, count, flipped)
+        self.sync(src)
+        if dst != src:
+            self.sync(dst)
+        self.autosave()
+        self.moved.emit(src, dst, count)
+
+    def cycle_stock(self):
+        """
+        Draw from the stock, or turn the waste back over into it once the stock is empty. Only the cards
+        turned over change containers, the others stay untouched
+        :return:
+        """
+        move = self.__state.stock_move()
+        if move is not None:
+            self.play(*move)
+            self.is_stuck()
+
+    def play_batch(self, moves: list):
+        """
+        Make a sequence of legal moves, updating every container they change once at the end
+        :param moves: list of (src, dst, count) moves
+        :return:
+        """
+        self.clear_hint()
+        changed = set()
+        for src, dst, count in moves:
+            flipped = self.__state.move(src, dst, count)
+            self.__history.record(src, dst, count, flipped)
+            changed.update((src, dst))
+        for pile in changed:
+            self.sync(pile)
+        self.autosave()
+        for move in moves:
+            self.moved.emit(*move)
+
+    def auto_complete(self, animate: bool = False) -> bool:
+        """
+        Send every card to the foundations once the whole tableau is face up
+        :param animate: play the moves one by one on a timer instead of all at once
+        :return: True if the game is being completed
+        """
+        moves = completion(self.__state)
+        if not moves:
+            return False
+        if animate:
+            self.__completion = moves
+            self.__completion_timer.start()
+            return True
+        self.play_batch(moves)
+        self.is_win()
+        return True
+
+    @QSlot()
+    def auto_complete_step(self):
+        """
+        QSlot playing the next move of an animated auto-complete
+        :return:
+        """
+        if self.__completion and self.__state.can_move(*self.__completion[0]):
+            self.play(*self.__completion.pop(0))
+            if self.__completion:
+                return
+        self.__completion = []
+        self.__completion_timer.stop()
+        self.is_win()
+
+    @QSlot()
+    def complete(self):
+        """
+        QSlot completing the game at once, if the whole tableau is face up
+        :return:
+        """
+        self.__completion_timer.stop()
+        self.__completion = []
+        self.auto_complete()
+
+    @QSlot()
+    def hint(self):
+        """
+        QSlot highlighting the suggested move: the cards to move and where to drop them
+        :return:
+        """
+        move = self.__hints.hint(self.__state)
+        if move is None:
+            return
+        self.__animator.finish()
+        src, dst, count = move
+
+        cards = self.__containers[src].cards[-max(count, 1):]
+        source = cards[0].sceneBoundingRect()
+        for card in cards[1:]:
+            source = source.united(card.sceneBoundingRect())
+        self.__hint_frames[0].setRect(source)
+        self.__hint_frames[0].show()
+
+        if not GameState.is_stock_move(move):
+            container = self.__containers[dst]
+            target = container.cards[-1] if container.cards else container
+            self.__hint_frames[1].setRect(target.sceneBoundingRect())
+            self.__hint_frames[1].show()
+        self.__hint_timer.start()
+
+    @QSlot()
+    def clear_hint(self):
+        """
+        QSlot hiding the highlight of the suggested move
+        :return:
+        """
+        self.__hint_timer.stop()
+        for frame in self.__hint_frames:
+            frame.hide()
+
+    @QSlot()
+    def undo(self):
+        """
+        QSlot reverting the last move, interrupting an animated auto-complete
+        :return:
+        """
+        self.clear_hint()
+        self.__completion_timer.stop()
+        self.__completion = []
+        move = self.__history.undo()
+        if move is None:
+            return
+        src, dst, _, _ = move
+        self.__state.revert(*move)
+        self.sync(dst)
+        if dst != src:
+            self.sync(src)
+        self.autosave()
+        self.undone.emit()
+
+    @QSlot()
+    def redo(self):
+        """
+        QSlot playing the last undone move again, interrupting an animated auto-complete
+        :return:
+        """
+        self.clear_hint()
+        self.__completion_timer.stop()
+        self.__completion = []
+        move = self.__history.redo()
+        if move is None:
+            return
+        src, dst, count, _ = move
+        self.__state.move(src, dst, count)
+        self.sync(src)
+        if dst != src:
+            self.sync(dst)
+        self.autosave()
+        self.redone.emit()
+        if GameState.is_foundation(dst):
+            self.is_win()
+
+    def autosave(self):
+        """
+        Hand the current game over to the autosave writer, if any
+        :return:
+        """
+        if self.__autosave is not None:
+            self.__autosave.submit(SavedGame(self.deal, self.__state, self.__history).to_bytes())
+
+    def zoom(self, factor: float):
+        """
+        Scale the view, rendering card images at the new resolution
+        :param factor: view scale
+        :return:
+        """
+        self.__zoom = min(max(factor, 0.25), 4.0)
+        self.__graphics_view.setTransform(QTransform.fromScale(self.__zoom, self.__zoom))
+        self.update_render_scale()
+
+    @QSlot()
+    def zoom_in(self):
+        """
+        QSlot for enlarging the view
+        :return:
+        """
+        self.zoom(self.__zoom * 1.25)
+
+    @QSlot()
+    def zoom_out(self):
+        """
+        QSlot for shrinking the view
+        :return:
+        """
+        self.zoom(self.__zoom / 1.25)
+
+    def update_render_scale(self):
+        """
+        Switch card images to the resolution of the current zoom and device pixel ratio
+        :return:
+        """
+        if CardWidget.pixmaps.current.ratio == PixmapCache.bucket(self.__zoom, self.devicePixelRatioF()):
+            return
+        CardWidget.set_render_scale(self.__zoom, self.devicePixelRatioF())
+        for card in self.__cards.values():
+            card.refresh()
+        CardWidget.prefetch_card_faces()
+
+    def event(self, event: QEvent) -> bool:
+        """
+        Handle widget events, following device pixel ratio changes when moved between screens
+        :param event:
+        :return:
+        """
+        if event.type() in (QEvent.Type.DevicePixelRatioChange, QEvent.Type.Show):
+            self.update_render_scale()
+        return super().event(event)
 
     def realign_piles(self):
         """
@@ -54,36 +388,68 @@ class GameWidget(QWidget, AbstractDrawable):
 
     def nearest_deck(self, card):
         """
-        Find the nearest deck in which the card could be placed
+        Find the container under the centre of a card
         :param card:
         """
-        best_match = None
-        for deck in self.__deck_containers:
+        centre = card.sceneBoundingRect().center()
+        return self.__drop_index.find(centre.x(), centre.y())
 
-            if deck.x() != deck.leaf.x():
-                continue
+    @property
+    def state(self) -> GameState:
+        """
+        Get the game model
+        """
+        return self.__state
 
-            if deck.intersects(card) and not deck.ignored:
-                if best_match is None:
-                    best_match = deck
-                else:
+    @property
+    def tracker(self) -> StateTracker:
+        """
+        Get the derived game state
+        """
+        return self.__tracker
 
-                    midpoint_card = card.pos().x() + card.boundingRect().width() / 2
-                    midpoint_best_match = best_match.leaf.pos().x() + best_match.leaf.boundingRect().width() / 2
-                    midpoint_deck = deck.leaf.pos().x() + deck.leaf.boundingRect().width() / 2
+    @property
+    def view(self) -> GameView:
+        """
+        Get the graphics view of the board
+        """
+        return self.__graphics_view
 
-                    if abs(midpoint_deck - midpoint_card) < abs(midpoint_best_match - midpoint_card):
-                        best_match = deck
+    @property
+    def animator(self) -> Animator:
+        """
+        Get the scheduler of card movements
+        """
+        return self.__animator
 
-        return best_match
+    @property
+    def history(self) -> MoveLog:
+        """
+        Get the moves played so far
+        """
+        return self.__history
+
+    @property
+    def deal(self) -> Deal:
+        """
+        Get the deal of the game
+        """
+        return self.__draw_deck.deal
 
     @property
-    def draw_container(self):
+    def draw_container(self) -> StockWidget:
         """
-        Get draw_container
+        Get the stock container
         """
         return self.__draw_container
 
+    @property
+    def waste_container(self) -> PileWidget:
+        """
+        Get the waste container
+        """
+        return self.__waste_container
+
     @property
     def scene(self):
         """
@@ -121,6 +487,10 @@ class GameWidget(QWidget, AbstractDrawable):
             self.__scene.addItem(container)
 
         self.__scene.addItem(self.__draw_container)
+        self.__scene.addItem(self.__waste_container)
+
+        for frame in self.__hint_frames:
+            self.__scene.addItem(frame)
 
         return self
 
@@ -129,7 +499,20 @@ class GameWidget(QWidget, AbstractDrawable):
         Set custom properties to drawable items
         :return self:
         """
-        self.__scene.setBackgroundBrush(QBrush(QPixmap('images/background.png')))
+        self.__graphics_view.set_background(QPixmap('images/background.png'))
+
+        for frame in self.__hint_frames:
+            frame.setPen(QPen(QColor(255, 215, 0), 3))
+            frame.setBrush(QBrush(Qt.BrushStyle.NoBrush))
+            frame.setZValue(20000)
+            frame.hide()
+        self.__profile.apply_view(self.__graphics_view)
+        if self.__meter is not None:
+            self.__graphics_view.set_meter(self.__meter)
+
+        self.__hint_timer.setSingleShot(True)
+        self.__hint_timer.setInterval(1500)
+        self.__completion_timer.setInterval(GameWidget.AUTO_COMPLETE_INTERVAL)
 
         return self
 
@@ -139,6 +522,14 @@ class GameWidget(QWidget, AbstractDrawable):
         :return self:
         """
         # PileWidget.check_win.connect(self.is_win)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.ZoomIn), self).activated.connect(self.zoom_in)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.ZoomOut), self).activated.connect(self.zoom_out)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Undo), self).activated.connect(self.undo)
+        QShortcut(QKeySequence(QKeySequence.StandardKey.Redo), self).activated.connect(self.redo)
+        QShortcut(QKeySequence('H'), self).activated.connect(self.hint)
+        self.__hint_timer.timeout.connect(self.clear_hint)
+        QShortcut(QKeySequence('A'), self).activated.connect(self.complete)
+        self.__completion_timer.timeout.connect(self.auto_complete_step)
         return self
 
     def init(self) -> AbstractDrawable:
@@ -156,24 +547,37 @@ class GameWidget(QWidget, AbstractDrawable):
         for container in self.__pile_containers:
             container.init()
 
-        for cards_for_deck, deck_container in enumerate(self.__deck_containers, 1):
-            while cards_for_deck > 0:
-                cards_for_deck -= 1
-                card = self.__draw_deck.draw()
-                deck_container.add_card(card)
-                self.scene.addItem(card)
-
-        for deck_container in self.__deck_containers:
-            deck_container.root_card.reveal_leaf()
-
         self.__draw_container.init()
-
-        for _ in range(len(self.__draw_deck.cards)):
+        self.__waste_container.init()
+
+        for container in self.__containers:
+            self.__drop_index.add(container, container.x(), container.y(), container.rect().width())
+
+        if self.__saved is not None:
+            self.__state = self.__saved.state
+            self.__history = self.__saved.history
+            self.__saved = None
+        else:
+            self.__state = GameState.deal(
+                self.__draw_deck.codes, self.__state.draw_count, self.__state.recycle_limit
+            )
+            self.__history.clear()
+        self.__tracker.detach()
+        self.__tracker = StateTracker(self.__state)
+
+        while self.__draw_deck.cards:
             card = self.__draw_deck.draw()
-            self.__draw_container.add_card(card)
+            self.__cards[card.code] = card
+            card.setPos(self.__draw_container.pos())
             self.scene.addItem(card)
+        self.__profile.apply_items(self.__cards.values())
 
-        self.__draw_container.root_card.reveal_leaf()
+        with self.__animator.stagger(GameWidget.DEAL_STAGGER):
+            for pile in range(GameState.PILE_COUNT):
+                self.sync(pile)
+
+        CardWidget.prefetch_card_faces()
+        self.autosave()
 
         return self
 
@@ -185,45 +589,25 @@ class GameWidget(QWidget, AbstractDrawable):
         for i, deck in enumerate(self.deck_containers):
             print(f'{i} : {deck.stupid_print()}')
 
-    def update_deck_leaf(self, root_card, new_leaf):
-        """
-        Update the leaf(last card) of a deck based by root_card
-        :param root_card:
-        :param new_leaf:
-        """
-        for deck in self.deck_containers:
-            deck.update_leaf(root_card, new_leaf)
-
-    def do_draw_deck_cleanup(self, card):
-        """
-        Clean draw container node references to avoid unexpected behaviour
-        :param card:
-        :return:
-        """
-        node = self.__draw_container.root_card
-        last = None
-        do_clean = False
-        while node is not None:
-            if node is card:
-                do_clean = True
-            last = node
-            node = node.leaf
-
-        if do_clean:
-            self.__draw_container.leaf = last
-
     def is_win(self):
         """
         Determine if game is completed
         :return:
         """
-        won = True
-        for pile in self.__pile_containers:
-            if pile.count != 13:
-                won = False
-        # won = True
-        if won is True:
+        if self.__tracker.won:
             QMessageBox().information(self, "Game won", "Congratulations. You won")
 
-
-
+    def is_stuck(self):
+        """
+        Determine if no card can be moved anymore. Stock moves leave the tableau and foundations as they are,
+        so a stuck game is only reported once for them
+        :return:
+        """
+        if not self.__tracker.no_moves_left:
+            return
+        state = self.__state
+        position = ([column[:] for column in state.tableau], state.hidden[:], state.foundations[:])
+        if position == self.__stuck_position:
+            return
+        self.__stuck_position = position
+        QMessageBox().information(self, "Game over", "No moves left")
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import atexit
+import functools
+import importlib
+import math
+import sys
+import time
+from typing import Callable, Dict, List, TextIO, Tuple, Union
+
+# Interactive hot paths as (module, class, method)
+HOT_PATHS = [
+    ('CardWidget', 'CardWidget', 'mousePressEvent'),
+    ('CardWidget', 'CardWidget', 'mouseMoveEvent'),
+    ('CardWidget', 'CardWidget', 'mouseReleaseEvent'),
+    ('CardWidget', 'CardWidget', 'mouseDoubleClickEvent'),
+    ('CardWidget', 'CardWidget', 'release_to'),
+    ('CardWidget', 'CardWidget', 'release_to_pile'),
+    ('GameWidget', 'GameWidget', 'nearest_deck'),
+    ('GameWidget', 'GameWidget', 'drop'),
+    ('GameWidget', 'GameWidget', 'cycle_stock'),
+    ('GameWidget', 'GameWidget', 'sync'),
+    ('GameWidget', 'GameWidget', 'realign_piles'),
+    ('DeckWidget', 'DeckWidget', 'reset'),
+    ('PileWidget', 'PileWidget', 'reset'),
+]
+
+
+class Histogram:
+    """
+    Latency histogram with logarithmic buckets
+
+    Bucket i holds the durations between GROWTH**i and GROWTH**(i+1) nanoseconds, so percentiles are
+    within 5% of the exact value whatever the magnitude, and recording a sample costs one logarithm.
+    """
+    GROWTH = 1.1
+
+    def __init__(self):
+        """
+        Constructor. Create an empty histogram
+        """
+        self.__buckets: Dict[int, int] = {}
+        self.__count = 0
+        self.__total = 0.0
+        self.__max = 0.0
+
+    @property
+    def count(self) -> int:
+        """
+        Get number of samples
+        """
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        """
+        Get mean duration, in seconds
+        """
+        return self.__total / self.__count if self.__count else 0.0
+
+    @property
+    def max(self) -> float:
+        """
+        Get longest duration, in seconds
+        """
+        return self.__max
+
+    def add(self, seconds: float):
+        """
+        Record a duration
+        :param seconds:
+        :return:
+        """
+        bucket = int(math.log(max(seconds * 1e9, 1.0), Histogram.GROWTH))
+        self.__buckets[bucket] = self.__buckets.get(bucket, 0) + 1
+        self.__count += 1
+        self.__total += seconds
+        if seconds > self.__max:
+            self.__max = seconds
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Get the duration below which a fraction of the samples fall
+        :param fraction: in range 0..1
+        :return: duration in seconds, the geometric middle of its bucket
+        """
+        if not self.__count:
+            return 0.0
+        rank = fraction * self.__count
+        seen = 0
+        for bucket in sorted(self.__buckets):
+            seen += self.__buckets[bucket]
+            if seen >= rank:
+                return min(Histogram.GROWTH ** (bucket + 0.5) / 1e9, self.__max)
+        return self.__max
+
+
+_histograms: Dict[str, Histogram] = {}
+_originals: List[Tuple[type, str, Callable]] = []
+
+
+def enabled() -> bool:
+    """
+    Check if the hot paths are instrumented
+    :return:
+    """
+    return bool(_originals)
+
+
+def histograms() -> Dict[str, Histogram]:
+    """
+    Get the histograms by hot path name
+    :return:
+    """
+    return _histograms
+
+
+def _timed(function: Callable, histogram: Histogram) -> Callable:
+    """
+    Wrap a function to record its durations
+    :param function:
+    :param histogram:
+    :return:
+    """
+    clock = time.perf_counter
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            histogram.add(clock() - start)
+    return wrapper
+
+
+def enable(output: Union[TextIO, None] = sys.stderr):
+    """
+    Time the hot paths from now on. Nothing is measured, nor wrapped, until this is called
+    :param output: stream receiving the report when the program exits, None to not report on exit
+    :return:
+    """
+    if enabled():
+        return
+    for module, class_name, method in HOT_PATHS:
+        cls = getattr(importlib.import_module(module), class_name)
+        name = f'{class_name}.{method}'
+        original = cls.__dict__[method]
+        _histograms[name] = Histogram()
+        _originals.append((cls, method, original))
+        setattr(cls, method, _timed(original, _histograms[name]))
+    if output is not None:
+        atexit.register(dump, output)
+
+
+def disable():
+    """
+    Restore the original hot paths, keeping the measurements
+    :return:
+    """
+    while _originals:
+        cls, method, original = _originals.pop()
+        setattr(cls, method, original)
+
+
+def report() -> str:
+    """
+    Format the measurements as a table, in milliseconds
+    :return:
+    """
+    lines = [f'{"hot path":<36}{"count":>8}{"p50":>9}{"p95":>9}{"p99":>9}{"max":>9}']
+    for name, histogram in _histograms.items():
+        if not histogram.count:
+            continue
+        values = [histogram.percentile(0.5), histogram.percentile(0.95), histogram.percentile(0.99), histogram.max]
+        lines.append(f'{name:<36}{histogram.count:>8}' + ''.join(f'{value * 1000:>9.3f}' for value in values))
+    return '\n'.join(lines)
+
+
+def dump(output: TextIO = sys.stderr):
+    """
+    Write the report
+    :param output:
+    :return:
+    """
+    output.write(report() + '\n')
+    output.flush()
+
+
+def bind(widget, key: str = 'F12'):
+    """
+    Dump the report whenever a key is pressed in a window
+    :param widget: QWidget
+    :param key: key sequence
+    :return: the shortcut
+    """
+    from PyQt6.QtGui import QKeySequence, QShortcut
+
+    shortcut = QShortcut(QKeySequence(key), widget)
+    shortcut.activated.connect(lambda: dump(sys.stderr))
+    return shortcut
@@ -1,8 +1,11 @@
-from PyQt6.QtCore import pyqtSlot as QSlot, Qt
+import importlib
+from typing import Union
+
+from PyQt6.QtCore import pyqtSlot as QSlot, Qt, QTimer
+from PyQt6.QtGui import QCloseEvent, QPaintEvent
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 
 from AbstractDrawable import AbstractDrawable
-from GameWidget import GameWidget
 from MenuWidget import MenuWidget
 
 
@@ -11,10 +14,17 @@ class MainWidget(AbstractDrawable, QWidget):
     Main window class
     """
 
-    def __init__(self, parent: QWidget = None):
+    def __init__(self, parent: QWidget = None, record: str = None, profile: str = 'default', fps: bool = False,
+                 frame_log: str = None, draw_count: int = 1, recycle_limit: Union[int, None] = None):
         """
         Constructor
         :param parent: is passed to base Qt class
+        :param record: file receiving a recording of the game when the window closes, None to not record
+        :param profile: name of the rendering profile of the game
+        :param fps: show frame statistics over the game
+        :param frame_log: file receiving frame statistics every second, None to not log
+        :param draw_count: number of cards turned over by a draw, 1 or 3
+        :param recycle_limit: number of times the waste can be turned back into the stock, None for no limit
         """
         super(AbstractDrawable, self).__init__()
         super(QWidget, self).__init__(parent=parent)
@@ -24,6 +34,15 @@ class MainWidget(AbstractDrawable, QWidget):
 
         self.__menu_widget = MenuWidget(self)
         self.__game_widget = None
+        self.__warm_up_scheduled = False
+        self.__record = record
+        self.__recorder = None
+        self.__profile = profile
+        self.__fps = fps
+        self.__frame_log = frame_log
+        self.__meter = None
+        self.__draw_count = draw_count
+        self.__recycle_limit = recycle_limit
 
     def align_components(self) -> AbstractDrawable:
         """
@@ -54,12 +73,68 @@ class MainWidget(AbstractDrawable, QWidget):
         # self.__game_widget.exited.connect(self.close)
         return self
 
+    def paintEvent(self, event: QPaintEvent) -> None:
+        """
+        Handle paint events, warming up the game once the menu is on screen
+        :param event:
+        :return:
+        """
+        super().paintEvent(event)
+        if not self.__warm_up_scheduled:
+            self.__warm_up_scheduled = True
+            QTimer.singleShot(0, self.warm_up)
+
+    @QSlot()
+    def warm_up(self) -> None:
+        """
+        QSlot for importing the game subsystem and loading card images while the menu is idle: the atlas of the
+        first game frame and its card background are loaded now, the faces are rendered on an idle timer
+        :return:
+        """
+        from CardWidget import CardWidget
+        importlib.import_module('GameWidget')
+
+        CardWidget.warm_up_card_images(self.devicePixelRatioF())
+
     @QSlot()
     def started(self) -> None:
         """
-        QSlot for handling start signal
+        QSlot for handling start signal, resuming the autosaved game if it is not finished and has the same rules
         :return:
         """
-        self.__game_widget = GameWidget(self)
+        from GameWidget import GameWidget
+        from FrameMeter import FrameMeter
+        from RenderProfile import RenderProfile
+        from SaveGame import Autosave, SavedGame
+
+        path = SavedGame.default_path()
+        saved = SavedGame.load(path)
+        if saved is not None and (saved.state.is_won() or saved.state.draw_count != self.__draw_count or
+                                  saved.state.recycle_limit != self.__recycle_limit):
+            saved = None
+
+        if self.__fps or self.__frame_log is not None:
+            self.__meter = FrameMeter(self, self.__frame_log)
+
+        self.__game_widget = GameWidget(
+            self, saved=saved, autosave=Autosave(path), profile=RenderProfile.named(self.__profile), meter=self.__meter,
+            draw_count=self.__draw_count, recycle_limit=self.__recycle_limit
+        )
         self.__game_widget.init()
         self.__main_layout.addWidget(self.__game_widget)
+
+        if self.__record is not None:
+            from Replay import Recorder
+            self.__recorder = Recorder(self.__game_widget)
+
+    def closeEvent(self, event: QCloseEvent) -> None:
+        """
+        Handle close events, saving the recording of the game and closing the frame log if requested
+        :param event:
+        :return:
+        """
+        if self.__recorder is not None:
+            self.__recorder.recording.save(self.__record)
+        if self.__meter is not None:
+            self.__meter.close()
+        super().closeEvent(event)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from typing import List, Tuple, Union
+
+from GameState import CARD_COUNT, GameState, RANK_COUNT, SUIT_OF, VALUE_OF, can_stack
+from Solver import Solver
+
+# Cards each card can be placed on in the tableau: the two cards of the other colour one rank higher
+TARGETS = [tuple(onto for onto in range(CARD_COUNT) if can_stack(card, onto)) for card in range(CARD_COUNT)]
+
+# Foundation pile receiving each card
+FOUNDATION_OF = [GameState.FOUNDATION + SUIT_OF[card] - 1 for card in range(CARD_COUNT)]
+
+# Run extension table: STACKS[card * CARD_COUNT + below] is True if card may lie on below
+STACKS = [can_stack(card, below) for card in range(CARD_COUNT) for below in range(CARD_COUNT)]
+
+
+def legal_moves(state: GameState) -> List[Tuple[int, int, int]]:
+    """
+    Enumerate every legal move of a position: tableau runs to the tableau, top cards to the foundations,
+    the waste card anywhere, foundation cards back to the tableau, and drawing from or refilling the stock
+    :param state:
+    :return: list of (src, dst, count) moves
+    """
+    moves = []
+    tableau = state.tableau
+    hidden = state.hidden
+    foundations = state.foundations
+
+    tops = {}
+    empty = []
+    for index, column in enumerate(tableau):
+        if column:
+            tops[column[-1]] = index
+        else:
+            empty.append(index)
+
+    for src, column in enumerate(tableau):
+        if not column:
+            continue
+        card = column[-1]
+        if foundations[SUIT_OF[card] - 1] == VALUE_OF[card] - 1:
+            moves.append((src, FOUNDATION_OF[card], 1))
+
+        position = len(column) - 1
+        while True:
+            card = column[position]
+            count = len(column) - position
+            for onto in TARGETS[card]:
+                dst = tops.get(onto)
+                if dst is not None:
+                    moves.append((src, dst, count))
+            if VALUE_OF[card] == RANK_COUNT:
+                moves.extend((src, dst, count) for dst in empty)
+            if position == hidden[src] or not STACKS[card * CARD_COUNT + column[position - 1]]:
+                break
+            position -= 1
+
+    waste = state.waste
+    if waste:
+        card = waste[-1]
+        if foundations[SUIT_OF[card] - 1] == VALUE_OF[card] - 1:
+            moves.append((GameState.WASTE, FOUNDATION_OF[card], 1))
+        for onto in TARGETS[card]:
+            dst = tops.get(onto)
+            if dst is not None:
+                moves.append((GameState.WASTE, dst, 1))
+        if VALUE_OF[card] == RANK_COUNT:
+            moves.extend((GameState.WASTE, dst, 1) for dst in empty)
+
+    for suit, value in enumerate(foundations):
+        if not value:
+            continue
+        card = suit * RANK_COUNT + value - 1
+        for onto in TARGETS[card]:
+            dst = tops.get(onto)
+            if dst is not None:
+                moves.append((GameState.FOUNDATION + suit, dst, 1))
+        if value == RANK_COUNT:
+            moves.extend((GameState.FOUNDATION + suit, dst, 1) for dst in empty)
+
+    move = state.stock_move()
+    if move is not None:
+        moves.append(move)
+    return moves
+
+
+def score(state: GameState, move: Tuple[int, int, int]) -> int:
+    """
+    Rate how useful a move looks, without searching
+    :param state:
+    :param move:
+    :return: higher is better
+    """
+    src, dst, count = move
+    if GameState.is_stock_move(move):
+        return 1
+    if GameState.is_foundation(src):
+        return 0
+    if GameState.is_tableau(src):
+        position = state.size(src) - count
+        if position and position == state.hidden[src]:
+            # Turns a face down card up
+            return 6 + state.hidden[src]
+        if position == 0 and not GameState.is_foundation(dst):
+            # Only moves a king between empty columns, or empties a column for nothing better
+            return 0 if VALUE_OF[state.pile(src)[0]] == RANK_COUNT else 3
+        if GameState.is_foundation(dst):
+            return 5
+        return 2
+    return 5 if GameState.is_foundation(dst) else 4
+
+
+def completion(state: GameState) -> Union[List[Tuple[int, int, int]], None]:
+    """
+    Get the moves sending every card to the foundations once the tableau is fully revealed. Each face up
+    column is then a single run with its lowest card on top, and stock cards are drawn as needed
+    :param state:
+    :return: list of moves, None if some tableau card is still face down or a stock card cannot be reached
+    """
+    if not state.all_revealed():
+        return None
+    state = state.copy()
+    moves = []
+    # Two passes over the stock without playing a card mean the remaining ones are out of reach
+    idle = 0
+    while not state.is_won():
+        progress = False
+        for src in range(GameState.TABLEAU_COUNT):
+            card = state.top(src)
+            if card is not None and state.foundations[SUIT_OF[card] - 1] == VALUE_OF[card] - 1:
+                moves.append((src, FOUNDATION_OF[card], 1))
+                state.move(*moves[-1])
+                progress = True
+        if progress:
+            idle = 0
+            continue
+
+        card = state.top(GameState.WASTE)
+        if card is not None and state.foundations[SUIT_OF[card] - 1] == VALUE_OF[card] - 1:
+            moves.append((GameState.WASTE, FOUNDATION_OF[card], 1))
+            idle = 0
+        else:
+            move = state.stock_move()
+            idle += 1
+            if move is None or idle > 2 * (len(state.stock) + len(state.waste) + 1):
+                return None
+            moves.append(move)
+        state.move(*moves[-1])
+    return moves
+
+
+class HintEngine:
+    """
+    Suggest moves to the player
+
+    A short search looks for a winning line; its moves are then suggested one after the other as long as the
+    player follows them, so that the hints lead to the win instead of restarting from a different line at
+    every position. Without a winning line the best rated legal move is suggested. Hints are asked for on the
+    UI thread, so the default search only lasts a few milliseconds and a position it failed on is not
+    searched again.
+    """
+    FAILED_LIMIT = 4096
+
+    def __init__(self, solver: Solver = None):
+        """
+        Constructor
+        :param solver: solver used for the searches, a small budget one if None
+        """
+        self.__solver = solver if solver is not None else Solver(max_nodes=2000, time_limit=0.005)
+        self.__line: List[Tuple[int, int, int]] = []
+        self.__positions = {}
+        self.__failed = set()
+
+    def hint(self, state: GameState) -> Union[Tuple[int, int, int], None]:
+        """
+        Find the move to suggest in a position
+        :param state:
+        :return: move as (src, dst, count) or None if the game is won or no move is left
+        """
+        if state.is_won():
+            return None
+        key = state.key()
+        index = self.__positions.get(key)
+        if index is not None:
+            return self.__line[index]
+
+        if key not in self.__failed:
+            result = self.__solver.solve(state)
+            if result.solvable and result.moves:
+                self.__follow(state, result.moves)
+                return result.moves[0]
+            if len(self.__failed) >= HintEngine.FAILED_LIMIT:
+                self.__failed.clear()
+            self.__failed.add(key)
+
+        moves = legal_moves(state)
+        if not moves:
+            return None
+        return max(moves, key=lambda move: score(state, move))
+
+    def __follow(self, state: GameState, line: List[Tuple[int, int, int]]):
+        """
+        Remember a winning line and the positions along it
+        :param state: position the line starts from
+        :param line: winning moves
+        :return:
+        """
+        self.__line = line
+        self.__positions = {}
+        position = state.copy()
+        for index, move in enumerate(line):
+            self.__positions[position.key()] = index
+            position.move(*move)
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import struct
+from typing import Tuple, Union
+
+
+class MoveLog:
+    """
+    Undo history of a game stored as packed move records
+
+    Every move takes two bytes: source pile (4 bits), destination pile (4 bits), card count (7 bits) and
+    whether the move turned a card face up (1 bit). Undone moves stay in the log until a new move is
+    recorded, so undo and redo only move a cursor.
+    """
+    RECORD_SIZE = 2
+    HEADER = struct.Struct('<I')
+
+    def __init__(self):
+        """
+        Constructor. Create an empty history
+        """
+        self.__records = bytearray()
+        self.__cursor = 0
+
+    @staticmethod
+    def pack(src: int, dst: int, count: int, flipped: bool) -> int:
+        """
+        Encode a move record
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :param flipped: True if the move turned a card face up
+        :return: 16-bit record
+        """
+        return src << 12 | dst << 8 | count << 1 | int(flipped)
+
+    @staticmethod
+    def unpack(record: int) -> Tuple[int, int, int, bool]:
+        """
+        Decode a move record
+        :param record: 16-bit record
+        :return: (src, dst, count, flipped)
+        """
+        return record >> 12, record >> 8 & 0xf, record >> 1 & 0x7f, bool(record & 1)
+
+    def __len__(self) -> int:
+        """
+        Get number of moves played, undone moves excluded
+        :return:
+        """
+        return self.__cursor // MoveLog.RECORD_SIZE
+
+    def __read(self, offset: int) -> Tuple[int, int, int, bool]:
+        """
+        Decode the record at a byte offset
+        :param offset:
+        :return:
+        """
+        return MoveLog.unpack(int.from_bytes(self.__records[offset:offset + MoveLog.RECORD_SIZE], 'big'))
+
+    def record(self, src: int, dst: int, count: int, flipped: bool):
+        """
+        Append a played move, forgetting the undone ones
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :param flipped: True if the move turned a card face up
+        :return:
+        """
+        if self.__cursor < len(self.__records):
+            del self.__records[self.__cursor:]
+        self.__records += MoveLog.pack(src, dst, count, flipped).to_bytes(MoveLog.RECORD_SIZE, 'big')
+        self.__cursor = len(self.__records)
+
+    @property
+    def can_undo(self) -> bool:
+        """
+        Check if there is a move to undo
+        """
+        return self.__cursor > 0
+
+    @property
+    def can_redo(self) -> bool:
+        """
+        Check if there is an undone move to play again
+        """
+        return self.__cursor < len(self.__records)
+
+    def undo(self) -> Union[Tuple[int, int, int, bool], None]:
+        """
+        Step back over the last played move
+        :return: (src, dst, count, flipped) of the move to revert, None if there is none
+        """
+        if not self.can_undo:
+            return None
+        self.__cursor -= MoveLog.RECORD_SIZE
+        return self.__read(self.__cursor)
+
+    def redo(self) -> Union[Tuple[int, int, int, bool], None]:
+        """
+        Step forward over the last undone move
+        :return: (src, dst, count, flipped) of the move to play again, None if there is none
+        """
+        if not self.can_redo:
+            return None
+        move = self.__read(self.__cursor)
+        self.__cursor += MoveLog.RECORD_SIZE
+        return move
+
+    def clear(self):
+        """
+        Forget every move
+        :return:
+        """
+        self.__records.clear()
+        self.__cursor = 0
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the history, undone moves included
+        :return: number of played moves followed by the records
+        """
+        return MoveLog.HEADER.pack(len(self)) + bytes(self.__records)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> MoveLog:
+        """
+        Rebuild a history serialised by to_bytes
+        :param data:
+        :return:
+        """
+        if len(data) < MoveLog.HEADER.size or (len(data) - MoveLog.HEADER.size) % MoveLog.RECORD_SIZE:
+            raise ValueError('truncated move log')
+        played, = MoveLog.HEADER.unpack_from(data)
+        log = MoveLog()
+        log.__records = bytearray(data[MoveLog.HEADER.size:])
+        log.__cursor = played * MoveLog.RECORD_SIZE
+        if log.__cursor > len(log.__records):
+            raise ValueError('move log cursor out of range')
+        return log
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Union
+from typing import List
 
 from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtWidgets import QGraphicsRectItem
@@ -15,12 +15,16 @@ class PileWidget(QGraphicsRectItem, AbstractDrawable):
     Class for stacked cards on board
     """
 
-    def __init__(self, parent=None, x=0, y=0):
+    FAN_OFFSET = 20
+
+    def __init__(self, parent=None, x=0, y=0, index=0, fan=1):
         """
         Constructor. Initialize containing items
         :param parent: is passed to base Qt class
         :param x: position in board
         :param y: position in board
+        :param index: index of the pile in the game model
+        :param fan: number of top cards spread to the right, 1 to stack them all
         """
         super(QGraphicsRectItem, self).__init__()
         super(AbstractDrawable, self).__init__()
@@ -28,18 +32,38 @@ class PileWidget(QGraphicsRectItem, AbstractDrawable):
         self.__parent = parent
         self.__x = x
         self.__y = y
-        self.__count = 0
+        self.__index = index
+        self.__fan = fan
+
+        self.__cards: List[CardWidget] = []
 
-        self.__root_card: Union[CardWidget, None] = None
-        self.__leaf: Union[CardWidget, None] = None
+    @property
+    def index(self) -> int:
+        """
+        Get index of the pile in the game model
+        """
+        return self.__index
+
+    @property
+    def board(self):
+        """
+        Get the board the pile belongs to
+        """
+        return self.__parent
+
+    @property
+    def cards(self) -> List[CardWidget]:
+        """
+        Get cards, bottom to top
+        """
+        return self.__cards
 
     def reset(self):
         """
         Reset position of pile cards
 
         """
-        if self.__root_card is not None:
-            self.__root_card.reset_for_upper_pile()
+        self.layout(0)
 
     def align_components(self) -> AbstractDrawable:
         """
@@ -80,36 +104,30 @@ class PileWidget(QGraphicsRectItem, AbstractDrawable):
         :param card:
         :return:
         """
-        if self.__root_card is None and card.value == 1:
-            return True
-        if self.__leaf is not None:
-            return self.__leaf.type == card.type and self.__leaf.value == card.value - 1
-        return False
+        return self.__parent.state.drop_move(card.code, self.__index) is not None
 
-    def receive(self, card):
+    def sync(self, cards: List[CardWidget], start: int = 0):
         """
-        Add card to the deck and reset deck
-        :param card:
+        Replace the cards with the ones of the game model
+        :param cards: card widgets, bottom to top
+        :param start: index of the first card to position, cards below it are known to be in place
         :return:
         """
-        self.add_card(card)
-        self.__root_card.reset_pile()
+        self.__cards = cards
+        self.layout(start)
 
-    def add_card(self, card):
+    def layout(self, start: int):
         """
-        Add a card to the linked-list of cards
-        :param card:
+        Stack cards from an index to the top in one pass. With a fan, the cards entering or leaving the fanned
+        top cards below that index move too, and no other
+        :param start: index of the first card to position
         :return:
         """
-        self.__count += 1
-        self.__parent.is_win()
-        if self.__root_card is None:
-            card.orphan()
-            self.__root_card = card
-            self.__root_card.draw_face(self.__x, 50, 1)
-            self.__leaf = card.get_leaf()
-        else:
-            self.__leaf = self.__root_card.set_leaf_pile(card, x=self.__x, y=self.__y, z=2).get_leaf()
+        base = max(len(self.__cards) - self.__fan, 0)
+        for position in range(max(start - self.__fan + 1, 0), len(self.__cards)):
+            card = self.__cards[position]
+            card.attach(self, position)
+            card.draw_face(self.__x + PileWidget.FAN_OFFSET * max(position - base, 0), self.__y, position + 1)
 
     @property
     def count(self):
@@ -117,4 +135,4 @@ class PileWidget(QGraphicsRectItem, AbstractDrawable):
         Get count of cards
         :return:
         """
-        return self.__count
+        return self.__parent.state.size(self.__index)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from PyQt6.QtGui import QGuiApplication
+
+from CardAtlas import CardAtlas
+
+
+class PixmapCache:
+    """
+    Card atlases rendered per scale bucket, least recently used first evicted
+
+    A bucket is the product of the view scale and the device pixel ratio rounded to BUCKET, so the cards are
+    rasterized at the resolution they are displayed with. Atlases are dropped, oldest first, as long as the
+    cache holds more than max_buckets atlases or more than budget bytes. The selected atlas is never dropped.
+    """
+    BUCKET = 0.25
+
+    def __init__(self, budget: int = 64 << 20, max_buckets: int = 4):
+        """
+        Constructor
+        :param budget: memory budget in bytes
+        :param max_buckets: maximum number of atlases kept
+        """
+        self.__budget = budget
+        self.__max_buckets = max_buckets
+        self.__atlases = OrderedDict()
+        self.__current = None
+
+    @staticmethod
+    def bucket(scale: float, ratio: float) -> float:
+        """
+        Get the bucket of a view scale and device pixel ratio
+        :param scale: view scale
+        :param ratio: device pixel ratio
+        :return:
+        """
+        return max(PixmapCache.BUCKET, round(scale * ratio / PixmapCache.BUCKET) * PixmapCache.BUCKET)
+
+    @property
+    def current(self) -> CardAtlas:
+        """
+        Get the selected atlas, the one of the primary screen at scale 1 if none was selected
+        """
+        if self.__current is None:
+            screen = QGuiApplication.primaryScreen()
+            self.select(1.0, screen.devicePixelRatio() if screen is not None else 1.0)
+        return self.__current
+
+    @property
+    def memory(self) -> int:
+        """
+        Get approximate number of bytes held by the cached atlases
+        """
+        return sum(atlas.memory for atlas in self.__atlases.values())
+
+    def select(self, scale: float, ratio: float) -> CardAtlas:
+        """
+        Select the atlas matching a view scale and device pixel ratio, loading it if not cached
+        :param scale: view scale
+        :param ratio: device pixel ratio
+        :return: selected atlas
+        """
+        key = PixmapCache.bucket(scale, ratio)
+        atlas = self.__atlases.get(key)
+        if atlas is None:
+            atlas = CardAtlas(ratio=key).load()
+            self.__atlases[key] = atlas
+        self.__atlases.move_to_end(key)
+        self.__current = atlas
+        self.evict()
+        return atlas
+
+    def evict(self):
+        """
+        Drop least recently used atlases until the cache fits its limits
+        :return:
+        """
+        while len(self.__atlases) > 1 and (
+                len(self.__atlases) > self.__max_buckets or self.memory > self.__budget
+        ):
+            self.__atlases.popitem(last=False)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List
+
+from PyQt6.QtGui import QOpenGLContext, QPainter
+from PyQt6.QtWidgets import QGraphicsItem, QGraphicsScene, QGraphicsView
+
+
+class RenderProfile:
+    """
+    Set of QGraphicsView and item settings trading memory and image quality for drawing speed
+
+    Profiles are picked by name, see PROFILES. The OpenGL viewport is only used when the QtOpenGLWidgets
+    module can be imported and the platform can create an OpenGL context, the view keeps its raster
+    viewport otherwise.
+    """
+
+    def __init__(self, name: str, card_cache: QGraphicsItem.CacheMode = QGraphicsItem.CacheMode.NoCache,
+                 cache_background: bool = True,
+                 update_mode: QGraphicsView.ViewportUpdateMode =
+                 QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate,
+                 index: QGraphicsScene.ItemIndexMethod = QGraphicsScene.ItemIndexMethod.BspTreeIndex,
+                 smooth: bool = False, lean_painter: bool = False, opengl: bool = False):
+        """
+        Constructor
+        :param name: profile name
+        :param card_cache: cache mode of the card items
+        :param cache_background: keep the scaled background in a pixmap instead of drawing it every frame
+        :param update_mode: how the view turns item changes into repainted regions
+        :param index: how the scene looks up items by position
+        :param smooth: filter scaled pixmaps
+        :param lean_painter: skip saving the painter state around items and the antialiasing margins
+        :param opengl: draw the view with OpenGL if available
+        """
+        self.__name = name
+        self.__card_cache = card_cache
+        self.__cache_background = cache_background
+        self.__update_mode = update_mode
+        self.__index = index
+        self.__smooth = smooth
+        self.__lean_painter = lean_painter
+        self.__opengl = opengl
+
+    @property
+    def name(self) -> str:
+        """
+        Get profile name
+        """
+        return self.__name
+
+    @property
+    def opengl(self) -> bool:
+        """
+        Check if the profile asks for an OpenGL viewport
+        """
+        return self.__opengl
+
+    @staticmethod
+    def names() -> List[str]:
+        """
+        Get the names of the available profiles
+        :return:
+        """
+        return list(PROFILES)
+
+    @staticmethod
+    def named(name: str) -> RenderProfile:
+        """
+        Get a profile by name
+        :param name:
+        :return:
+        """
+        if name not in PROFILES:
+            raise ValueError(f'unknown render profile {name!r}, expected one of {", ".join(PROFILES)}')
+        return PROFILES[name]
+
+    def apply_view(self, view: QGraphicsView) -> bool:
+        """
+        Configure a view and its scene
+        :param view:
+        :return: True if an OpenGL viewport is used
+        """
+        opengl = False
+        if self.__opengl:
+            try:
+                from PyQt6.QtOpenGLWidgets import QOpenGLWidget
+            except ImportError:
+                QOpenGLWidget = None
+            if QOpenGLWidget is not None and QOpenGLContext().create():
+                view.setViewport(QOpenGLWidget())
+                opengl = True
+
+        view.setCacheMode(
+            QGraphicsView.CacheModeFlag.CacheBackground if self.__cache_background
+            else QGraphicsView.CacheModeFlag.CacheNone
+        )
+        # A GL viewport is redrawn entirely on every update anyway
+        view.setViewportUpdateMode(
+            QGraphicsView.ViewportUpdateMode.FullViewportUpdate if opengl else self.__update_mode
+        )
+        view.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, self.__smooth)
+        view.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontSavePainterState, self.__lean_painter)
+        view.setOptimizationFlag(QGraphicsView.OptimizationFlag.DontAdjustForAntialiasing, self.__lean_painter)
+        if view.scene() is not None:
+            view.scene().setItemIndexMethod(self.__index)
+        return opengl
+
+    def apply_items(self, items: Iterable[QGraphicsItem]):
+        """
+        Configure card items
+        :param items:
+        :return:
+        """
+        for item in items:
+            item.setCacheMode(self.__card_cache)
+
+
+PROFILES: Dict[str, RenderProfile] = {
+    profile.name: profile for profile in [
+        # Qt defaults, apart from the background cache
+        RenderProfile('default'),
+        # Cards kept as device pixmaps, repainting the bounding rect of the changes
+        RenderProfile(
+            'cached',
+            card_cache=QGraphicsItem.CacheMode.DeviceCoordinateCache,
+            update_mode=QGraphicsView.ViewportUpdateMode.SmartViewportUpdate,
+            smooth=True,
+        ),
+        # Cheapest raster drawing for software rendered displays: no filtering, no index upkeep for moving cards
+        RenderProfile(
+            'software',
+            card_cache=QGraphicsItem.CacheMode.DeviceCoordinateCache,
+            update_mode=QGraphicsView.ViewportUpdateMode.BoundingRectViewportUpdate,
+            index=QGraphicsScene.ItemIndexMethod.NoIndex,
+            lean_painter=True,
+        ),
+        RenderProfile('opengl', cache_background=False, opengl=True),
+    ]
+}
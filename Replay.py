@@ -0,0 +1,304 @@
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import struct
+import time
+from typing import List, Tuple
+
+from Deal import Deal
+from GameState import GameState
+from MoveGenerator import legal_moves
+from MoveLog import MoveLog
+from SaveGame import SavedGame, write_atomically
+
+# Pseudo moves marking undo and redo; no pile has index 15
+UNDO = (15, 15, 0)
+REDO = (15, 14, 0)
+
+
+class Recording:
+    """
+    Moves of a play session together with the game it started from
+
+    The start is stored as a SavedGame so that sessions resumed from an autosave replay too. Every event
+    is a move record packed like in MoveLog, undo and redo being stored as the UNDO and REDO pseudo moves.
+    """
+    VERSION = 1
+    MAGIC = b'SREC'
+    HEADER = struct.Struct('<4sHI')
+
+    def __init__(self, start: bytes, events: List[Tuple[int, int, int]] = None):
+        """
+        Constructor
+        :param start: serialised SavedGame the session started from
+        :param events: (src, dst, count) moves, UNDO or REDO, in playing order
+        """
+        self.__start = start
+        self.__events = events if events is not None else []
+
+    @property
+    def start(self) -> bytes:
+        """
+        Get the serialised game the session started from
+        """
+        return self.__start
+
+    @property
+    def events(self) -> List[Tuple[int, int, int]]:
+        """
+        Get the recorded moves, undos and redos
+        """
+        return self.__events
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the recording
+        :return:
+        """
+        header = Recording.HEADER.pack(Recording.MAGIC, Recording.VERSION, len(self.__start))
+        events = b''.join(MoveLog.pack(*event, False).to_bytes(MoveLog.RECORD_SIZE, 'big') for event in self.__events)
+        return header + self.__start + events
+
+    @staticmethod
+    def from_bytes(data: bytes) -> Recording:
+        """
+        Rebuild a recording serialised by to_bytes
+        :param data:
+        :return:
+        """
+        if len(data) < Recording.HEADER.size:
+            raise ValueError('truncated recording')
+        magic, version, size = Recording.HEADER.unpack_from(data)
+        if magic != Recording.MAGIC or version != Recording.VERSION:
+            raise ValueError('not a recording of this version')
+        offset = Recording.HEADER.size + size
+        if len(data) < offset or (len(data) - offset) % MoveLog.RECORD_SIZE:
+            raise ValueError('truncated recording')
+        events = [
+            MoveLog.unpack(int.from_bytes(data[position:position + MoveLog.RECORD_SIZE], 'big'))[:3]
+            for position in range(offset, len(data), MoveLog.RECORD_SIZE)
+        ]
+        return Recording(data[Recording.HEADER.size:offset], events)
+
+    def save(self, path: str):
+        """
+        Write the recording to a file
+        :param path:
+        :return:
+        """
+        write_atomically(path, self.to_bytes())
+
+    @staticmethod
+    def load(path: str) -> Recording:
+        """
+        Read a recording written by save
+        :param path:
+        :return:
+        """
+        with open(path, 'rb') as file:
+            return Recording.from_bytes(file.read())
+
+
+class Recorder:
+    """
+    Capture the moves, undos and redos made on a GameWidget, whether by dragging, double-clicking or
+    clicking the stock
+    """
+
+    def __init__(self, widget):
+        """
+        Constructor. Start recording from the current game of an initialised widget
+        :param widget: GameWidget
+        """
+        self.__widget = widget
+        self.__recording = Recording(SavedGame(widget.deal, widget.state.copy(), widget.history).to_bytes())
+        widget.moved.connect(self.on_moved)
+        widget.undone.connect(self.on_undone)
+        widget.redone.connect(self.on_redone)
+
+    @property
+    def recording(self) -> Recording:
+        """
+        Get the recording
+        """
+        return self.__recording
+
+    def on_moved(self, src: int, dst: int, count: int):
+        """
+        Record a move
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return:
+        """
+        self.__recording.events.append((src, dst, count))
+
+    def on_undone(self):
+        """
+        Record an undo
+        :return:
+        """
+        self.__recording.events.append(UNDO)
+
+    def on_redone(self):
+        """
+        Record a redo
+        :return:
+        """
+        self.__recording.events.append(REDO)
+
+    def detach(self):
+        """
+        Stop recording
+        :return:
+        """
+        self.__widget.moved.disconnect(self.on_moved)
+        self.__widget.undone.disconnect(self.on_undone)
+        self.__widget.redone.disconnect(self.on_redone)
+
+
+def replay(recording: Recording, strict: bool = True) -> SavedGame:
+    """
+    Replay a recording on the game model alone, as fast as possible
+    :param recording:
+    :param strict: check that every move is legal
+    :return: the game at the end of the recording
+    """
+    saved = SavedGame.from_bytes(recording.start)
+    state = saved.state
+    history = saved.history
+    for number, event in enumerate(recording.events):
+        if event == UNDO:
+            move = history.undo()
+            if move is None:
+                raise ValueError(f'event {number}: nothing to undo')
+            state.revert(*move)
+        elif event == REDO:
+            move = history.redo()
+            if move is None:
+                raise ValueError(f'event {number}: nothing to redo')
+            state.move(*move[:3])
+        else:
+            if strict and not state.can_move(*event):
+                raise ValueError(f'event {number}: illegal move {event}')
+            history.record(*event, state.move(*event))
+    return SavedGame(saved.deal, state, history)
+
+
+def replay_widget(recording: Recording, widget=None, process_events: bool = True, animate: bool = False):
+    """
+    Replay a recording on a GameWidget, updating the scene like interactive play does
+    :param recording:
+    :param widget: GameWidget to create from the start of the recording if None
+    :param process_events: let Qt handle pending events, painting included, after every event
+    :param animate: let cards glide to their places instead of placing them at once
+    :return: the widget
+    """
+    from PyQt6.QtWidgets import QApplication
+    from GameWidget import GameWidget
+
+    if widget is None:
+        widget = GameWidget(saved=SavedGame.from_bytes(recording.start))
+        widget.init()
+    widget.animator.enabled = animate
+    for event in recording.events:
+        if event == UNDO:
+            widget.undo()
+        elif event == REDO:
+            widget.redo()
+        else:
+            widget.play(*event)
+        if process_events:
+            QApplication.processEvents()
+    return widget
+
+
+def generate(seed: int, length: int) -> Recording:
+    """
+    Record random legal play, with undos and redos, from the deal of a seed
+    :param seed: deal seed, also seeds the move choices
+    :param length: number of events
+    :return:
+    """
+    choices = random.Random(seed)
+    deal = Deal.from_seed(seed)
+    state = GameState.deal(deal.cards)
+    history = MoveLog()
+    recording = Recording(SavedGame(deal, state.copy(), MoveLog()).to_bytes())
+
+    while len(recording.events) < length:
+        roll = choices.random()
+        if roll < 0.1 and history.can_undo:
+            state.revert(*history.undo())
+            recording.events.append(UNDO)
+            continue
+        if roll < 0.15 and history.can_redo:
+            state.move(*history.redo()[:3])
+            recording.events.append(REDO)
+            continue
+
+        moves = legal_moves(state)
+        if not moves:
+            if not history.can_undo:
+                break
+            state.revert(*history.undo())
+            recording.events.append(UNDO)
+            continue
+        move = choices.choice(moves)
+        history.record(*move, state.move(*move))
+        recording.events.append(move)
+    return recording
+
+
+def main():
+    """
+    Command line entrypoint
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Record and replay games')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    generating = commands.add_parser('generate', help='record random legal play')
+    generating.add_argument('output', help='recording file')
+    generating.add_argument('-s', '--seed', type=int, default=0, help='deal seed')
+    generating.add_argument('-n', '--length', type=int, default=10000, help='number of events')
+
+    running = commands.add_parser('run', help='replay a recording and report its speed')
+    running.add_argument('recording', help='recording file')
+    running.add_argument('-r', '--repeat', type=int, default=1, help='number of replays')
+    running.add_argument('-w', '--widget', action='store_true', help='replay on a GameWidget instead of the model')
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        recording = generate(args.seed, args.length)
+        recording.save(args.output)
+        print(f'{len(recording.events)} events written to {args.output}')
+        return
+
+    recording = Recording.load(args.recording)
+    if args.widget:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        # Card images are loaded relative to the project directory
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+        from PyQt6.QtWidgets import QApplication
+        application = QApplication.instance() or QApplication([])
+
+    began = time.perf_counter()
+    for _ in range(args.repeat):
+        if args.widget:
+            final = replay_widget(recording).state
+            # Flush what the last event left pending, like the next frame would
+            application.processEvents()
+        else:
+            final = replay(recording).state
+    elapsed = time.perf_counter() - began
+
+    events = len(recording.events) * args.repeat
+    print(f'{events} events in {elapsed:.3f}s, {events / elapsed:.0f} events/s')
+    print(f'{final.home_count} cards on the foundations, {final.hidden_count} face down')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import atexit
+import os
+import struct
+import threading
+from typing import Union
+
+from PyQt6.QtCore import QStandardPaths
+
+from Deal import Deal
+from GameState import GameState, SUIT_COUNT
+from MoveLog import MoveLog
+
+
+class SavedGame:
+    """
+    Game in progress serialised in a small versioned binary format
+
+    Layout, little endian: header (magic, version, flags), the deal as a 64-bit seed or as the 29 byte
+    Lehmer code, the rules (draw count, recycle limit or NO_LIMIT, recycles made), the foundation values, the
+    face down count and length of every tableau column, the stock and waste lengths, the card codes of the
+    columns, of the stock and of the waste, then the move log. Face up flags follow from the face down
+    counts. A game takes about 100 bytes plus two bytes per move.
+    """
+    VERSION = 1
+    MAGIC = b'SSAV'
+    HEADER = struct.Struct('<4sHB')
+    SEED = struct.Struct('<Q')
+    RULES = struct.Struct('<BBB')
+
+    FLAG_SEED = 1
+    # Recycle limit byte of games without a limit, above GameState.MAX_RECYCLES
+    NO_LIMIT = 255
+
+    def __init__(self, deal: Deal, state: GameState, history: MoveLog):
+        """
+        Constructor
+        :param deal: order of the cards the game started from
+        :param state: current position
+        :param history: moves played from the deal
+        """
+        self.__deal = deal
+        self.__state = state
+        self.__history = history
+
+    @property
+    def deal(self) -> Deal:
+        """
+        Get the deal of the game
+        """
+        return self.__deal
+
+    @property
+    def state(self) -> GameState:
+        """
+        Get the current position
+        """
+        return self.__state
+
+    @property
+    def history(self) -> MoveLog:
+        """
+        Get the moves played from the deal
+        """
+        return self.__history
+
+    @staticmethod
+    def default_path() -> str:
+        """
+        Get the path of the autosave file
+        :return:
+        """
+        directory = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.GenericDataLocation)
+        return os.path.join(directory, 'solitarie', 'autosave.sav')
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialise the game
+        :return:
+        """
+        state = self.__state
+        seed = self.__deal.seed
+        flags = SavedGame.FLAG_SEED if seed is not None else 0
+        parts = [SavedGame.HEADER.pack(SavedGame.MAGIC, SavedGame.VERSION, flags)]
+        parts.append(SavedGame.SEED.pack(seed) if seed is not None else self.__deal.to_bytes())
+        if state.recycle_limit is None:
+            # The number of recycles only matters with a limit, and can then outgrow a byte
+            parts.append(SavedGame.RULES.pack(state.draw_count, SavedGame.NO_LIMIT, 0))
+        else:
+            parts.append(SavedGame.RULES.pack(state.draw_count, state.recycle_limit, state.recycled))
+        parts.append(bytes(state.foundations))
+        parts.append(bytes(state.hidden))
+        parts.append(bytes(len(column) for column in state.tableau))
+        parts.append(bytes([len(state.stock), len(state.waste)]))
+        parts.extend(bytes(column) for column in state.tableau)
+        parts.append(bytes(state.stock))
+        parts.append(bytes(state.waste))
+        parts.append(self.__history.to_bytes())
+        return b''.join(parts)
+
+    @staticmethod
+    def from_bytes(data: bytes) -> SavedGame:
+        """
+        Rebuild a game serialised by to_bytes
+        :param data:
+        :return:
+        """
+        if len(data) < SavedGame.HEADER.size:
+            raise ValueError('truncated save')
+        magic, version, flags = SavedGame.HEADER.unpack_from(data)
+        if magic != SavedGame.MAGIC or version != SavedGame.VERSION:
+            raise ValueError('not a save of this version')
+        offset = SavedGame.HEADER.size
+
+        if flags & SavedGame.FLAG_SEED:
+            seed, = SavedGame.SEED.unpack_from(data, offset)
+            deal = Deal.from_seed(seed)
+            offset += SavedGame.SEED.size
+        else:
+            deal = Deal.from_bytes(data[offset:offset + Deal.CODE_BYTES])
+            offset += Deal.CODE_BYTES
+
+        draw_count, limit, recycled = SavedGame.RULES.unpack_from(data, offset)
+        recycle_limit = None if limit == SavedGame.NO_LIMIT else limit
+        offset += SavedGame.RULES.size
+
+        size = SUIT_COUNT + 2 * GameState.TABLEAU_COUNT + 2
+        counts = data[offset:offset + size]
+        if len(counts) != size:
+            raise ValueError('truncated save')
+        foundations = list(counts[:SUIT_COUNT])
+        hidden = list(counts[SUIT_COUNT:SUIT_COUNT + GameState.TABLEAU_COUNT])
+        lengths = counts[SUIT_COUNT + GameState.TABLEAU_COUNT:]
+        offset += len(counts)
+
+        piles = []
+        for length in lengths:
+            piles.append(list(data[offset:offset + length]))
+            offset += length
+        state = GameState.restore(
+            piles[:GameState.TABLEAU_COUNT], hidden, foundations, piles[-2], piles[-1], draw_count, recycle_limit,
+            recycled
+        )
+        return SavedGame(deal, state, MoveLog.from_bytes(data[offset:]))
+
+    def save(self, path: str):
+        """
+        Write the game to a file, replacing it atomically
+        :param path:
+        :return:
+        """
+        write_atomically(path, self.to_bytes())
+
+    @staticmethod
+    def load(path: str) -> Union[SavedGame, None]:
+        """
+        Read a game written by save
+        :param path:
+        :return: the game or None if the file is missing or unusable
+        """
+        try:
+            with open(path, 'rb') as file:
+                return SavedGame.from_bytes(file.read())
+        except (OSError, ValueError, struct.error):
+            return None
+
+
+def write_atomically(path: str, data: bytes):
+    """
+    Write a file through a temporary file renamed over it, so readers never see a partial file
+    :param path:
+    :param data:
+    :return:
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f'{path}.{os.getpid()}.tmp'
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+
+class Autosave:
+    """
+    Background writer of the autosave file
+
+    Serialised games are handed over with submit and written by a worker thread. Only the latest pending
+    game is kept, so a burst of moves costs a single write and the caller never waits on the disk.
+    """
+
+    def __init__(self, path: str):
+        """
+        Constructor. Start the worker thread
+        :param path: autosave file
+        """
+        self.__path = path
+        self.__pending: Union[bytes, None] = None
+        self.__closed = False
+        self.__condition = threading.Condition()
+        self.__thread = threading.Thread(target=self.__run, name='autosave', daemon=True)
+        self.__thread.start()
+        atexit.register(self.close)
+
+    @property
+    def path(self) -> str:
+        """
+        Get the autosave file
+        """
+        return self.__path
+
+    def submit(self, data: bytes):
+        """
+        Queue a serialised game for writing, replacing any game not written yet
+        :param data:
+        :return:
+        """
+        with self.__condition:
+            self.__pending = data
+            self.__condition.notify()
+
+    def close(self):
+        """
+        Write the pending game and stop the worker thread
+        :return:
+        """
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__condition.notify()
+        self.__thread.join()
+        atexit.unregister(self.close)
+
+    def __run(self):
+        """
+        Worker loop
+        :return:
+        """
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+                data, self.__pending = self.__pending, None
+                if data is None:
+                    return
+            try:
+                write_atomically(self.__path, data)
+            except OSError:
+                continue
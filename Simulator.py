@@ -0,0 +1,726 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import time
+from typing import Callable, Dict, List, Union
+
+import numpy as np
+
+from Deal import Deal
+from GameState import CARD_COUNT, GameState, RANK_COUNT, RED_OF, SUIT_COUNT, SUIT_OF, VALUE_OF, parse_recycle_limit
+
+# Code of the missing card, padding the card arrays
+EMPTY = CARD_COUNT
+
+COLUMNS = GameState.TABLEAU_COUNT
+# Six face down cards under a king to ace run
+COLUMN_SIZE = COLUMNS - 1 + RANK_COUNT
+TALON_SIZE = CARD_COUNT - COLUMNS * (COLUMNS + 1) // 2
+
+# Action space, shared by every game of a batch:
+# column i to its foundation, waste to its foundation, waste to column j, the run of column i that fits on
+# column j, the top of foundation s to column j, and drawing from the stock (recycling the waste once empty)
+TABLEAU_TO_FOUNDATION = 0
+WASTE_TO_FOUNDATION = TABLEAU_TO_FOUNDATION + COLUMNS
+WASTE_TO_TABLEAU = WASTE_TO_FOUNDATION + 1
+TABLEAU_TO_TABLEAU = WASTE_TO_TABLEAU + COLUMNS
+FOUNDATION_TO_TABLEAU = TABLEAU_TO_TABLEAU + COLUMNS * COLUMNS
+DRAW = FOUNDATION_TO_TABLEAU + SUIT_COUNT * COLUMNS
+ACTION_COUNT = DRAW + 1
+
+# Card tables extended with the EMPTY code
+SUIT = np.array([suit - 1 for suit in SUIT_OF] + [0], dtype=np.int8)
+VALUE = np.array(VALUE_OF + [0], dtype=np.int8)
+RED = np.array(RED_OF + [False])
+# STACKS[card, top] tells if a card can be placed on a column, EMPTY standing for an empty column
+STACKS = np.array([[card < EMPTY and (VALUE[card] == RANK_COUNT if top == EMPTY else
+                                      RED[card] != RED[top] and VALUE[top] == VALUE[card] + 1)
+                    for top in range(EMPTY + 1)] for card in range(EMPTY + 1)])
+# Value of the card wanted on top of a card, a king for an empty column
+WANTED = np.array([value - 1 for value in VALUE_OF] + [RANK_COUNT], dtype=np.int16)
+
+# Points of the scoring variants: by action kind, for a turned card and for a recycled waste by draw count
+SCORING = {
+    'standard': {
+        'to_foundation': 10, 'waste_to_tableau': 5, 'from_foundation': -15, 'reveal': 5,
+        'recycle': {1: -100, 3: -20}, 'start': 0, 'floor': 0,
+    },
+    'vegas': {
+        'to_foundation': 5, 'waste_to_tableau': 0, 'from_foundation': -5, 'reveal': 0,
+        'recycle': {1: 0, 3: 0}, 'start': -52, 'floor': None,
+    },
+}
+
+
+class GameBatch:
+    """
+    Klondike games stored as NumPy arrays and played in lockstep, one action per game and step
+
+    Tableau columns are rows of card codes padded with EMPTY, the stock and the waste share one talon row:
+    its first waste_length cards are the waste, the last one being its playable top, and the following ones
+    the stock in drawing order. Drawing moves the boundary, recycling the waste resets it, so the talon
+    keeps its order like the real piles turned over.
+
+    Games are dealt the way GameState.deal does, the stock being drawn from the end of the deck.
+    """
+
+    def __init__(self, cards: np.ndarray, draw: int = 1, recycles: Union[int, None] = None,
+                 scoring: str = 'standard'):
+        """
+        Constructor. Deal the games
+        :param cards: shuffled decks, one row of 52 card codes in drawing order per game
+        :param draw: number of cards turned by a draw, 1 or 3
+        :param recycles: number of times the waste can be turned over, None for no limit
+        :param scoring: scoring variant, a key of SCORING
+        """
+        if draw not in (1, 3):
+            raise ValueError(f'cards are drawn by 1 or 3, not {draw}')
+        if scoring not in SCORING:
+            raise ValueError(f'unknown scoring {scoring!r}, expected one of {", ".join(SCORING)}')
+        cards = np.asarray(cards, dtype=np.int8).reshape(-1, CARD_COUNT)
+        count = len(cards)
+
+        self.__draw = draw
+        self.__recycles = recycles
+        self.__points = SCORING[scoring]
+
+        self.__tableau = np.empty((count, COLUMNS, COLUMN_SIZE), dtype=np.int8)
+        self.__length = np.empty((count, COLUMNS), dtype=np.int16)
+        self.__hidden = np.empty((count, COLUMNS), dtype=np.int16)
+        self.__foundations = np.empty((count, SUIT_COUNT), dtype=np.int16)
+
+        self.__talon = np.empty((count, TALON_SIZE), dtype=np.int8)
+        self.__talon_length = np.empty(count, dtype=np.int16)
+        self.__waste_length = np.empty(count, dtype=np.int16)
+        self.__recycled = np.empty(count, dtype=np.int16)
+
+        self.__score = np.empty(count, dtype=np.int32)
+        self.__moves = np.empty(count, dtype=np.int32)
+        self.__idle = np.empty(count, dtype=np.int32)
+        self.redeal(np.arange(count), cards)
+
+    def redeal(self, games: np.ndarray, cards: np.ndarray):
+        """
+        Start new games in place of some games
+        :param games: indices of the replaced games
+        :param cards: shuffled decks, one row of 52 card codes in drawing order per replaced game
+        :return:
+        """
+        cards = np.asarray(cards, dtype=np.int8).reshape(-1, CARD_COUNT)
+        self.__tableau[games] = EMPTY
+        position = 0
+        for column in range(COLUMNS):
+            self.__tableau[games, column, :column + 1] = cards[:, position:position + column + 1]
+            position += column + 1
+        self.__length[games] = np.arange(1, COLUMNS + 1)
+        self.__hidden[games] = np.arange(COLUMNS)
+        self.__foundations[games] = 0
+
+        self.__talon[games] = cards[:, :position - 1:-1]
+        self.__talon_length[games] = TALON_SIZE
+        self.__waste_length[games] = 0
+        self.__recycled[games] = 0
+
+        self.__score[games] = self.__points['start']
+        self.__moves[games] = 0
+        self.__idle[games] = 0
+
+    @staticmethod
+    def shuffled(count: int, rng: np.random.Generator, **options) -> GameBatch:
+        """
+        Deal games from decks shuffled by a NumPy generator
+        :param count: number of games
+        :param rng:
+        :param options: passed to the constructor
+        :return:
+        """
+        return GameBatch(GameBatch.decks(count, rng), **options)
+
+    @staticmethod
+    def decks(count: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Shuffle decks with a NumPy generator
+        :param count: number of decks
+        :param rng:
+        :return: one row of 52 card codes per deck
+        """
+        return rng.permuted(np.tile(np.arange(CARD_COUNT, dtype=np.int8), (count, 1)), axis=1)
+
+    @staticmethod
+    def seeded_decks(seeds: List[int]) -> np.ndarray:
+        """
+        Shuffle the decks of Deal seeds, as the board would
+        :param seeds:
+        :return: one row of 52 card codes per deck
+        """
+        return np.array([Deal.from_seed(seed).cards for seed in seeds], dtype=np.int8).reshape(-1, CARD_COUNT)
+
+    @staticmethod
+    def from_seeds(seeds: List[int], **options) -> GameBatch:
+        """
+        Deal the games of Deal seeds, as the board would
+        :param seeds:
+        :param options: passed to the constructor
+        :return:
+        """
+        return GameBatch(GameBatch.seeded_decks(seeds), **options)
+
+    def __len__(self) -> int:
+        """
+        Get number of games
+        """
+        return len(self.__length)
+
+    @property
+    def draw(self) -> int:
+        """
+        Get number of cards turned by a draw
+        """
+        return self.__draw
+
+    @property
+    def recycles(self) -> Union[int, None]:
+        """
+        Get number of times the waste can be turned over, None for no limit
+        """
+        return self.__recycles
+
+    @property
+    def tableau(self) -> np.ndarray:
+        """
+        Get tableau cards, shaped (games, columns, COLUMN_SIZE) and padded with EMPTY
+        """
+        return self.__tableau
+
+    @property
+    def length(self) -> np.ndarray:
+        """
+        Get number of cards of every column, shaped (games, columns)
+        """
+        return self.__length
+
+    @property
+    def hidden(self) -> np.ndarray:
+        """
+        Get number of face down cards of every column, shaped (games, columns)
+        """
+        return self.__hidden
+
+    @property
+    def foundations(self) -> np.ndarray:
+        """
+        Get value of the top card of every foundation, 0 if empty, shaped (games, suits)
+        """
+        return self.__foundations
+
+    @property
+    def talon(self) -> np.ndarray:
+        """
+        Get waste then stock cards, shaped (games, TALON_SIZE) and padded with EMPTY
+        """
+        return self.__talon
+
+    @property
+    def talon_length(self) -> np.ndarray:
+        """
+        Get number of cards of the waste and the stock together
+        """
+        return self.__talon_length
+
+    @property
+    def waste_length(self) -> np.ndarray:
+        """
+        Get number of cards of the waste
+        """
+        return self.__waste_length
+
+    @property
+    def recycled(self) -> np.ndarray:
+        """
+        Get number of times the waste was turned over
+        """
+        return self.__recycled
+
+    @property
+    def score(self) -> np.ndarray:
+        """
+        Get score of every game
+        """
+        return self.__score
+
+    @property
+    def moves(self) -> np.ndarray:
+        """
+        Get number of actions played by every game
+        """
+        return self.__moves
+
+    @property
+    def idle(self) -> np.ndarray:
+        """
+        Get number of draws played by every game since its last other action
+        """
+        return self.__idle
+
+    @property
+    def home_count(self) -> np.ndarray:
+        """
+        Get number of cards on the foundations of every game
+        """
+        return self.__foundations.sum(axis=1)
+
+    @property
+    def won(self) -> np.ndarray:
+        """
+        Check which games are won
+        """
+        return self.home_count == CARD_COUNT
+
+    @property
+    def stuck(self) -> np.ndarray:
+        """
+        Check which games drew through a whole pass of the stock without playing anything else, after which
+        drawing on only repeats the same positions
+        """
+        passes = (self.__talon_length + self.__draw - 1) // self.__draw + 1
+        return self.__idle > passes
+
+    def select(self, games: np.ndarray) -> GameBatch:
+        """
+        Keep some of the games, in the given order
+        :param games: indices or mask of the kept games
+        :return: self
+        """
+        for name in ('tableau', 'length', 'hidden', 'foundations', 'talon', 'talon_length', 'waste_length',
+                     'recycled', 'score', 'moves', 'idle'):
+            attribute = f'_GameBatch__{name}'
+            setattr(self, attribute, getattr(self, attribute)[games])
+        return self
+
+    def tops(self) -> np.ndarray:
+        """
+        Get the top card of every column, EMPTY for an empty column
+        :return: shaped (games, columns)
+        """
+        top = np.take_along_axis(self.__tableau, np.maximum(self.__length - 1, 0)[..., None], axis=2)[..., 0]
+        return np.where(self.__length > 0, top, EMPTY)
+
+    def waste(self) -> np.ndarray:
+        """
+        Get the playable card of the waste of every game, EMPTY for an empty waste
+        :return: shaped (games,)
+        """
+        top = np.take_along_axis(self.__talon, np.maximum(self.__waste_length - 1, 0)[:, None], axis=1)[:, 0]
+        return np.where(self.__waste_length > 0, top, EMPTY)
+
+    def bases(self) -> np.ndarray:
+        """
+        Get the lowest face up card of every column, EMPTY for an empty column
+        :return: shaped (games, columns)
+        """
+        return np.take_along_axis(self.__tableau, self.__hidden[..., None], axis=2)[..., 0]
+
+    def run_start(self, tops: np.ndarray = None, bases: np.ndarray = None) -> np.ndarray:
+        """
+        Get the position in column i of the card that fits on column j, for every pair of columns. The face
+        up cards of a column form a run, so this card is found from the value of the lowest one
+        :param tops: top cards as returned by tops, computed if not given
+        :param bases: lowest face up cards as returned by bases, computed if not given
+        :return: shaped (games, columns, columns), out of the face up run when no card fits
+        """
+        tops = self.tops() if tops is None else tops
+        bases = self.bases() if bases is None else bases
+        return (self.__hidden + VALUE[bases])[..., None] - WANTED[tops][:, None, :]
+
+    def playable(self) -> np.ndarray:
+        """
+        Get the cards that can be played to the foundations
+        :return: booleans shaped (games, 53), indexed by card code, EMPTY included
+        """
+        count = len(self)
+        suits = np.arange(SUIT_COUNT)
+        playable = np.zeros((count, EMPTY + 1), dtype=bool)
+        playable[np.arange(count)[:, None], np.where(self.__foundations < RANK_COUNT,
+                                                     suits * RANK_COUNT + self.__foundations, EMPTY)] = True
+        playable[:, EMPTY] = False
+        return playable
+
+    def legal_mask(self) -> np.ndarray:
+        """
+        Get the legal actions of every game
+        :return: booleans shaped (games, ACTION_COUNT)
+        """
+        count = len(self)
+        mask = np.zeros((count, ACTION_COUNT), dtype=bool)
+        tops = self.tops()
+        waste = self.waste()
+
+        playable = self.playable()
+        mask[:, TABLEAU_TO_FOUNDATION:WASTE_TO_FOUNDATION] = np.take_along_axis(playable, tops, axis=1)
+        mask[:, WASTE_TO_FOUNDATION] = playable[np.arange(count), waste]
+        mask[:, WASTE_TO_TABLEAU:TABLEAU_TO_TABLEAU] = STACKS[waste[:, None], tops]
+
+        # Colours alternate along a run, so the colour of the fitting card follows from its distance to the base
+        bases = self.bases()
+        start = self.run_start(tops, bases)
+        offset = start - self.__hidden[..., None]
+        runs = (offset >= 0) & (start < self.__length[..., None])
+        red = RED[bases][..., None] ^ (offset & 1).astype(bool)
+        runs &= (tops[:, None, :] == EMPTY) | (red != RED[tops][:, None, :])
+        runs &= ~np.eye(COLUMNS, dtype=bool)
+        mask[:, TABLEAU_TO_TABLEAU:FOUNDATION_TO_TABLEAU] = runs.reshape(count, -1)
+
+        homes = np.arange(SUIT_COUNT) * RANK_COUNT + self.__foundations - 1
+        homes = np.where(self.__foundations > 0, homes, EMPTY)
+        mask[:, FOUNDATION_TO_TABLEAU:DRAW] = STACKS[homes[..., None], tops[:, None, :]].reshape(count, -1)
+
+        recycle = (self.__waste_length > 0) & (self.__waste_length == self.__talon_length)
+        if self.__recycles is not None:
+            recycle &= self.__recycled < self.__recycles
+        mask[:, DRAW] = (self.__waste_length < self.__talon_length) | recycle
+        return mask
+
+    def step(self, actions: np.ndarray) -> np.ndarray:
+        """
+        Play one action in every game. Actions must be legal
+        :param actions: action of every game, negative to leave the game as it is
+        :return: score change of every game
+        """
+        actions = np.asarray(actions)
+        points = self.__points
+        reward = np.zeros(len(self), dtype=np.int32)
+
+        games = np.flatnonzero(actions < WASTE_TO_FOUNDATION)
+        games = games[actions[games] >= 0]
+        if len(games):
+            columns = actions[games] - TABLEAU_TO_FOUNDATION
+            cards = self.__pop(games, columns)
+            self.__foundations[games, SUIT[cards]] += 1
+            reward[games] += points['to_foundation'] + self.__reveal(games, columns)
+
+        games = np.flatnonzero(actions == WASTE_TO_FOUNDATION)
+        if len(games):
+            cards = self.__pop_waste(games)
+            self.__foundations[games, SUIT[cards]] += 1
+            reward[games] += points['to_foundation']
+
+        games = np.flatnonzero((actions >= WASTE_TO_TABLEAU) & (actions < TABLEAU_TO_TABLEAU))
+        if len(games):
+            self.__push(games, actions[games] - WASTE_TO_TABLEAU, self.__pop_waste(games))
+            reward[games] += points['waste_to_tableau']
+
+        games = np.flatnonzero((actions >= TABLEAU_TO_TABLEAU) & (actions < FOUNDATION_TO_TABLEAU))
+        if len(games):
+            sources, targets = np.divmod(actions[games] - TABLEAU_TO_TABLEAU, COLUMNS)
+            self.__move_runs(games, sources, targets)
+            reward[games] += self.__reveal(games, sources)
+
+        games = np.flatnonzero((actions >= FOUNDATION_TO_TABLEAU) & (actions < DRAW))
+        if len(games):
+            suits, targets = np.divmod(actions[games] - FOUNDATION_TO_TABLEAU, COLUMNS)
+            self.__foundations[games, suits] -= 1
+            self.__push(games, targets, suits * RANK_COUNT + self.__foundations[games, suits])
+            reward[games] += points['from_foundation']
+
+        games = np.flatnonzero(actions == DRAW)
+        if len(games):
+            recycle = self.__waste_length[games] == self.__talon_length[games]
+            drawn = games[~recycle]
+            self.__waste_length[drawn] = np.minimum(self.__waste_length[drawn] + self.__draw,
+                                                    self.__talon_length[drawn])
+            recycled = games[recycle]
+            self.__waste_length[recycled] = 0
+            self.__recycled[recycled] += 1
+            reward[recycled] += points['recycle'][self.__draw]
+
+        if points['floor'] is not None:
+            reward = np.maximum(self.__score + reward, points['floor']) - self.__score
+        self.__score += reward
+        self.__moves += actions >= 0
+        self.__idle = np.where(actions == DRAW, self.__idle + 1, np.where(actions >= 0, 0, self.__idle))
+        return reward
+
+    def __pop(self, games: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        Remove the top card of columns
+        :param games: game of every column
+        :param columns:
+        :return: removed cards
+        """
+        self.__length[games, columns] -= 1
+        positions = self.__length[games, columns]
+        cards = self.__tableau[games, columns, positions]
+        self.__tableau[games, columns, positions] = EMPTY
+        return cards
+
+    def __push(self, games: np.ndarray, columns: np.ndarray, cards: np.ndarray):
+        """
+        Put a card on top of columns
+        :param games: game of every column
+        :param columns:
+        :param cards:
+        :return:
+        """
+        self.__tableau[games, columns, self.__length[games, columns]] = cards
+        self.__length[games, columns] += 1
+
+    def __pop_waste(self, games: np.ndarray) -> np.ndarray:
+        """
+        Remove the playable card of the waste, closing the gap it leaves in the talon
+        :param games:
+        :return: removed cards
+        """
+        positions = self.__waste_length[games] - 1
+        cards = self.__talon[games, positions]
+        indices = np.arange(TALON_SIZE)
+        shifted = np.minimum(indices + (indices >= positions[:, None]), TALON_SIZE - 1)
+        talon = np.take_along_axis(self.__talon[games], shifted, axis=1)
+        talon[np.arange(len(games)), self.__talon_length[games] - 1] = EMPTY
+        self.__talon[games] = talon
+        self.__talon_length[games] -= 1
+        self.__waste_length[games] -= 1
+        return cards
+
+    def __move_runs(self, games: np.ndarray, sources: np.ndarray, targets: np.ndarray):
+        """
+        Move the runs fitting on target columns
+        :param games: game of every move
+        :param sources: column the run is taken from
+        :param targets: column receiving the run
+        :return:
+        """
+        ends = self.__length[games, targets]
+        tops = np.where(ends > 0, self.__tableau[games, targets, np.maximum(ends - 1, 0)], EMPTY)
+        hidden = self.__hidden[games, sources]
+        starts = hidden + VALUE[self.__tableau[games, sources, hidden]] - WANTED[tops]
+        counts = self.__length[games, sources] - starts
+        for offset in range(RANK_COUNT):
+            moving = counts > offset
+            if not moving.any():
+                break
+            rows, source, target = games[moving], sources[moving], targets[moving]
+            position = starts[moving] + offset
+            self.__tableau[rows, target, ends[moving] + offset] = self.__tableau[rows, source, position]
+            self.__tableau[rows, source, position] = EMPTY
+        self.__length[games, targets] += counts
+        self.__length[games, sources] = starts
+
+    def __reveal(self, games: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        Turn face up the top card of columns left with face down cards only
+        :param games: game of every column
+        :param columns:
+        :return: points scored by every column
+        """
+        hidden = self.__hidden[games, columns]
+        turned = (hidden > 0) & (hidden == self.__length[games, columns])
+        self.__hidden[games[turned], columns[turned]] -= 1
+        return turned * self.__points['reveal']
+
+
+def _pick(mask: np.ndarray, priority: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Choose an action of the highest priority in every game, at random among equals
+    :param mask: legal actions
+    :param priority: positive for the actions worth playing, broadcast with mask
+    :param rng:
+    :return: action of every game, -1 if none is worth playing
+    """
+    allowed = mask & (priority > 0)
+    keys = np.where(allowed, priority + rng.random(mask.shape, dtype=np.float32), np.float32(-1))
+    actions = keys.argmax(axis=1)
+    actions[~allowed.any(axis=1)] = -1
+    return actions
+
+
+ANY = np.ones(ACTION_COUNT, dtype=np.float32)
+
+
+def random_policy(batch: GameBatch, mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play any legal action
+    :param batch:
+    :param mask: legal actions
+    :param rng:
+    :return:
+    """
+    return _pick(mask, ANY, rng)
+
+
+FOUNDATION_FIRST = np.ones(ACTION_COUNT, dtype=np.float32)
+FOUNDATION_FIRST[TABLEAU_TO_FOUNDATION:WASTE_TO_TABLEAU] = 2
+
+
+def foundation_policy(batch: GameBatch, mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play a card to the foundations when possible, any legal action otherwise
+    :param batch:
+    :param mask: legal actions
+    :param rng:
+    :return:
+    """
+    return _pick(mask, FOUNDATION_FIRST, rng)
+
+
+GREEDY = np.zeros(ACTION_COUNT, dtype=np.float32)
+GREEDY[TABLEAU_TO_FOUNDATION:WASTE_TO_TABLEAU] = 4
+GREEDY[WASTE_TO_TABLEAU:TABLEAU_TO_TABLEAU] = 2
+GREEDY[DRAW] = 1
+
+
+def greedy_policy(batch: GameBatch, mask: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Play to the foundations first, then the runs turning a card face up, then the waste to the tableau,
+    then draw. Runs that turn nothing and cards taken back from the foundations are never played, so the
+    policy cannot go round in circles
+    :param batch:
+    :param mask: legal actions
+    :param rng:
+    :return:
+    """
+    hidden = batch.hidden[..., None]
+    reveals = (batch.run_start() == hidden) & (hidden > 0)
+    priority = np.tile(GREEDY, (len(batch), 1))
+    priority[:, TABLEAU_TO_TABLEAU:FOUNDATION_TO_TABLEAU] = reveals.reshape(len(batch), -1) * 3
+    return _pick(mask, priority, rng)
+
+
+POLICIES: Dict[str, Callable[[GameBatch, np.ndarray, np.random.Generator], np.ndarray]] = {
+    'random': random_policy,
+    'foundation': foundation_policy,
+    'greedy': greedy_policy,
+}
+
+
+def play(batch: GameBatch, policy: str = 'greedy', rng: np.random.Generator = None, max_moves: int = 1000):
+    """
+    Play games to their end: won, without a worthwhile action, stuck drawing, or after max_moves actions.
+    Finished games are dropped from the arrays as the batch shrinks
+    :param batch: games to play, updated in place
+    :param policy: a key of POLICIES
+    :param rng: generator of the policy choices
+    :param max_moves: number of actions after which a game is abandoned
+    :return: arrays of the won flag, moves, score and cards on the foundations of every game, by name
+    """
+    choose = POLICIES[policy]
+    rng = rng if rng is not None else np.random.default_rng()
+    results = {
+        'won': np.zeros(len(batch), dtype=bool),
+        'moves': np.zeros(len(batch), dtype=np.int32),
+        'score': np.zeros(len(batch), dtype=np.int32),
+        'home': np.zeros(len(batch), dtype=np.int16),
+    }
+    games = np.arange(len(batch))
+    while len(games):
+        actions = choose(batch, batch.legal_mask(), rng)
+        batch.step(actions)
+        over = (actions < 0) | batch.won | batch.stuck | (batch.moves >= max_moves)
+        if not over.any():
+            continue
+        ended = games[over]
+        results['won'][ended] = batch.won[over]
+        results['moves'][ended] = batch.moves[over]
+        results['score'][ended] = batch.score[over]
+        results['home'][ended] = batch.home_count[over]
+        games = games[~over]
+        batch.select(~over)
+    return results
+
+
+def simulate(count: int, policy: str = 'greedy', draw: int = 1, recycles: Union[int, None] = None,
+             scoring: str = 'standard', seed: Union[int, None] = None, batch_size: int = 10000,
+             max_moves: int = 1000) -> dict:
+    """
+    Play random deals and summarise the outcomes
+    :param count: number of games
+    :param policy: a key of POLICIES
+    :param draw: number of cards turned by a draw, 1 or 3
+    :param recycles: number of times the waste can be turned over, None for no limit
+    :param scoring: a key of SCORING
+    :param seed: seed of the deals and of the policy choices, None for a random one
+    :param batch_size: number of games played in lockstep
+    :param max_moves: number of actions after which a game is abandoned
+    :return: statistics
+    """
+    rng = np.random.default_rng(seed)
+    # Empty parts keep the concatenations below valid when no game is played
+    won, moves = [np.zeros(0, dtype=bool)], [np.zeros(0, dtype=np.int32)]
+    score, home = [np.zeros(0, dtype=np.int32)], [np.zeros(0, dtype=np.int16)]
+    began = time.perf_counter()
+    for start in range(0, count, batch_size):
+        batch = GameBatch.shuffled(min(batch_size, count - start), rng, draw=draw, recycles=recycles,
+                                   scoring=scoring)
+        results = play(batch, policy, rng, max_moves)
+        won.append(results['won'])
+        moves.append(results['moves'])
+        score.append(results['score'])
+        home.append(results['home'])
+    elapsed = time.perf_counter() - began
+
+    won, moves = np.concatenate(won), np.concatenate(moves)
+    score, home = np.concatenate(score), np.concatenate(home)
+    wins = int(won.sum())
+    rate = wins / count if count else 0.0
+    return {
+        'games': count,
+        'policy': policy,
+        'draw': draw,
+        'recycles': recycles,
+        'scoring': scoring,
+        'wins': wins,
+        'win_rate': rate,
+        # Normal approximation of the 95% confidence interval of the win rate
+        'win_rate_margin': 1.96 * math.sqrt(rate * (1 - rate) / count) if count else 0.0,
+        'mean_moves': float(moves.mean()) if count else 0.0,
+        'mean_moves_won': float(moves[won].mean()) if wins else 0.0,
+        'mean_score': float(score.mean()) if count else 0.0,
+        'mean_home': float(home.mean()) if count else 0.0,
+        'games_per_s': count / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def positive(text: str) -> int:
+    """
+    Parse a strictly positive integer argument
+    :param text:
+    :return:
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError('must be at least 1')
+    return value
+
+
+def main():
+    """
+    Command line entrypoint
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Estimate win rates of playing policies over random deals')
+    parser.add_argument('count', type=positive, help='number of games')
+    parser.add_argument('-p', '--policy', choices=list(POLICIES), default='greedy', help='playing policy')
+    parser.add_argument('-d', '--draw', type=int, choices=[1, 3], default=1, help='cards turned by a draw')
+    parser.add_argument(
+        '-r', '--recycles', type=parse_recycle_limit, metavar='N',
+        help=f'times the waste can be turned over, 0..{GameState.MAX_RECYCLES}, no limit if omitted'
+    )
+    parser.add_argument('--scoring', choices=list(SCORING), default='standard', help='scoring variant')
+    parser.add_argument('-s', '--seed', type=int, help='seed of the deals and choices, random if omitted')
+    parser.add_argument('-b', '--batch-size', type=positive, default=10000, help='games played in lockstep')
+    parser.add_argument('-m', '--max-moves', type=positive, default=1000, help='actions after which a game is abandoned')
+    parser.add_argument('-o', '--output', help='append the statistics as a JSON line to this file')
+    args = parser.parse_args()
+
+    stats = simulate(args.count, args.policy, args.draw, args.recycles, args.scoring, args.seed, args.batch_size,
+                     args.max_moves)
+    for name, value in stats.items():
+        print(f'{name:>16}: {value:.4f}' if isinstance(value, float) else f'{name:>16}: {value}')
+    if args.output:
+        with open(args.output, 'a') as results:
+            results.write(json.dumps(stats) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from typing import List
+
+from GameState import GameState, RANK_COUNT, SUIT_OF, VALUE_OF, can_stack
+
+
+class StateTracker:
+    """
+    Derived game state maintained incrementally from the moves of a GameState
+
+    The tracker keeps, for every pair of piles, the number of legal moves between them. A move only changes
+    the source and destination piles, so only their rows and columns are recomputed. Stock and waste cards
+    count as playable from the waste when stock moves alone can bring them on top of it; those cards only
+    change with a move of the stock or the waste, and are recomputed then.
+    """
+
+    def __init__(self, state: GameState):
+        """
+        Constructor. Start tracking a state
+        :param state:
+        """
+        self.__state = state
+        self.__pairs = [[0] * GameState.PILE_COUNT for _ in range(GameState.PILE_COUNT)]
+        self.__move_count = 0
+        self.__talon: List[int] = []
+
+        self.reset()
+        state.add_listener(self.on_move)
+
+    def detach(self):
+        """
+        Stop tracking the state
+        :return:
+        """
+        self.__state.remove_listener(self.on_move)
+
+    def reset(self):
+        """
+        Recompute everything, needed when the state was changed by other means than moves
+        :return:
+        """
+        self.__move_count = 0
+        self.__talon = [card for card, _ in self.__state.talon_reach()[0]]
+        for src in range(GameState.PILE_COUNT):
+            for dst in range(GameState.PILE_COUNT):
+                self.__pairs[src][dst] = self.__count(src, dst)
+                self.__move_count += self.__pairs[src][dst]
+
+    def on_move(self, src: int, dst: int, count: int, flipped: bool):
+        """
+        Update after a move of the tracked state
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :param flipped: True if a card was turned face up
+        :return:
+        """
+        if GameState.WASTE in (src, dst):
+            self.__talon = [card for card, _ in self.__state.talon_reach()[0]]
+        self.__update(src)
+        self.__update(dst)
+
+    @property
+    def won(self) -> bool:
+        """
+        Check if all cards are on the foundations
+        """
+        return self.__state.is_won()
+
+    @property
+    def all_revealed(self) -> bool:
+        """
+        Check if every tableau card is facing up
+        """
+        return self.__state.all_revealed()
+
+    @property
+    def hidden_count(self) -> int:
+        """
+        Get number of face down cards in the tableau
+        """
+        return self.__state.hidden_count
+
+    def foundation_count(self, suit: int) -> int:
+        """
+        Get number of cards on a foundation
+        :param suit: card type, numbered as CardWidget.Type
+        :return:
+        """
+        return self.__state.foundations[suit - 1]
+
+    @property
+    def move_count(self) -> int:
+        """
+        Get number of legal card moves, stock moves excluded
+        """
+        return self.__move_count
+
+    @property
+    def no_moves_left(self) -> bool:
+        """
+        Check if no card can be moved anymore
+        """
+        return self.__move_count == 0
+
+    def __update(self, pile: int):
+        """
+        Recompute the moves from and to a pile
+        :param pile: pile index
+        :return:
+        """
+        for other in range(GameState.PILE_COUNT):
+            for src, dst in ((pile, other), (other, pile)):
+                count = self.__count(src, dst)
+                self.__move_count += count - self.__pairs[src][dst]
+                self.__pairs[src][dst] = count
+
+    def __fits(self, card: int, dst: int) -> bool:
+        """
+        Check if a card can be placed on a pile
+        :param card: card code
+        :param dst: destination pile index
+        :return:
+        """
+        if dst < GameState.TABLEAU_COUNT:
+            top = self.__state.top(dst)
+            return VALUE_OF[card] == RANK_COUNT if top is None else can_stack(card, top)
+        suit = dst - GameState.FOUNDATION
+        return SUIT_OF[card] - 1 == suit and self.__state.foundations[suit] == VALUE_OF[card] - 1
+
+    def __count(self, src: int, dst: int) -> int:
+        """
+        Count the legal moves from a pile to another
+        :param src: source pile index
+        :param dst: destination pile index
+        :return:
+        """
+        state = self.__state
+        if src == dst or src == GameState.STOCK or dst >= GameState.STOCK:
+            return 0
+        if src == GameState.WASTE:
+            return sum(1 for card in self.__talon if self.__fits(card, dst))
+        if GameState.is_foundation(src):
+            top = state.top(src)
+            return int(top is not None and dst < GameState.TABLEAU_COUNT and self.__fits(top, dst))
+
+        column = state.tableau[src]
+        if not column:
+            return 0
+        if not GameState.is_tableau(dst):
+            return int(self.__fits(column[-1], dst))
+
+        moves = 0
+        position = len(column) - 1
+        while True:
+            if self.__fits(column[position], dst):
+                moves += 1
+            if position == state.hidden[src] or not can_stack(column[position], column[position - 1]):
+                return moves
+            position -= 1
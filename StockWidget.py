@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QGraphicsSceneMouseEvent
+
+from PileWidget import PileWidget
+
+
+class StockWidget(PileWidget):
+    """
+    Class for the face down stock. Its cards cannot be picked up, so their clicks fall through to this item,
+    which draws from the stock, or turns the waste back over once the stock is empty
+    """
+
+    def mousePressEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        """
+        Handle mouse press events, accepting the left button to receive its release
+        :param event:
+        :return:
+        """
+        if event.button() is not Qt.MouseButton.LeftButton:
+            event.ignore()
+            return
+        event.accept()
+
+    def mouseReleaseEvent(self, event: QGraphicsSceneMouseEvent) -> None:
+        """
+        Handle mouse release events
+        :param event:
+        :return:
+        """
+        if event.button() is Qt.MouseButton.LeftButton and self.contains(event.pos()):
+            self.board.cycle_stock()
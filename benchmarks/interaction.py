@@ -0,0 +1,250 @@
+"""
+Interaction benchmark: drag and drop, double-click and stock clicks driven through the real card handlers
+
+Every seed is dealt on a GameWidget under the offscreen Qt platform and played along its solver line with
+synthetic mouse events sent to the view: a press, MOVE_STEPS moves and a release per drag, a double-click
+per move to a foundation, a click on the stock per draw or recycle. The line is played until the tableau is
+revealed, then the board auto-completes when it can, or the line is played to the end. Run from anywhere:
+
+    python benchmarks/interaction.py --seeds 0 1 2 --draw 3 --output interaction.json
+
+Latencies are measured around the delivery of each event, Qt dispatch included. Peak memory is the
+resident set size of the process; --trace-memory adds the peak of Python allocations at the cost of speed.
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import argparse
+import json
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from PyQt6.QtCore import QPoint, QPointF, QStandardPaths, Qt, QTimer
+from PyQt6.QtTest import QTest
+from PyQt6.QtWidgets import QApplication
+
+from GameState import parse_recycle_limit
+
+MOVE_STEPS = 8
+KINDS = ['press', 'move', 'release', 'double_click', 'stock_click']
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Get a percentile of samples
+    :param values: sorted samples
+    :param fraction: in range 0..1
+    :return:
+    """
+    return values[min(len(values) - 1, int(fraction * len(values)))] if values else 0.0
+
+
+def double_click(viewport, point: QPoint):
+    """
+    Double-click with the sequence of a real mouse: QTest.mouseDClick alone only sends the double-click event
+    :param viewport:
+    :param point:
+    :return:
+    """
+    left, none = Qt.MouseButton.LeftButton, Qt.KeyboardModifier.NoModifier
+    QTest.mousePress(viewport, left, none, point)
+    QTest.mouseRelease(viewport, left, none, point)
+    QTest.mouseDClick(viewport, left, none, point)
+    QTest.mouseRelease(viewport, left, none, point)
+
+
+class Driver:
+    """
+    Plays moves on a GameWidget with mouse events, timing every event
+    """
+
+    def __init__(self, widget):
+        """
+        Constructor
+        :param widget: initialised and shown GameWidget
+        """
+        self.__widget = widget
+        self.__view = widget.view
+        self.__viewport = widget.view.viewport()
+        self.__containers = widget.deck_containers + widget.pile_containers + [
+            widget.draw_container, widget.waste_container
+        ]
+        self.latencies = {kind: [] for kind in KINDS}
+
+    def __send(self, kind: str, action, *args):
+        """
+        Deliver an event and time it
+        :param kind: event kind, one of KINDS
+        :param action: QTest function
+        :param args: its arguments
+        :return:
+        """
+        start = time.perf_counter()
+        action(self.__viewport, *args)
+        self.latencies[kind].append(time.perf_counter() - start)
+
+    def __point(self, scene: QPointF) -> QPoint:
+        """
+        Map a scene position to the viewport
+        :param scene:
+        :return:
+        """
+        return self.__view.mapFromScene(scene)
+
+    def play(self, src: int, dst: int, count: int):
+        """
+        Play a move the way a player would
+        :param src: source pile index
+        :param dst: destination pile index
+        :param count: number of cards
+        :return:
+        """
+        none = Qt.KeyboardModifier.NoModifier
+        if src == 11 or dst == 11:
+            # The stock is clicked even when empty, to turn the waste over
+            stock = self.__containers[11].sceneBoundingRect().center()
+            self.__send('stock_click', QTest.mouseClick, Qt.MouseButton.LeftButton, none, self.__point(stock))
+            return
+
+        card = self.__containers[src].cards[-count]
+        grab = card.sceneBoundingRect().topLeft() + QPointF(30, 8)
+        if count == 1 and 7 <= dst < 11:
+            self.__send('double_click', double_click, self.__point(grab))
+            return
+
+        container = self.__containers[dst]
+        target = QPointF(container.x() + 37.5, container.y() + (100 if dst < 7 else 55))
+        drop = grab + target - card.sceneBoundingRect().center()
+        self.__send('press', QTest.mousePress, Qt.MouseButton.LeftButton, none, self.__point(grab))
+        for step in range(1, MOVE_STEPS + 1):
+            self.__send('move', QTest.mouseMove, self.__point(grab + (drop - grab) * (step / MOVE_STEPS)))
+        self.__send('release', QTest.mouseRelease, Qt.MouseButton.LeftButton, none, self.__point(drop))
+
+
+def run_seed(seed: int, draw: int = 1, recycles: int = None) -> dict:
+    """
+    Play the solver line of a seed
+    :param seed:
+    :param draw: number of cards turned over by a draw, 1 or 3
+    :param recycles: number of times the waste can be turned over, None for no limit
+    :return: results, None if the seed could not be solved
+    """
+    from Deal import Deal
+    from GameWidget import GameWidget
+    from MoveGenerator import completion
+    from Solver import Solver
+
+    deal = Deal.from_seed(seed)
+    line = Solver(max_nodes=1000000).solve_deal(deal.cards, draw, recycles)
+    if not line.solvable:
+        return None
+
+    widget = GameWidget(deal=deal, draw_count=draw, recycle_limit=recycles)
+    widget.init()
+    widget.animator.enabled = False
+    widget.resize(1280, 720)
+    # Without the layout of MainWidget, the view has to be stretched over the board by hand
+    widget.view.setGeometry(widget.rect())
+    widget.show()
+    QApplication.processEvents()
+
+    driver = Driver(widget)
+    began = time.perf_counter()
+    for move in line.moves:
+        if widget.state.all_revealed() and completion(widget.state) is not None:
+            break
+        if not widget.state.can_move(*move):
+            raise RuntimeError(f'seed {seed}: {move} is not legal, the board diverged from the solver line')
+        played = len(widget.history)
+        driver.play(*move)
+        if len(widget.history) == played:
+            raise RuntimeError(f'seed {seed}: the events of {move} did not play it')
+    elapsed = time.perf_counter() - began
+
+    deadline = time.perf_counter() + 30
+    while not widget.state.is_won() and time.perf_counter() < deadline:
+        QApplication.processEvents()
+    widget.close()
+
+    events = sum(len(values) for values in driver.latencies.values())
+    result = {
+        'seed': seed,
+        'won': widget.state.is_won(),
+        'events': events,
+        'events_per_s': events / elapsed if elapsed > 0 else 0.0,
+    }
+    for kind, values in driver.latencies.items():
+        values = sorted(values)
+        result[kind] = {
+            'count': len(values),
+            'p50_ms': percentile(values, 0.5) * 1000,
+            'p95_ms': percentile(values, 0.95) * 1000,
+            'p99_ms': percentile(values, 0.99) * 1000,
+            'max_ms': (values[-1] if values else 0.0) * 1000,
+        }
+    return result
+
+
+def main():
+    """
+    Command line entrypoint
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Measure drag and drop handling under the offscreen platform')
+    parser.add_argument('-s', '--seeds', type=int, nargs='+', default=[0, 1, 2, 3, 4], help='deals to play')
+    parser.add_argument('-d', '--draw', type=int, default=1, choices=[1, 3], help='cards turned over by a draw')
+    parser.add_argument(
+        '-r', '--recycles', type=parse_recycle_limit, metavar='N', help='number of times the waste can be turned over'
+    )
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--trace-memory', action='store_true', help='also measure peak Python allocations')
+    args = parser.parse_args()
+
+    # Keep the autosave and caches of the benchmark away from the user's
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+    # Dismiss the end of game message boxes like a player would
+    dismiss = QTimer()
+    dismiss.timeout.connect(lambda: app.activeModalWidget() and app.activeModalWidget().close())
+    dismiss.start(10)
+
+    if args.trace_memory:
+        tracemalloc.start()
+
+    seeds = []
+    for seed in args.seeds:
+        result = run_seed(seed, args.draw, args.recycles)
+        if result is None:
+            print(f'seed {seed}: skipped, not solved')
+            continue
+        seeds.append(result)
+        print(f"seed {seed}: {result['events']} events, {result['events_per_s']:.0f} events/s, "
+              f"release p95 {result['release']['p95_ms']:.2f} ms")
+
+    summary = {
+        'events': sum(result['events'] for result in seeds),
+        'events_per_s': statistics.median(result['events_per_s'] for result in seeds) if seeds else 0.0,
+        'max_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+    for kind in KINDS:
+        summary[f'{kind}_p95_ms'] = max((result[kind]['p95_ms'] for result in seeds), default=0.0)
+    if args.trace_memory:
+        summary['peak_python_bytes'] = tracemalloc.get_traced_memory()[1]
+    for name, value in summary.items():
+        print(f'{name:>22}: {value:.2f}' if isinstance(value, float) else f'{name:>22}: {value}')
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'seeds': seeds, 'summary': summary}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Startup benchmark: import time, menu time-to-first-frame and game time-to-first-frame
+
+Every sample runs in a fresh interpreter under the offscreen Qt platform so that module and pixmap caches
+do not leak between samples. Run from anywhere:
+
+    python benchmarks/startup.py --repeat 10 --output startup.json
+
+The game is started --delay milliseconds after the menu's first frame, like a player pressing Start; use
+--delay 0 to measure a game started before any background warm-up could run.
+"""
+import time
+
+START = time.perf_counter()
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+METRICS = ['import_ms', 'menu_first_frame_ms', 'game_first_frame_ms']
+
+
+def sample(delay: int) -> dict:
+    """
+    Measure one startup in the current process
+    :param delay: milliseconds between the menu's first frame and the start of the game
+    :return: timings in milliseconds
+    """
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)
+
+    from PyQt6.QtCore import QEvent, QObject, QStandardPaths, QTimer
+    from PyQt6.QtWidgets import QApplication, QGraphicsView
+
+    # Start from a fresh deal every time, without the autosave of the user
+    QStandardPaths.setTestModeEnabled(True)
+    app = QApplication([])
+    timings = {}
+
+    before_import = time.perf_counter()
+    from MainWidget import MainWidget
+    timings['import_ms'] = (time.perf_counter() - before_import) * 1000
+
+    class FirstFrame(QObject):
+        """
+        Event filter recording the first paint of the menu and of the game view
+        """
+        game_started = None
+
+        def eventFilter(self, watched, event):
+            """
+            Record first frames
+            """
+            if event.type() == QEvent.Type.Paint:
+                if 'menu_first_frame_ms' not in timings:
+                    timings['menu_first_frame_ms'] = (time.perf_counter() - START) * 1000
+                    QTimer.singleShot(delay, start_game)
+                elif FirstFrame.game_started is not None and isinstance(watched.parent(), QGraphicsView):
+                    timings['game_first_frame_ms'] = (time.perf_counter() - FirstFrame.game_started) * 1000
+                    app.removeEventFilter(self)
+                    QTimer.singleShot(0, app.quit)
+            return False
+
+    def start_game():
+        """
+        Press the start button
+        """
+        FirstFrame.game_started = time.perf_counter()
+        window.started()
+
+    first_frame = FirstFrame()
+    app.installEventFilter(first_frame)
+
+    window = MainWidget()
+    window.init()
+    window.resize(1280, 720)
+    window.show()
+    app.exec()
+
+    return timings
+
+
+def main():
+    """
+    Command line entrypoint
+    :return:
+    """
+    parser = argparse.ArgumentParser(description='Measure application startup under the offscreen platform')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='number of samples')
+    parser.add_argument('-d', '--delay', type=int, default=250, help='milliseconds before starting the game')
+    parser.add_argument('-o', '--output', help='write samples and summary as JSON to this file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(sample(args.delay)))
+        return
+
+    environment = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    samples = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--child', '--delay', str(args.delay)],
+            env=environment, capture_output=True, text=True, check=True
+        ).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+
+    summary = {
+        metric: {
+            'median': statistics.median(sample[metric] for sample in samples),
+            'min': min(sample[metric] for sample in samples),
+        } for metric in METRICS
+    }
+    for metric in METRICS:
+        print(f"{metric:>22}: median {summary[metric]['median']:8.1f}  min {summary[metric]['min']:8.1f}")
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'samples': samples, 'summary': summary}, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,42 @@
+import argparse
+
 from PyQt6.QtWidgets import QApplication
 
+from GameState import GameState, parse_recycle_limit
 from MainWidget import MainWidget
+from RenderProfile import RenderProfile
+
 
 if __name__ == '__main__':
     """
     The entrypoint of the application
     """
+    parser = argparse.ArgumentParser(description='Klondike solitaire')
+    parser.add_argument('--record', metavar='FILE', help='record the game, replay it with Replay.py')
+    parser.add_argument('--profile', default='default', choices=RenderProfile.names(), help='rendering profile')
+    parser.add_argument('--fps', action='store_true', help='show frame statistics over the game')
+    parser.add_argument('--frame-log', metavar='FILE', help='append frame statistics to a file every second')
+    parser.add_argument('--draw', type=int, default=1, choices=[1, 3], help='number of cards turned over by a draw')
+    parser.add_argument(
+        '--recycles', type=parse_recycle_limit, metavar='N',
+        help=f'number of times the waste can be turned over, 0..{GameState.MAX_RECYCLES}, no limit by default'
+    )
+    parser.add_argument(
+        '--instrument', action='store_true', help='time input handling, reported on exit and when F12 is pressed'
+    )
+    args = parser.parse_args()
+
     app = QApplication([])
-    game = MainWidget()
+    if args.instrument:
+        import Instrumentation
+        Instrumentation.enable()
+    game = MainWidget(
+        record=args.record, profile=args.profile, fps=args.fps, frame_log=args.frame_log, draw_count=args.draw,
+        recycle_limit=args.recycles
+    )
     game.init()
+    if args.instrument:
+        Instrumentation.bind(game)
     game.resize(1280, 720)
     game.show()
     app.exec()
-
@@ -0,0 +1,70 @@
+import os
+import sys
+
+# The modules live at the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from GameState import GameState, SUIT_OF  # noqa: E402
+from Simulator import (  # noqa: E402
+    COLUMNS, DRAW, FOUNDATION_TO_TABLEAU, TABLEAU_TO_FOUNDATION, TABLEAU_TO_TABLEAU, WASTE_TO_FOUNDATION,
+    WASTE_TO_TABLEAU
+)
+
+
+def brute_force_moves(state: GameState) -> list:
+    """
+    Enumerate the legal moves of a position by asking can_move about every pile pair and card count
+    :param state:
+    :return: (src, dst, count) moves, sorted
+    """
+    return [
+        (src, dst, count) for src in range(GameState.PILE_COUNT) for dst in range(GameState.PILE_COUNT)
+        for count in range(1, state.size(src) + 1) if state.can_move(src, dst, count)
+    ]
+
+
+def action_move(state: GameState, action: int):
+    """
+    Translate a batch action to the GameState move it stands for
+    :param state:
+    :param action:
+    :return: move as (src, dst, count), None if the action has no legal counterpart
+    """
+    if action < WASTE_TO_FOUNDATION:
+        src = action - TABLEAU_TO_FOUNDATION
+        card = state.top(src)
+        move = None if card is None else (src, GameState.FOUNDATION + SUIT_OF[card] - 1, 1)
+    elif action == WASTE_TO_FOUNDATION:
+        card = state.top(GameState.WASTE)
+        move = None if card is None else (GameState.WASTE, GameState.FOUNDATION + SUIT_OF[card] - 1, 1)
+    elif action < TABLEAU_TO_TABLEAU:
+        move = (GameState.WASTE, action - WASTE_TO_TABLEAU, 1)
+    elif action < FOUNDATION_TO_TABLEAU:
+        src, dst = divmod(action - TABLEAU_TO_TABLEAU, COLUMNS)
+        counts = [count for count in range(1, state.size(src) + 1) if state.can_move(src, dst, count)]
+        assert len(counts) <= 1
+        move = (src, dst, counts[0]) if counts else None
+    elif action < DRAW:
+        suit, dst = divmod(action - FOUNDATION_TO_TABLEAU, COLUMNS)
+        move = (GameState.FOUNDATION + suit, dst, 1)
+    else:
+        return state.stock_move()
+    return move if move is not None and state.can_move(*move) else None
+
+
+def move_action(move: tuple) -> int:
+    """
+    Translate a GameState move to the batch action playing it
+    :param move: (src, dst, count) move
+    :return:
+    """
+    src, dst, _ = move
+    if GameState.is_stock_move(move):
+        return DRAW
+    if GameState.is_foundation(dst):
+        return WASTE_TO_FOUNDATION if src == GameState.WASTE else TABLEAU_TO_FOUNDATION + src
+    if src == GameState.WASTE:
+        return WASTE_TO_TABLEAU + dst
+    if GameState.is_foundation(src):
+        return FOUNDATION_TO_TABLEAU + (src - GameState.FOUNDATION) * COLUMNS + dst
+    return TABLEAU_TO_TABLEAU + src * COLUMNS + dst
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from BatchSolve import completed_seeds, pending_seeds, run
+
+
+def records(path) -> list:
+    """
+    Read the records of a results file
+    :param path:
+    :return:
+    """
+    with open(path) as results:
+        return [json.loads(line) for line in results]
+
+
+def test_completed_seeds_skip_damaged_lines_and_other_rules(tmp_path):
+    """
+    Only complete records of the same rules count as done
+    """
+    path = tmp_path / 'deals.jsonl'
+    path.write_text(
+        '{"seed": 1, "draw": 1, "recycles": null}\n'
+        '{"seed": 2, "draw": 3, "recycles": null}\n'
+        '{"seed": 3, "draw": 3, "recycles": 2}\n'
+        'not json\n'
+        '{"seed": 4, "draw": 1, "recyc'
+    )
+    assert completed_seeds(str(path)) == {1}
+    assert completed_seeds(str(path), 3) == {2}
+    assert completed_seeds(str(path), 3, 2) == {3}
+    assert completed_seeds(str(tmp_path / 'missing.jsonl')) == set()
+
+
+def test_pending_seeds():
+    """
+    Seeds already done are skipped, the others come in order
+    """
+    assert list(pending_seeds(10, 5, {11, 13, 20})) == [10, 12, 14]
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, 2)])
+def test_run_resumes(tmp_path, draw_count, recycle_limit):
+    """
+    A run interrupted in the middle of a line is completed without solving any deal twice
+    """
+    path = tmp_path / 'deals.jsonl'
+    run(str(path), 0, 4, 1, 1.0, 500, draw_count, recycle_limit)
+    first = records(path)
+    assert sorted(record['seed'] for record in first) == [0, 1, 2, 3]
+    assert all((record['draw'], record['recycles']) == (draw_count, recycle_limit) for record in first)
+
+    # Cut the last record as an interrupted run would
+    text = path.read_text()
+    path.write_text(text[:-10])
+    run(str(path), 0, 8, 1, 1.0, 500, draw_count, recycle_limit)
+    lines = path.read_text().splitlines()
+    seeds = sorted(json.loads(line)['seed'] for line in lines[:3] + lines[4:])
+    assert seeds == list(range(8))
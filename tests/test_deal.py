@@ -0,0 +1,68 @@
+import math
+import random
+
+import pytest
+
+from Deal import Deal
+from GameState import CARD_COUNT
+
+
+def test_seeded_deals_are_stable():
+    """
+    A seed always gives the same permutation of the 52 cards
+    """
+    deal = Deal.from_seed(42)
+    assert deal.cards == Deal.from_seed(42).cards
+    assert sorted(deal.cards) == list(range(CARD_COUNT))
+    assert deal.cards != Deal.from_seed(43).cards
+
+
+def test_code_round_trip():
+    """
+    Deals come back from their code, their bytes and their rank
+    """
+    deals = [Deal.from_seed(seed) for seed in range(50)]
+    deals += [Deal(list(range(CARD_COUNT))), Deal(list(reversed(range(CARD_COUNT))))]
+    for deal in deals:
+        code = deal.code
+        assert len(code) == 39
+        assert Deal.from_code(code).cards == deal.cards
+        assert Deal.from_bytes(deal.to_bytes()).cards == deal.cards
+        assert Deal.from_rank(deal.rank()).cards == deal.cards
+
+
+def test_rank_bounds():
+    """
+    The identity and the reversed deck have the lowest and the highest rank
+    """
+    assert Deal(list(range(CARD_COUNT))).rank() == 0
+    assert Deal(list(reversed(range(CARD_COUNT)))).rank() == math.factorial(CARD_COUNT) - 1
+    with pytest.raises(ValueError):
+        Deal.from_rank(math.factorial(CARD_COUNT))
+
+
+def test_random_ranks_round_trip():
+    """
+    Any rank below 52! decodes to a deal of that rank
+    """
+    choices = random.Random(1)
+    for _ in range(100):
+        rank = choices.randrange(math.factorial(CARD_COUNT))
+        assert Deal.from_rank(rank).rank() == rank
+
+
+@pytest.mark.parametrize('cards', [list(range(51)), [0] * CARD_COUNT])
+def test_invalid_decks(cards):
+    """
+    A deal must hold every card once
+    """
+    with pytest.raises(ValueError):
+        Deal(cards)
+
+
+def test_from_bytes_length():
+    """
+    Codes of the wrong length are refused
+    """
+    with pytest.raises(ValueError):
+        Deal.from_bytes(bytes(Deal.CODE_BYTES - 1))
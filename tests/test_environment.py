@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from conftest import action_move, move_action
+from Deal import Deal
+from Environment import HIDDEN, KlondikeEnv, OBSERVATION_SIZE, VectorEnv, WASTE_SHOWN
+from GameState import GameState
+from Simulator import ACTION_COUNT, COLUMN_SIZE, EMPTY
+from Solver import Solver
+
+
+def expected_observation(state: GameState) -> list:
+    """
+    Build the observation of a position from GameState
+    :param state:
+    :return:
+    """
+    observation = []
+    for column, hidden in zip(state.tableau, state.hidden):
+        observation += [HIDDEN] * hidden + column[hidden:] + [EMPTY] * (COLUMN_SIZE - len(column))
+    shown = list(state.waste)[-WASTE_SHOWN:]
+    observation += state.foundations + [EMPTY] * (WASTE_SHOWN - len(shown)) + shown
+    return observation + [len(state.stock), len(state.waste)]
+
+
+def expected_mask(state: GameState) -> list:
+    """
+    Build the action mask of a position from GameState
+    :param state:
+    :return:
+    """
+    return [action_move(state, action) is not None for action in range(ACTION_COUNT)]
+
+
+@pytest.mark.parametrize('draw, recycles', [(1, None), (3, None), (3, 1)])
+def test_single_environment_follows_game_state(draw, recycles):
+    """
+    Observations and action masks match GameState at every step of random play from a seed
+    """
+    rng = np.random.default_rng(draw)
+    env = KlondikeEnv(draw, recycles)
+    state = GameState.deal(Deal.from_seed(7).cards, draw, recycles)
+    observation, info = env.reset(7)
+    assert observation.shape == (OBSERVATION_SIZE,)
+    for _ in range(200):
+        assert observation.tolist() == expected_observation(state)
+        assert info['action_mask'].tolist() == expected_mask(state)
+        action = int(rng.choice(env.legal_actions()))
+        state.move(*action_move(state, action))
+        observation, _, terminated, truncated, info = env.step(action)
+        if terminated or truncated:
+            break
+
+
+def test_single_environment_episode():
+    """
+    A winning line ends the episode as won, and stepping afterwards or illegally is refused
+    """
+    env = KlondikeEnv()
+    with pytest.raises(RuntimeError):
+        env.step(0)
+    env.reset(0)
+    illegal = int(np.flatnonzero(~env.action_mask())[0])
+    with pytest.raises(ValueError):
+        env.step(illegal)
+
+    state = GameState.deal(Deal.from_seed(0).cards)
+    moves = Solver().solve(state).moves
+    for number, move in enumerate(moves):
+        _, _, terminated, truncated, info = env.step(move_action(move))
+        assert terminated == (number == len(moves) - 1)
+        assert not truncated
+    assert info['won']
+    with pytest.raises(RuntimeError):
+        env.step(0)
+
+
+def test_vector_environment():
+    """
+    Seeded resets repeat, observations are contiguous, and ended episodes are dealt again in the same step
+    """
+    env = VectorEnv(4, draw=3, max_moves=5)
+    observations, info = env.reset(3)
+    assert observations.shape == (4, OBSERVATION_SIZE)
+    assert observations.dtype == np.int8 and observations.flags['C_CONTIGUOUS']
+    assert info['action_mask'].shape == (4, ACTION_COUNT)
+    assert np.array_equal(env.reset(3)[0], observations)
+
+    with pytest.raises(ValueError):
+        env.step(np.zeros(3, dtype=int))
+    with pytest.raises(ValueError):
+        env.step(np.argmin(env.action_mask(), axis=1))
+
+    rng = np.random.default_rng(0)
+    for _ in range(5):
+        mask = env.action_mask()
+        actions = np.array([rng.choice(np.flatnonzero(row)) for row in mask])
+        observations, rewards, terminated, truncated, info = env.step(actions)
+        assert rewards.shape == (4,)
+    # Every episode reached max_moves in the last step and was dealt again
+    assert (terminated | truncated).all()
+    assert sorted(info['final_index'].tolist()) == [0, 1, 2, 3]
+    assert (env.batch.moves == 0).all()
+    assert (observations[:, -2] == 24).all()
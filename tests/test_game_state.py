@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from conftest import brute_force_moves
+from Deal import Deal
+from GameState import CARD_COUNT, GameState
+
+
+def snapshot(state: GameState) -> tuple:
+    """
+    Get everything a position is made of
+    :param state:
+    :return:
+    """
+    return (state.key(), [column[:] for column in state.tableau], state.hidden[:], state.foundations[:],
+            list(state.stock), list(state.waste), state.recycled, state.hidden_count, state.is_won())
+
+
+def cards_of(state: GameState) -> list:
+    """
+    Get the card codes of every pile, foundations included
+    :param state:
+    :return:
+    """
+    cards = [card for column in state.tableau for card in column] + list(state.stock) + list(state.waste)
+    for suit, value in enumerate(state.foundations):
+        cards.extend(range(suit * 13, suit * 13 + value))
+    return cards
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, None), (3, 1), (1, 0)])
+def test_move_revert_round_trip(draw_count, recycle_limit):
+    """
+    Reverting every move of a random game, in reverse order, goes back through the same positions
+    """
+    choices = random.Random(draw_count * 10 + (recycle_limit or 0))
+    for seed in range(5):
+        state = GameState.deal(Deal.from_seed(seed).cards, draw_count, recycle_limit)
+        played = []
+        positions = [snapshot(state)]
+        for _ in range(200):
+            moves = brute_force_moves(state)
+            if not moves:
+                break
+            move = choices.choice(moves)
+            played.append((move, state.move(*move)))
+            positions.append(snapshot(state))
+            assert sorted(cards_of(state)) == list(range(CARD_COUNT))
+
+        while played:
+            move, flipped = played.pop()
+            positions.pop()
+            state.revert(*move, flipped)
+            assert snapshot(state) == positions[-1]
+
+
+def test_listeners_see_moves_and_reverse_moves():
+    """
+    Listeners receive every move, and the reverse move when it is reverted
+    """
+    state = GameState.deal(Deal.from_seed(1).cards)
+    seen = []
+    state.add_listener(lambda *move: seen.append(move))
+    move = state.stock_move()
+    flipped = state.move(*move)
+    state.revert(*move, flipped)
+    assert seen == [move + (flipped,), (move[1], move[0], move[2], flipped)]
+
+
+def test_copy_is_independent():
+    """
+    Moves on a copy leave the original untouched
+    """
+    state = GameState.deal(Deal.from_seed(2).cards, 3, 2)
+    before = snapshot(state)
+    copy = state.copy()
+    assert copy.key() == state.key()
+    for move in brute_force_moves(copy)[:1] + [copy.stock_move()]:
+        copy.move(*move)
+    assert snapshot(state) == before
+    assert copy.key() != state.key()
+
+
+def test_restore_matches_played_position():
+    """
+    Restoring a position from its piles gives the same key and the same legal moves
+    """
+    choices = random.Random(7)
+    state = GameState.deal(Deal.from_seed(3).cards, 3, 2)
+    for _ in range(60):
+        moves = brute_force_moves(state)
+        state.move(*choices.choice(moves))
+        restored = GameState.restore(state.tableau, state.hidden, state.foundations, state.stock, state.waste,
+                                     state.draw_count, state.recycle_limit, state.recycled)
+        assert restored.key() == state.key()
+        assert restored.hidden_count == state.hidden_count
+        assert brute_force_moves(restored) == brute_force_moves(state)
+
+
+def test_key_tells_positions_apart():
+    """
+    Distinct positions along a game have distinct keys, and equal keys mean equal positions
+    """
+    choices = random.Random(3)
+    state = GameState.deal(Deal.from_seed(4).cards, 1, 1)
+    keys = {}
+    for _ in range(150):
+        moves = brute_force_moves(state)
+        if not moves:
+            break
+        state.move(*choices.choice(moves))
+        position = snapshot(state)[1:]
+        assert keys.setdefault(state.key(), position) == position
+
+
+def test_stock_moves():
+    """
+    Drawing turns draw_count cards over, the waste is turned back once the stock is empty within the limit
+    """
+    state = GameState.deal(Deal.from_seed(5).cards, 3, 1)
+    order = list(reversed(state.stock))
+    while state.stock:
+        assert state.stock_move() == (GameState.STOCK, GameState.WASTE, min(3, len(state.stock)))
+        state.cycle_stock()
+    assert list(state.waste) == order
+    assert state.stock_move() == (GameState.WASTE, GameState.STOCK, len(order))
+    state.cycle_stock()
+    assert list(reversed(state.stock)) == order and not state.waste and state.recycled == 1
+    while state.stock:
+        state.cycle_stock()
+    assert state.stock_move() is None
+    assert not state.cycle_stock()
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(2, None), (1, -1), (1, GameState.MAX_RECYCLES + 1)])
+def test_invalid_rules(draw_count, recycle_limit):
+    """
+    Rules outside of what the game supports are refused
+    """
+    with pytest.raises(ValueError):
+        GameState(draw_count, recycle_limit)
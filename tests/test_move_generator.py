@@ -0,0 +1,76 @@
+import random
+
+import pytest
+
+from conftest import brute_force_moves
+from Deal import Deal
+from GameState import GameState, RANK_COUNT
+from MoveGenerator import HintEngine, completion, legal_moves
+from Solver import Solver
+
+
+def positions(seed: int, draw_count: int, recycle_limit, moves: int = 150):
+    """
+    Yield the positions of a random game
+    :param seed: deal and move choice seed
+    :param draw_count:
+    :param recycle_limit:
+    :param moves: number of moves
+    :return:
+    """
+    choices = random.Random(seed)
+    state = GameState.deal(Deal.from_seed(seed).cards, draw_count, recycle_limit)
+    for _ in range(moves):
+        yield state
+        legal = brute_force_moves(state)
+        if not legal:
+            return
+        state.move(*choices.choice(legal))
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, None), (3, 1), (1, 0)])
+def test_legal_moves_match_can_move(draw_count, recycle_limit):
+    """
+    The table-driven generator finds exactly the moves can_move allows
+    """
+    for seed in range(8):
+        for state in positions(seed, draw_count, recycle_limit):
+            moves = legal_moves(state)
+            assert len(moves) == len(set(moves))
+            assert sorted(moves) == brute_force_moves(state)
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_completion_wins_revealed_games(seed):
+    """
+    Completion moves are legal and win as soon as a winning line has turned every tableau card face up
+    """
+    state = GameState.deal(Deal.from_seed(seed).cards)
+    result = Solver().solve(state)
+    assert result.solvable
+    for move in result.moves:
+        if state.all_revealed():
+            break
+        assert completion(state) is None
+        state.move(*move)
+    moves = completion(state)
+    assert moves is not None
+    for move in moves:
+        assert state.can_move(*move)
+        state.move(*move)
+    assert state.is_won()
+
+
+def test_hints_are_legal():
+    """
+    Every hint is a legal move, and a won game gets no hint
+    """
+    engine = HintEngine()
+    for state in positions(3, 3, None, 60):
+        move = engine.hint(state)
+        assert move is None or state.can_move(*move)
+
+    won = GameState.restore([[] for _ in range(GameState.TABLEAU_COUNT)], [0] * GameState.TABLEAU_COUNT,
+                            [RANK_COUNT] * 4, [])
+    assert won.is_won()
+    assert engine.hint(won) is None
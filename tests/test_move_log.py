@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from conftest import brute_force_moves
+from Deal import Deal
+from GameState import GameState
+from MoveLog import MoveLog
+
+
+def test_pack_unpack_round_trip():
+    """
+    Every pile pair, card count up to a full stock and flip flag survives packing
+    """
+    for src in range(GameState.PILE_COUNT):
+        for dst in range(GameState.PILE_COUNT):
+            for count in range(25):
+                for flipped in (False, True):
+                    record = MoveLog.pack(src, dst, count, flipped)
+                    assert record < 1 << 16
+                    assert MoveLog.unpack(record) == (src, dst, count, flipped)
+
+
+def test_undo_redo_cursor():
+    """
+    Undo and redo walk the log, a new move forgets the undone ones
+    """
+    log = MoveLog()
+    assert log.undo() is None and log.redo() is None
+    log.record(0, 7, 1, True)
+    log.record(11, 12, 3, False)
+    assert len(log) == 2
+    assert log.undo() == (11, 12, 3, False)
+    assert log.undo() == (0, 7, 1, True)
+    assert not log.can_undo and log.can_redo
+    assert log.redo() == (0, 7, 1, True)
+    log.record(12, 3, 1, False)
+    assert not log.can_redo
+    assert log.undo() == (12, 3, 1, False)
+    assert log.undo() == (0, 7, 1, True)
+
+
+def test_bytes_round_trip_keeps_undone_moves():
+    """
+    A serialised log keeps its undone moves and its cursor
+    """
+    log = MoveLog()
+    for move in [(0, 7, 1, True), (11, 12, 1, False), (12, 4, 1, False), (4, 2, 3, True)]:
+        log.record(*move)
+    log.undo()
+    log.undo()
+    copy = MoveLog.from_bytes(log.to_bytes())
+    assert copy.to_bytes() == log.to_bytes()
+    assert len(copy) == 2
+    assert copy.redo() == (12, 4, 1, False)
+    assert copy.redo() == (4, 2, 3, True)
+    assert copy.redo() is None
+
+
+@pytest.mark.parametrize('data', [b'', b'\x00\x00\x00', b'\x00\x00\x00\x00\x01', b'\x02\x00\x00\x00\x00\x00'])
+def test_from_bytes_rejects_damaged_logs(data):
+    """
+    Truncated records and cursors past the end are refused
+    """
+    with pytest.raises(ValueError):
+        MoveLog.from_bytes(data)
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, 2)])
+def test_undo_redo_replays_a_game(draw_count, recycle_limit):
+    """
+    Undoing a whole game from its log goes back to the deal, redoing it all reaches the same position
+    """
+    choices = random.Random(draw_count)
+    start = GameState.deal(Deal.from_seed(9).cards, draw_count, recycle_limit)
+    state = start.copy()
+    log = MoveLog()
+    for _ in range(300):
+        moves = brute_force_moves(state)
+        if not moves:
+            break
+        move = choices.choice(moves)
+        log.record(*move, state.move(*move))
+    end = state.key()
+
+    log = MoveLog.from_bytes(log.to_bytes())
+    while log.can_undo:
+        state.revert(*log.undo())
+    assert state.key() == start.key()
+    while log.can_redo:
+        state.move(*log.redo()[:3])
+    assert state.key() == end
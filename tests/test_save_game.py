@@ -0,0 +1,107 @@
+import random
+
+import pytest
+
+from conftest import brute_force_moves
+from Deal import Deal
+from GameState import GameState
+from MoveLog import MoveLog
+from SaveGame import Autosave, SavedGame
+
+
+def played_game(deal: Deal, draw_count: int, recycle_limit, moves: int = 120) -> SavedGame:
+    """
+    Play random moves from a deal, undoing a few at the end
+    :param deal:
+    :param draw_count:
+    :param recycle_limit:
+    :param moves: number of moves
+    :return:
+    """
+    choices = random.Random(moves)
+    state = GameState.deal(deal.cards, draw_count, recycle_limit)
+    history = MoveLog()
+    for _ in range(moves):
+        legal = brute_force_moves(state)
+        if not legal:
+            break
+        move = choices.choice(legal)
+        history.record(*move, state.move(*move))
+    for _ in range(3):
+        state.revert(*history.undo())
+    return SavedGame(deal, state, history)
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, None), (3, 2), (1, GameState.MAX_RECYCLES)])
+@pytest.mark.parametrize('seeded', [True, False])
+def test_bytes_round_trip(draw_count, recycle_limit, seeded):
+    """
+    A game comes back with its deal, position, rules and history, undone moves included
+    """
+    deal = Deal.from_seed(11)
+    if not seeded:
+        deal = Deal.from_code(deal.code)
+    game = played_game(deal, draw_count, recycle_limit)
+    data = game.to_bytes()
+    loaded = SavedGame.from_bytes(data)
+
+    assert loaded.deal.cards == deal.cards
+    assert loaded.deal.seed == deal.seed
+    assert loaded.state.key() == game.state.key()
+    assert (loaded.state.draw_count, loaded.state.recycle_limit) == (draw_count, recycle_limit)
+    assert loaded.state.recycled == (game.state.recycled if recycle_limit is not None else 0)
+    assert loaded.history.to_bytes() == game.history.to_bytes()
+    assert loaded.to_bytes() == data
+
+
+def test_history_replays_from_the_deal():
+    """
+    The saved history leads from the deal to the saved position
+    """
+    game = played_game(Deal.from_seed(12), 3, 1)
+    loaded = SavedGame.from_bytes(game.to_bytes())
+    state = GameState.deal(loaded.deal.cards, 3, 1)
+    history = loaded.history
+    while history.can_undo:
+        history.undo()
+    for _ in range(len(game.history)):
+        state.move(*history.redo()[:3])
+    assert state.key() == loaded.state.key()
+
+
+def test_damaged_saves_are_refused():
+    """
+    Truncated data and foreign headers raise ValueError, and load returns None for them
+    """
+    data = played_game(Deal.from_seed(13), 1, None).to_bytes()
+    for damaged in (data[:3], data[:20], b'XXXX' + data[4:], data[:4] + b'\x09' + data[5:]):
+        with pytest.raises(ValueError):
+            SavedGame.from_bytes(damaged)
+
+
+def test_save_and_load(tmp_path):
+    """
+    Files written by save load back, missing or damaged files load as None
+    """
+    game = played_game(Deal.from_seed(14), 3, None)
+    path = str(tmp_path / 'game.sav')
+    game.save(path)
+    assert SavedGame.load(path).to_bytes() == game.to_bytes()
+
+    assert SavedGame.load(str(tmp_path / 'missing.sav')) is None
+    with open(path, 'wb') as file:
+        file.write(b'SSAV')
+    assert SavedGame.load(path) is None
+
+
+def test_autosave_writes_the_latest_game(tmp_path):
+    """
+    The autosave worker ends up writing the last submitted game
+    """
+    path = str(tmp_path / 'autosave.sav')
+    autosave = Autosave(path)
+    games = [played_game(Deal.from_seed(15), 1, None, moves) for moves in (10, 20, 30)]
+    for game in games:
+        autosave.submit(game.to_bytes())
+    autosave.close()
+    assert SavedGame.load(path).to_bytes() == games[-1].to_bytes()
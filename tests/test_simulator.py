@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from conftest import action_move
+from Deal import Deal
+from GameState import GameState
+from MoveGenerator import legal_moves
+from Simulator import COLUMNS, DRAW, GameBatch, simulate
+
+SEEDS = list(range(6))
+
+
+def assert_same(batch: GameBatch, game: int, state: GameState):
+    """
+    Check that a game of a batch and a GameState hold the same position
+    :param batch:
+    :param game:
+    :param state:
+    :return:
+    """
+    for column in range(COLUMNS):
+        length = batch.length[game, column]
+        assert batch.tableau[game, column, :length].tolist() == list(state.tableau[column])
+        assert batch.hidden[game, column] == state.hidden[column]
+    assert batch.foundations[game].tolist() == list(state.foundations)
+    talon = list(state.waste) + list(reversed(state.stock))
+    assert batch.talon[game, :batch.talon_length[game]].tolist() == talon
+    assert batch.waste_length[game] == len(state.waste)
+    if state.recycle_limit is not None:
+        assert batch.recycled[game] == state.recycled
+
+
+@pytest.mark.parametrize('draw, recycles', [(1, None), (3, None), (3, 1), (1, 0)])
+def test_lockstep_with_game_state(draw, recycles):
+    """
+    Random games played by a batch and by GameState agree on legal actions and positions at every step
+    """
+    rng = np.random.default_rng(draw * 10 + (recycles or 0))
+    batch = GameBatch.from_seeds(SEEDS, draw=draw, recycles=recycles)
+    states = [GameState.deal(Deal.from_seed(seed).cards, draw, recycles) for seed in SEEDS]
+    for game, state in enumerate(states):
+        assert_same(batch, game, state)
+
+    for _ in range(200):
+        mask = batch.legal_mask()
+        actions = np.full(len(batch), -1)
+        for game, state in enumerate(states):
+            moves = [action_move(state, action) for action in range(DRAW + 1)]
+            assert mask[game].tolist() == [move is not None for move in moves]
+            assert {move for move in moves if move is not None} == set(legal_moves(state))
+            legal = np.flatnonzero(mask[game])
+            if len(legal):
+                actions[game] = rng.choice(legal)
+                state.move(*moves[actions[game]])
+        if (actions < 0).all():
+            break
+        batch.step(actions)
+        for game, state in enumerate(states):
+            assert_same(batch, game, state)
+
+
+@pytest.mark.parametrize('count', [0, 5])
+def test_simulate_summaries(count):
+    """
+    Simulations summarise every game played, none included
+    """
+    stats = simulate(count, draw=3, recycles=2, seed=1, batch_size=2)
+    assert stats['games'] == count
+    assert 0 <= stats['wins'] <= count
+    if not count:
+        assert stats['win_rate'] == stats['mean_moves'] == 0.0
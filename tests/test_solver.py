@@ -0,0 +1,44 @@
+import pytest
+
+from Deal import Deal
+from GameState import GameState
+from Solver import Solver
+
+
+@pytest.mark.parametrize('seed, draw_count, recycle_limit', [
+    (0, 1, None), (2, 1, None), (3, 1, None), (4, 1, None), (7, 1, None), (11, 1, None),
+    (0, 3, None), (2, 3, None), (3, 3, None), (2, 3, 2),
+])
+def test_lines_are_legal_wins(seed, draw_count, recycle_limit):
+    """
+    Winning lines are made of legal moves only and end with every card on the foundations
+    """
+    state = GameState.deal(Deal.from_seed(seed).cards, draw_count, recycle_limit)
+    before = state.key()
+    result = Solver().solve(state)
+    assert result.solvable is True
+    assert state.key() == before
+
+    for move in result.moves:
+        assert state.can_move(*move), move
+        state.move(*move)
+    assert state.is_won()
+
+
+def test_gives_up_as_unknown():
+    """
+    A search stopped by its budget reports the deal as unknown, not unwinnable
+    """
+    result = Solver(max_nodes=10).solve_deal(Deal.from_seed(5).cards)
+    assert result.solvable is None
+    assert result.moves == []
+    assert result.nodes <= 10
+
+
+def test_proves_lost_deals():
+    """
+    A deal whose search tried every legal move without a win is reported unwinnable
+    """
+    result = Solver().solve_deal(Deal.from_seed(5).cards, 3)
+    assert result.solvable is False
+    assert result.moves == []
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from conftest import brute_force_moves
+from Deal import Deal
+from GameState import CLUBS, GameState, SPADES
+from MoveLog import MoveLog
+from StateTracker import StateTracker
+
+
+def derived(tracker: StateTracker) -> tuple:
+    """
+    Get every query of a tracker
+    :param tracker:
+    :return:
+    """
+    return (tracker.move_count, tracker.no_moves_left, tracker.all_revealed, tracker.won, tracker.hidden_count,
+            [tracker.foundation_count(suit) for suit in range(CLUBS, SPADES + 1)])
+
+
+@pytest.mark.parametrize('draw_count, recycle_limit', [(1, None), (3, None), (3, 1), (1, 0)])
+def test_matches_recompute(draw_count, recycle_limit):
+    """
+    Counters updated move by move, undos and redos included, match a tracker computed from scratch
+    """
+    for seed in range(4):
+        choices = random.Random(seed)
+        state = GameState.deal(Deal.from_seed(seed).cards, draw_count, recycle_limit)
+        tracker = StateTracker(state)
+        history = MoveLog()
+        for _ in range(300):
+            roll = choices.random()
+            if roll < 0.15 and history.can_undo:
+                state.revert(*history.undo())
+            elif roll < 0.2 and history.can_redo:
+                state.move(*history.redo()[:3])
+            else:
+                moves = brute_force_moves(state)
+                if not moves:
+                    break
+                move = choices.choice(moves)
+                history.record(*move, state.move(*move))
+            assert derived(tracker) == derived(StateTracker(state.copy()))
+        tracker.detach()
+
+
+def test_detach_stops_updates():
+    """
+    A detached tracker no longer counts the moves of its state
+    """
+    state = GameState.deal(Deal.from_seed(0).cards)
+    tracker = StateTracker(state)
+    tracker.detach()
+    before = tracker.move_count
+    while StateTracker(state.copy()).move_count == before:
+        state.move(*brute_force_moves(state)[0])
+    assert tracker.move_count == before